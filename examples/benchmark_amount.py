@@ -0,0 +1,60 @@
+"""Benchmark of Amount parsing
+
+Amounts of the chain assets use the interned assets of AssetRegistry. The
+previous path built a new Asset for each amount, which is measured by passing
+a new Asset to Amount. The memory of one million balances is compared with
+the compact AmountValue. No node is contacted.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import timeit
+import tracemalloc
+
+from nectar import Hive
+from nectar.amount import Amount
+from nectar.amountvalue import AmountValue
+from nectar.asset import Asset
+from nectar.blockchainobject import BlockchainObject
+
+if __name__ == "__main__":
+    hive = Hive(offline=True)
+    number = 20000
+    # A stream keeps many objects in the cache
+    for i in range(5000):
+        BlockchainObject({"id": i}, blockchain_instance=hive)
+
+    def previous():
+        Amount("1.000", Asset("HIVE", blockchain_instance=hive), blockchain_instance=hive)
+
+    tests = [
+        ("previous path:", previous),
+        ("string:", lambda: Amount("1.000 HIVE", blockchain_instance=hive)),
+        (
+            "nai dict:",
+            lambda: Amount(
+                {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+                blockchain_instance=hive,
+            ),
+        ),
+        ("list:", lambda: Amount(["1000", 3, "@@000000021"], blockchain_instance=hive)),
+    ]
+    for name, test in tests:
+        duration = min(timeit.repeat(test, number=number, repeat=5)) / number
+        print("%-15s %6.2f us per amount" % (name, duration * 1e6))
+
+    count = 1000000
+    for name, cls in [("Amount:", Amount), ("AmountValue:", AmountValue)]:
+        tracemalloc.start()
+        start = timeit.default_timer()
+        balances = [
+            cls(["%d" % i, 3, "@@000000021"], blockchain_instance=hive) for i in range(count)
+        ]
+        duration = timeit.default_timer() - start
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del balances
+        print(
+            "%-15s %d balances in %5.2f s, %6.1f MB (%d bytes each)"
+            % (name, count, duration, size / 1024**2, size / count)
+        )
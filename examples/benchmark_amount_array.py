@@ -0,0 +1,62 @@
+"""Benchmark of aggregations over many amounts
+
+Sums the pending payouts of 100000 comments and the payouts per author, once
+by adding Amount objects and once with AmountArray, and sums amounts which
+were already parsed. No node is contacted.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import random
+import time
+
+from nectar import Hive
+from nectar.amount import Amount
+from nectar.amountarray import AmountArray
+
+
+def amount_loop(payouts, authors, hive):
+    total = Amount(0, "HBD", blockchain_instance=hive)
+    per_author = {}
+    for payout, author in zip(payouts, authors):
+        amount = Amount(payout, blockchain_instance=hive)
+        total += amount
+        if author in per_author:
+            per_author[author] += amount
+        else:
+            per_author[author] = amount
+    return total, per_author
+
+
+def amount_array(payouts, authors, hive):
+    array = AmountArray(payouts, accounts=authors, blockchain_instance=hive)
+    return array.sum(), array.group_by_account().to_dict()
+
+
+if __name__ == "__main__":
+    hive = Hive(offline=True)
+    count = 100000
+    payouts = [
+        "%d.%03d HBD" % (random.randint(0, 100), random.randint(0, 999)) for i in range(count)
+    ]
+    authors = ["author%d" % random.randint(0, 5000) for i in range(count)]
+
+    results = []
+    for name, test in [("Amount loop:", amount_loop), ("AmountArray:", amount_array)]:
+        start = time.perf_counter()
+        results.append(test(payouts, authors, hive))
+        duration = time.perf_counter() - start
+        print("%-15s %d payouts in %6.3f s" % (name, count, duration))
+    assert str(results[0][0]) == str(results[1][0])
+    print("total: %s, authors: %d" % (results[1][0], len(results[1][1])))
+
+    # Sums of parsed amounts, e.g. of Comment objects
+    amounts = [Amount(payout, blockchain_instance=hive) for payout in payouts]
+    array = AmountArray(amounts, blockchain_instance=hive)
+    start = time.perf_counter()
+    total = sum(amounts, Amount(0, "HBD", blockchain_instance=hive))
+    duration = time.perf_counter() - start
+    print("sum of Amount:  %6.2f ms" % (duration * 1e3))
+    start = time.perf_counter()
+    assert str(array.sum()) == str(total)
+    print("AmountArray.sum: %5.2f ms" % ((time.perf_counter() - start) * 1e3))
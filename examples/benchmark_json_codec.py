@@ -0,0 +1,108 @@
+"""Micro-benchmark of the per-call JSON work of GrapheneRPC.rpcexec
+
+Compares the previous handling of a large get_block_range reply (deep copy of
+the arguments, serializing the payload for the debug log and for sending,
+decoding the reply and serializing it again for the debug log) with the
+pluggable codec and the lazy debug serialization. No node is contacted.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import json
+import logging
+import timeit
+
+from nectarapi.jsoncodec import JsonCodec, LazyJson
+from nectarapi.rpcutils import get_query
+
+log = logging.getLogger(__name__)
+logging.basicConfig(level=logging.INFO)
+
+
+def make_block(block_num, tx_count=50):
+    transactions = []
+    for i in range(tx_count):
+        transactions.append(
+            {
+                "ref_block_num": block_num & 0xFFFF,
+                "ref_block_prefix": 1234567890,
+                "expiration": "2024-01-01T00:00:30",
+                "operations": [
+                    {
+                        "type": "transfer_operation",
+                        "value": {
+                            "from": "alice%d" % i,
+                            "to": "bob%d" % i,
+                            "amount": {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+                            "memo": "Payment for order #%d äöü" % i,
+                        },
+                    }
+                ],
+                "extensions": [],
+                "signatures": ["1f" + "ab" * 64],
+            }
+        )
+    return {
+        "previous": "%08x" % (block_num - 1) + "00" * 16,
+        "timestamp": "2024-01-01T00:00:00",
+        "witness": "witness%d" % (block_num % 21),
+        "transaction_merkle_root": "00" * 20,
+        "extensions": [],
+        "witness_signature": "20" + "cd" * 64,
+        "transactions": transactions,
+        "block_id": "%08x" % block_num + "00" * 16,
+        "signing_key": "STM" + "x" * 50,
+        "transaction_ids": ["%040x" % i for i in range(tx_count)],
+    }
+
+
+def old_call(args, raw_reply):
+    query_args = json.loads(json.dumps(args))
+    payload = {
+        "method": "block_api.get_block_range",
+        "params": query_args[0],
+        "jsonrpc": "2.0",
+        "id": 1,
+    }
+    log.debug(f"Payload: {json.dumps(payload)}")
+    json.dumps(payload, ensure_ascii=False).encode("utf8")
+    reply = raw_reply.decode("utf8")
+    ret = json.loads(reply, strict=False)
+    log.debug(f"Reply: {json.dumps(reply)}")
+    return ret["result"]
+
+
+def new_call(codec, args, raw_reply):
+    payload = get_query(True, 1, "block_api", "get_block_range", args)
+    data = codec.dumps(payload)
+    log.debug("Payload: %s", LazyJson(data))
+    ret = codec.loads(raw_reply)
+    log.debug("Reply: %s", LazyJson(raw_reply))
+    return ret["result"]
+
+
+if __name__ == "__main__":
+    count = 100
+    number = 20
+    args = ({"starting_block_num": 1, "count": count},)
+    reply = {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "result": {"blocks": [make_block(n) for n in range(1, count + 1)]},
+    }
+    raw_reply = json.dumps(reply).encode("utf8")
+    print("get_block_range reply with %d blocks: %.1f kB" % (count, len(raw_reply) / 1024))
+
+    old = min(timeit.repeat(lambda: old_call(args, raw_reply), number=number, repeat=5))
+    print("previous path:       %7.2f ms per call" % (old / number * 1000))
+    for module in ["json", "ujson", "orjson"]:
+        try:
+            codec = JsonCodec(module)
+        except ImportError:
+            print("%-20s not installed" % (module + ":"))
+            continue
+        new = min(timeit.repeat(lambda: new_call(codec, args, raw_reply), number=number, repeat=5))
+        print(
+            "%-20s %7.2f ms per call (%.1fx faster)"
+            % (module + ":", new / number * 1000, old / new)
+        )
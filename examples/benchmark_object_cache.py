@@ -0,0 +1,84 @@
+"""Benchmark of the object cache, which holds Block, Account and Asset objects
+
+Stores one million entries in ObjectCache, with and without a byte budget,
+and reads them back from several threads. The previous cache scanned all
+entries on every insert, it is measured with far fewer inserts for
+comparison. No node is contacted.
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from nectar.blockchainobject import ObjectCache
+
+
+class PreviousObjectCache(dict):
+    """The previous cache: every insert scans all entries for expired ones"""
+
+    def __init__(self, default_expiration=10):
+        super(PreviousObjectCache, self).__init__()
+        self.default_expiration = default_expiration
+        self.lock = threading.RLock()
+
+    def __setitem__(self, key, value):
+        data = {
+            "expires": datetime.now(timezone.utc) + timedelta(seconds=self.default_expiration),
+            "data": value,
+        }
+        with self.lock:
+            if key in self:
+                del self[key]
+            dict.__setitem__(self, key, data)
+        with self.lock:
+            utc_now = datetime.now(timezone.utc)
+            del_list = [k for k, v in self.items() if utc_now >= v["expires"]]
+            for k in del_list:
+                del self[k]
+
+
+def insert(cache, count):
+    value = {"id": 0, "witness": "witness", "transactions": []}
+    start = time.perf_counter()
+    for i in range(count):
+        cache[i] = value
+    return time.perf_counter() - start
+
+
+def read(cache, count, thread_num):
+    def worker(offset):
+        for i in range(offset, count, thread_num):
+            cache.get(i, None)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(thread_num)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    count = 1000000
+    previous_count = 10000
+
+    duration = insert(PreviousObjectCache(), previous_count)
+    print(
+        "previous cache:       %7d inserts in %6.2f s (%6.1f us per insert)"
+        % (previous_count, duration, duration / previous_count * 1e6)
+    )
+    for name, cache in [
+        ("max_entries=100000:", ObjectCache(max_entries=100000)),
+        ("max_entries=None:", ObjectCache(max_entries=None)),
+        ("max_bytes=64 MB:", ObjectCache(max_entries=None, max_bytes=64 * 1024 * 1024)),
+    ]:
+        duration = insert(cache, count)
+        print(
+            "%-21s %7d inserts in %6.2f s (%6.1f us per insert), %d entries kept"
+            % (name, count, duration, duration / count * 1e6, len(cache))
+        )
+    duration = read(cache, count, 8)
+    print("8 threads:            %7d reads in %6.2f s" % (count, duration))
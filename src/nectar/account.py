@@ -2172,8 +2172,17 @@ class Account(BlockchainObject):
                 return 0
 
     def _get_account_history(
-        self, account=None, start=-1, limit=1, operation_filter_low=None, operation_filter_high=None
+        self,
+        account=None,
+        start=-1,
+        limit=1,
+        operation_filter_low=None,
+        operation_filter_high=None,
+        stream=False,
     ):
+        """Returns the account history entries as list, or as iterator, which
+        decodes the entries one by one while the reply is read, when stream is True
+        """
         if account is None:
             account = self["name"]
         account = extract_account_name(account)
@@ -2184,13 +2193,16 @@ class Account(BlockchainObject):
         if not self.blockchain.is_connected():
             raise OfflineHasNoRPCException("No RPC available in offline mode!")
         self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        stream_kwargs = {"stream_path": ("result", "history")} if stream else {}
         if operation_filter_low is None and operation_filter_high is None:
             if self.blockchain.rpc.get_use_appbase():
                 try:
                     ret = self.blockchain.rpc.get_account_history(
-                        {"account": account, "start": start, "limit": limit}, api="account_history"
+                        {"account": account, "start": start, "limit": limit},
+                        api="account_history",
+                        **stream_kwargs,
                     )
-                    if ret is not None:
+                    if ret is not None and not stream:
                         ret = ret["history"]
                 except ApiNotSupported:
                     ret = self.blockchain.rpc.get_account_history(
@@ -2210,8 +2222,9 @@ class Account(BlockchainObject):
                             "operation_filter_high": operation_filter_high,
                         },
                         api="account_history",
+                        **stream_kwargs,
                     )
-                    if ret is not None:
+                    if ret is not None and not stream:
                         ret = ret["history"]
                 except ApiNotSupported:
                     ret = self.blockchain.rpc.get_account_history(
@@ -2494,11 +2507,13 @@ class Account(BlockchainObject):
                 only_ops=only_ops, exclude_ops=exclude_ops
             )
         try:
+            # Entries in chronological order are decoded while the reply is read
             txs = self._get_account_history(
                 start=index,
                 limit=limit,
                 operation_filter_low=operation_filter_low,
                 operation_filter_high=operation_filter_high,
+                stream=order == 1,
             )
         except FilteredItemNotFound:
             txs = []
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import logging
+
+from nectar.instance import shared_blockchain_instance
+from nectarapi.asyncnoderpc import AsyncNodeRPC
+
+from .account import Account
+from .block import Block
+from .blockchain import Blockchain
+from .exceptions import AccountDoesNotExistsException, BlockDoesNotExistsException
+
+log = logging.getLogger(__name__)
+
+
+class AsyncBlockchain(object):
+    """Async variants of the most used :class:`nectar.blockchain.Blockchain`,
+    :class:`nectar.block.Block` and :class:`nectar.account.Account` calls
+
+    All api calls are sent by a :class:`nectarapi.asyncnoderpc.AsyncNodeRPC`,
+    so that one event loop can keep many requests in flight. The returned
+    objects are the usual :class:`nectar.block.Block` and
+    :class:`nectar.account.Account` objects, bound to ``blockchain_instance``.
+
+    :param Steem/Hive blockchain_instance: Steem or Hive instance, which provides
+        the chain parameters and the node list
+    :param AsyncNodeRPC rpc: async rpc client. When not set, one is created for the
+        working nodes of ``blockchain_instance``
+    :param str mode: (default) Irreversible block (``irreversible``) or
+        actual head block (``head``)
+    :param int max_connections: Maximum number of connections per node (default is 32)
+
+    .. code-block:: python
+
+        import asyncio
+        from nectar.aio import AsyncBlockchain
+
+        async def main():
+            async with AsyncBlockchain() as blockchain:
+                account = await blockchain.get_account("thecrazygm")
+                async for op in blockchain.stream(opNames=["transfer"]):
+                    print(op)
+
+        asyncio.run(main())
+
+    """
+
+    def __init__(self, blockchain_instance=None, rpc=None, mode="irreversible", max_connections=32):
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if rpc is None:
+            rpc = AsyncNodeRPC(
+                self.blockchain.rpc.nodes.export_working_nodes(),
+                num_retries=self.blockchain.rpc.num_retries,
+                num_retries_call=self.blockchain.rpc.num_retries_call,
+                timeout=self.blockchain.rpc.timeout,
+                max_connections=max_connections,
+            )
+        self.rpc = rpc
+        if mode == "irreversible":
+            self.mode = "last_irreversible_block_num"
+        elif mode == "head":
+            self.mode = "head_block_number"
+        else:
+            raise ValueError("invalid value for 'mode'!")
+        self.block_interval = self.blockchain.get_block_interval()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes all idle connections of the rpc client"""
+        self.rpc.close()
+
+    async def get_dynamic_global_properties(self):
+        """Returns the dynamic global properties"""
+        return await self.rpc.get_dynamic_global_properties({}, api="database")
+
+    async def get_current_block_num(self):
+        """This call returns the current block number
+
+        .. note:: The block number returned depends on the ``mode`` used
+                  when instantiating from this class.
+        """
+        props = await self.get_dynamic_global_properties()
+        if props is None:
+            raise ValueError("Could not receive dynamic_global_properties!")
+        return int(props[self.mode])
+
+    async def get_block(self, block_num, only_ops=False, only_virtual_ops=False):
+        """Returns the :class:`nectar.block.Block` with the given number
+
+        :param int block_num: Block number
+        :param bool only_ops: Only yield operations (default: False)
+        :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        """
+        if only_ops or only_virtual_ops:
+            ops_ops = await self.rpc.get_ops_in_block(
+                {"block_num": block_num, "only_virtual": only_virtual_ops},
+                api="account_history",
+            )
+            ops = ops_ops["ops"] if ops_ops is not None else None
+            if bool(ops):
+                block = {
+                    "block": ops[0]["block"],
+                    "timestamp": ops[0]["timestamp"],
+                    "operations": ops,
+                }
+            else:
+                block = {
+                    "block": block_num,
+                    "timestamp": "1970-01-01T00:00:00",
+                    "operations": [],
+                }
+        else:
+            block = await self.rpc.get_block({"block_num": block_num}, api="block")
+            if block and "block" in block:
+                block = block["block"]
+        if not block:
+            raise BlockDoesNotExistsException(
+                f"Block {block_num} does not exist or is not available from {self.rpc.url}"
+            )
+        block = Block(
+            block,
+            only_ops=only_ops,
+            only_virtual_ops=only_virtual_ops,
+            blockchain_instance=self.blockchain,
+        )
+        block["id"] = block_num
+        block.identifier = block_num
+        return block
+
+    async def get_accounts(self, names):
+        """Returns a list of :class:`nectar.account.Account` objects, fetched by
+        one api call
+
+        :param list names: account names
+        """
+        accounts = await self.rpc.find_accounts({"accounts": list(names)}, api="database")
+        if accounts and "accounts" in accounts:
+            accounts = accounts["accounts"]
+        return [Account(account, blockchain_instance=self.blockchain) for account in accounts or []]
+
+    async def get_account(self, name):
+        """Returns the :class:`nectar.account.Account` with the given name
+
+        :param str name: account name
+        """
+        accounts = await self.get_accounts([name])
+        if len(accounts) != 1:
+            raise AccountDoesNotExistsException(name)
+        return accounts[0]
+
+    async def blocks(
+        self, start=None, stop=None, only_ops=False, only_virtual_ops=False, prefetch_window=32
+    ):
+        """Async generator which yields blocks starting from ``start``, see
+        :func:`nectar.blockchain.Blockchain.blocks`
+
+        :param int start: Starting block
+        :param int stop: Stop at this block, when not set, new blocks are awaited
+        :param bool only_ops: Only yield operations (default: False)
+        :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param int prefetch_window: Number of blocks which are requested concurrently
+            ahead of the last yielded block (default: 32)
+        """
+        if start is None:
+            start = await self.get_current_block_num()
+        pending = {}
+        next_block_num = start
+        try:
+            while True:
+                head_block = await self.get_current_block_num()
+                if stop:
+                    head_block = min(head_block, stop)
+                while start <= head_block:
+                    while next_block_num <= head_block and next_block_num - start < prefetch_window:
+                        pending[next_block_num] = asyncio.ensure_future(
+                            self.get_block(
+                                next_block_num,
+                                only_ops=only_ops,
+                                only_virtual_ops=only_virtual_ops,
+                            )
+                        )
+                        next_block_num += 1
+                    yield await pending.pop(start)
+                    start += 1
+                if stop and start > stop:
+                    return
+                await asyncio.sleep(self.block_interval)
+        finally:
+            for task in pending.values():
+                task.cancel()
+
+    async def stream(
+        self,
+        opNames=[],
+        raw_ops=False,
+        start=None,
+        stop=None,
+        only_ops=False,
+        only_virtual_ops=False,
+        prefetch_window=32,
+    ):
+        """Async generator which yields the operations in the format of
+        :func:`nectar.blockchain.Blockchain.stream`
+
+        :param array opNames: List of operations to filter for
+        :param bool raw_ops: When set to True, it returns the unmodified operations (default: False)
+        :param int start: Starting block
+        :param int stop: Stop at this block, when not set, new blocks are awaited
+        :param bool only_ops: Only yield operations (default: False)
+        :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param int prefetch_window: Number of blocks which are requested concurrently
+            (default: 32)
+        """
+        async for block in self.blocks(
+            start=start,
+            stop=stop,
+            only_ops=only_ops,
+            only_virtual_ops=only_virtual_ops,
+            prefetch_window=prefetch_window,
+        ):
+            for op in Blockchain.block_ops(block, opNames=opNames, raw_ops=raw_ops):
+                yield op
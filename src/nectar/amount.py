@@ -1,15 +1,16 @@
 # -*- coding: utf-8 -*-
 from decimal import ROUND_DOWN, Decimal
 
-from nectar.asset import Asset
+from nectar.asset import Asset, AssetRegistry, InternedAsset, get_asset
 from nectar.instance import shared_blockchain_instance
 
 
 def check_asset(other, self, stm):
+    if other is self:
+        # Interned assets are shared
+        return
     if isinstance(other, dict) and "asset" in other and isinstance(self, dict) and "asset" in self:
-        if not Asset(other["asset"], blockchain_instance=stm) == Asset(
-            self["asset"], blockchain_instance=stm
-        ):
+        if not get_asset(other["asset"], stm) == get_asset(self["asset"], stm):
             raise AssertionError()
     else:
         if not other == self:
@@ -84,7 +85,6 @@ class Amount(dict):
         blockchain_instance=None,
         **kwargs,
     ):
-        self["asset"] = {}
         self.new_appbase_format = new_appbase_format
         self.fixed_point_arithmetic = fixed_point_arithmetic
 
@@ -95,6 +95,19 @@ class Amount(dict):
                 blockchain_instance = kwargs["hive_instance"]
         self.blockchain = blockchain_instance or shared_blockchain_instance()
 
+        if asset is None and isinstance(amount, str):
+            # Fast path for the most common representation, e.g. "1.000 HIVE"
+            value, symbol = amount.split(" ")
+            interned = AssetRegistry.for_chain(self.blockchain).get(symbol)
+            if interned is not None:
+                if fixed_point_arithmetic:
+                    value = quantize(value, interned["precision"])
+                else:
+                    value = Decimal(value)
+                dict.__init__(self, asset=interned, amount=value, symbol=symbol)
+                return
+
+        self["asset"] = {}
         if amount and asset is None and isinstance(amount, Amount):
             # Copy Asset object
             self["amount"] = amount["amount"]
@@ -104,7 +117,7 @@ class Amount(dict):
         elif amount and asset is None and isinstance(amount, list) and len(amount) == 3:
             # Copy Asset object
             self["amount"] = Decimal(amount[0]) / Decimal(10 ** amount[1])
-            self["asset"] = Asset(amount[2], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(amount[2], self.blockchain)
             self["symbol"] = self["asset"]["symbol"]
 
         elif (
@@ -118,12 +131,12 @@ class Amount(dict):
             # Copy Asset object
             self.new_appbase_format = True
             self["amount"] = Decimal(amount["amount"]) / Decimal(10 ** amount["precision"])
-            self["asset"] = Asset(amount["nai"], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(amount["nai"], self.blockchain)
             self["symbol"] = self["asset"]["symbol"]
 
         elif amount is not None and asset is None and isinstance(amount, str):
             self["amount"], self["symbol"] = amount.split(" ")
-            self["asset"] = Asset(self["symbol"], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(self["symbol"], self.blockchain)
 
         elif (
             amount
@@ -132,7 +145,7 @@ class Amount(dict):
             and "amount" in amount
             and "asset_id" in amount
         ):
-            self["asset"] = Asset(amount["asset_id"], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(amount["asset_id"], self.blockchain)
             self["symbol"] = self["asset"]["symbol"]
             self["amount"] = Decimal(amount["amount"]) / Decimal(10 ** self["asset"]["precision"])
 
@@ -143,7 +156,7 @@ class Amount(dict):
             and "amount" in amount
             and "asset" in amount
         ):
-            self["asset"] = Asset(amount["asset"], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(amount["asset"], self.blockchain)
             self["symbol"] = self["asset"]["symbol"]
             self["amount"] = Decimal(amount["amount"]) / Decimal(10 ** self["asset"]["precision"])
 
@@ -169,12 +182,12 @@ class Amount(dict):
 
         elif isinstance(amount, (float)) and asset and isinstance(asset, str):
             self["amount"] = str(amount)
-            self["asset"] = Asset(asset, blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(asset, self.blockchain)
             self["symbol"] = asset
 
         elif isinstance(amount, (int, Decimal)) and asset and isinstance(asset, str):
             self["amount"] = amount
-            self["asset"] = Asset(asset, blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(asset, self.blockchain)
             self["symbol"] = asset
         elif amount and asset and isinstance(asset, Asset):
             self["amount"] = amount
@@ -182,7 +195,7 @@ class Amount(dict):
             self["asset"] = asset
         elif amount and asset and isinstance(asset, str):
             self["amount"] = amount
-            self["asset"] = Asset(asset, blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(asset, self.blockchain)
             self["symbol"] = self["asset"]["symbol"]
         else:
             raise ValueError
@@ -193,9 +206,11 @@ class Amount(dict):
 
     def copy(self):
         """Copy the instance and make sure not to use a reference"""
+        asset = self["asset"]
         return Amount(
             amount=self["amount"],
-            asset=self["asset"].copy(),
+            # Interned assets are immutable and shared
+            asset=asset if isinstance(asset, InternedAsset) else asset.copy(),
             new_appbase_format=self.new_appbase_format,
             fixed_point_arithmetic=self.fixed_point_arithmetic,
             blockchain_instance=self.blockchain,
@@ -223,7 +238,7 @@ class Amount(dict):
     def asset(self):
         """Returns the asset as instance of :class:`steem.asset.Asset`"""
         if not self["asset"]:
-            self["asset"] = Asset(self["symbol"], blockchain_instance=self.blockchain)
+            self["asset"] = get_asset(self["symbol"], self.blockchain)
         return self["asset"]
 
     def json(self):
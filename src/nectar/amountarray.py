@@ -0,0 +1,337 @@
+# -*- coding: utf-8 -*-
+from fractions import Fraction
+
+from nectar.instance import shared_blockchain_instance
+
+from .amount import Amount
+from .amountvalue import AmountValue, PriceValue, _resolve_asset, _to_satoshis
+from .price import Price
+
+numpy = None
+try:
+    import numpy
+except ImportError:
+    pass
+
+
+def _mul_fraction(satoshis, fraction):
+    """Returns ``satoshis * fraction`` rounded towards zero
+
+    The products are computed in int64. When they could overflow, the
+    elements are multiplied as python integers.
+    """
+    num, den = fraction.numerator, fraction.denominator
+    if len(satoshis) == 0:
+        return satoshis.copy()
+    if int(numpy.abs(satoshis).max()) * abs(num) >= 2**63:
+        # int() of a Fraction rounds towards zero
+        return numpy.array(
+            [int(value * fraction) for value in satoshis.tolist()], dtype=numpy.int64
+        )
+    product = satoshis * num
+    if den == 1:
+        return product
+    # Floor division rounds towards minus infinity
+    return numpy.sign(product) * (numpy.abs(product) // den)
+
+
+class AmountArray(object):
+    """Array of amounts of one asset for vectorized arithmetic
+
+    The amounts are stored as int64 numpy array of satoshis (``amount * 10 **
+    precision``) together with the shared asset of an
+    :class:`nectar.asset.AssetRegistry`. Sums and other aggregations over
+    many amounts (e.g. the pending payouts of all posts of a tag) are computed
+    in one numpy call instead of creating a new :class:`nectar.amount.Amount`
+    for each addition. Results are rounded towards zero to the precision of
+    their asset, as :class:`nectar.amountvalue.AmountValue` does.
+
+    numpy needs to be installed, e.g. with ``pip install "hive-nectar[numpy]"``.
+
+    :param list amounts: amounts in the representations of
+        :class:`nectar.amount.Amount`, e.g. ``"1.000 HIVE"``, NAI dicts,
+        ``[amount, precision, nai]`` lists or Amount objects. All need to
+        have the same asset.
+    :param asset: symbol, NAI or asset, needed for an empty list and for numbers
+    :param list accounts: account name of each amount (*optional*), used by
+        :func:`group_by_account`
+    :param Blockchain blockchain_instance: Blockchain instance
+
+    .. code-block:: python
+
+        >>> from nectar import Hive
+        >>> from nectar.amountarray import AmountArray
+        >>> hive = Hive(offline=True)
+        >>> payouts = AmountArray(
+        ...     ["1.000 HBD", "2.500 HBD", "0.250 HBD"],
+        ...     accounts=["alice", "bob", "alice"],
+        ...     blockchain_instance=hive,
+        ... )
+        >>> payouts.sum()
+        3.750 HBD
+        >>> payouts.group_by_account().to_dict()
+        {'alice': 1.250 HBD, 'bob': 2.500 HBD}
+
+    """
+
+    def __init__(self, amounts, asset=None, accounts=None, blockchain_instance=None, **kwargs):
+        if numpy is None:
+            raise ImportError(
+                'AmountArray needs numpy, install it with: pip install "hive-nectar[numpy]"'
+            )
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        self.blockchain = blockchain_instance or shared_blockchain_instance()
+        if asset is not None:
+            asset = _resolve_asset(asset, self.blockchain)
+        satoshis = []
+        assets = {}
+        for amount in amounts:
+            value, amount_asset = self._parse(amount, asset, assets)
+            if asset is None:
+                asset = amount_asset
+            elif amount_asset is not asset and amount_asset["symbol"] != asset["symbol"]:
+                raise ValueError(
+                    "All amounts need the asset %s, not %s"
+                    % (asset["symbol"], amount_asset["symbol"])
+                )
+            satoshis.append(value)
+        if asset is None:
+            raise ValueError("The asset of an empty AmountArray needs to be set")
+        self.satoshis = numpy.array(satoshis, dtype=numpy.int64)
+        self.asset = asset
+        self.accounts = None if accounts is None else numpy.asarray(accounts)
+        if self.accounts is not None and len(self.accounts) != len(self.satoshis):
+            raise ValueError("accounts and amounts need the same length")
+
+    def _parse(self, amount, asset, assets):
+        """Returns the satoshis and the asset of one amount
+
+        The plain representations of the chain assets are parsed without
+        creating an object, ``assets`` caches the looked up assets.
+        """
+        if isinstance(amount, str):
+            value, symbol = amount.split(" ")
+            amount_asset = assets.get(symbol)
+            if amount_asset is None:
+                amount_asset = assets[symbol] = _resolve_asset(symbol, self.blockchain)
+            decimals = value.partition(".")[2]
+            if len(decimals) == amount_asset["precision"]:
+                return int(value.replace(".", "")), amount_asset
+            return _to_satoshis(value, amount_asset["precision"]), amount_asset
+        if isinstance(amount, list) and len(amount) == 3:
+            value, precision, nai = amount
+        elif isinstance(amount, dict) and "nai" in amount and "precision" in amount:
+            value, precision, nai = amount["amount"], amount["precision"], amount["nai"]
+        else:
+            if asset is not None and isinstance(amount, (int, float)):
+                value = AmountValue(amount, asset, blockchain_instance=self.blockchain)
+            else:
+                value = AmountValue(amount, blockchain_instance=self.blockchain)
+            return value.satoshis, value.asset
+        amount_asset = assets.get(nai)
+        if amount_asset is None:
+            amount_asset = assets[nai] = _resolve_asset(nai, self.blockchain)
+        if int(precision) == amount_asset["precision"]:
+            return int(value), amount_asset
+        return AmountValue._satoshis_from_precision(value, precision, amount_asset), amount_asset
+
+    @classmethod
+    def from_satoshis(cls, satoshis, asset, accounts=None, blockchain_instance=None):
+        """Returns a new array from integer satoshis
+
+        :param satoshis: list or numpy array of integer satoshis
+        :param asset: symbol, NAI or asset
+        :param list accounts: account name of each amount (*optional*)
+        :param Blockchain blockchain_instance: Blockchain instance
+        """
+        array = cls([], asset=asset, blockchain_instance=blockchain_instance)
+        array.satoshis = numpy.asarray(satoshis, dtype=numpy.int64)
+        if accounts is not None:
+            array.accounts = numpy.asarray(accounts)
+            if len(array.accounts) != len(array.satoshis):
+                raise ValueError("accounts and amounts need the same length")
+        return array
+
+    @classmethod
+    def from_objects(cls, objects, key, account_key=None, asset=None, blockchain_instance=None):
+        """Returns the amounts of one field of dicts, e.g. of comments or operations
+
+        :param list objects: dicts, e.g. :class:`nectar.comment.Comment` objects
+        :param str key: field with the amount, e.g. ``pending_payout_value``
+        :param str account_key: field with the account name, e.g. ``author``
+            (*optional*)
+        :param asset: asset, needed when ``objects`` can be empty
+        :param Blockchain blockchain_instance: Blockchain instance
+        """
+        objects = list(objects)
+        accounts = None
+        if account_key is not None:
+            accounts = [obj[account_key] for obj in objects]
+        return cls(
+            [obj[key] for obj in objects],
+            asset=asset,
+            accounts=accounts,
+            blockchain_instance=blockchain_instance,
+        )
+
+    @classmethod
+    def from_rshares(cls, rshares, accounts=None, blockchain_instance=None, use_stored_data=True):
+        """Returns the current value of rshares in the backed token (e.g. HBD)
+
+        The reward fund and the median price are read once, all rshares are
+        converted in one step.
+
+        :param list rshares: rshares, e.g. of votes
+        :param list accounts: account name of each value (*optional*)
+        :param Blockchain blockchain_instance: Blockchain instance
+        :param bool use_stored_data: use the stored reward fund and median price
+        """
+        if numpy is None:
+            raise ImportError("numpy is not installed")
+        blockchain = blockchain_instance or shared_blockchain_instance()
+        asset = _resolve_asset(blockchain.backed_token_symbol, blockchain)
+        per_rshares = (
+            blockchain.rshares_to_token_backed_dollar(1, use_stored_data=use_stored_data)
+            * 10 ** asset["precision"]
+        )
+        satoshis = numpy.trunc(numpy.asarray(rshares, dtype=numpy.float64) * per_rshares)
+        return cls.from_satoshis(
+            satoshis.astype(numpy.int64),
+            asset,
+            accounts=accounts,
+            blockchain_instance=blockchain,
+        )
+
+    def _new(self, satoshis, asset=None, accounts=None):
+        array = object.__new__(AmountArray)
+        array.blockchain = self.blockchain
+        array.satoshis = satoshis
+        array.asset = asset or self.asset
+        array.accounts = self.accounts if accounts is None else accounts
+        return array
+
+    @property
+    def precision(self):
+        """Returns the precision of the asset"""
+        return self.asset["precision"]
+
+    @property
+    def symbol(self):
+        """Returns the symbol of the asset"""
+        return self.asset["symbol"]
+
+    @property
+    def amounts(self):
+        """Returns the amounts as float64 numpy array"""
+        return self.satoshis / 10 ** self.asset["precision"]
+
+    def __len__(self):
+        return len(self.satoshis)
+
+    def __iter__(self):
+        for satoshis in self.satoshis.tolist():
+            yield AmountValue.from_satoshis(satoshis, self.asset)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, numpy.integer)):
+            return AmountValue.from_satoshis(int(self.satoshis[key]), self.asset)
+        accounts = None if self.accounts is None else self.accounts[key]
+        return self._new(self.satoshis[key], accounts=accounts)
+
+    def __repr__(self):
+        return "<AmountArray of %d %s amounts, total %s>" % (len(self), self.symbol, self.sum())
+
+    def sum(self):
+        """Returns the sum of all amounts as :class:`nectar.amountvalue.AmountValue`"""
+        return AmountValue.from_satoshis(int(self.satoshis.sum()), self.asset)
+
+    def to_amount_values(self):
+        """Returns the amounts as list of :class:`nectar.amountvalue.AmountValue`"""
+        return list(self)
+
+    def to_amounts(self, fixed_point_arithmetic=False):
+        """Returns the amounts as list of :class:`nectar.amount.Amount`
+
+        :param bool fixed_point_arithmetic: fixed point arithmetic of the amounts
+        """
+        return [
+            Amount(
+                value.amount_decimal,
+                self.asset,
+                fixed_point_arithmetic=fixed_point_arithmetic,
+                blockchain_instance=self.blockchain,
+            )
+            for value in self
+        ]
+
+    def group_by_account(self):
+        """Returns the sums per account as new array with the sorted account names"""
+        if self.accounts is None:
+            raise ValueError("The array has no accounts")
+        accounts, index = numpy.unique(self.accounts, return_inverse=True)
+        totals = numpy.zeros(len(accounts), dtype=numpy.int64)
+        numpy.add.at(totals, index, self.satoshis)
+        return self._new(totals, accounts=accounts)
+
+    def to_dict(self):
+        """Returns a dict with the account names as keys and the amounts as values"""
+        if self.accounts is None:
+            raise ValueError("The array has no accounts")
+        return {
+            account: AmountValue.from_satoshis(satoshis, self.asset)
+            for account, satoshis in zip(self.accounts.tolist(), self.satoshis.tolist())
+        }
+
+    def _check_asset(self, asset):
+        if asset is not self.asset and asset["symbol"] != self.asset["symbol"]:
+            raise AssertionError()
+
+    def _other_satoshis(self, other):
+        """Returns the satoshis of an array, of one amount or of a number"""
+        if isinstance(other, AmountArray):
+            self._check_asset(other.asset)
+            return other.satoshis
+        elif isinstance(other, (AmountValue, Amount, str, dict, list)):
+            other = AmountValue(other, blockchain_instance=self.blockchain)
+            self._check_asset(other.asset)
+            return other.satoshis
+        return _to_satoshis(str(other), self.asset["precision"])
+
+    def __add__(self, other):
+        return self._new(self.satoshis + self._other_satoshis(other))
+
+    def __radd__(self, other):
+        # Allows sum() of arrays
+        return self + other
+
+    def __sub__(self, other):
+        return self._new(self.satoshis - self._other_satoshis(other))
+
+    def __neg__(self):
+        return self._new(-self.satoshis)
+
+    def __mul__(self, other):
+        if isinstance(other, AmountArray):
+            raise TypeError("Amounts can only be multiplied by a price or a number")
+        if isinstance(other, (Price, PriceValue)):
+            # Price or PriceValue: quote * base / quote = base
+            if other["quote"]["symbol"] != self.asset["symbol"]:
+                raise AssertionError()
+            base_asset = _resolve_asset(other["base"]["asset"], self.blockchain)
+            fraction = (
+                Fraction(other["base"]["amount"])
+                / Fraction(other["quote"]["amount"])
+                * Fraction(10) ** (base_asset["precision"] - self.asset["precision"])
+            )
+            return self._new(_mul_fraction(self.satoshis, fraction), asset=base_asset)
+        return self._new(_mul_fraction(self.satoshis, Fraction(str(other))))
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __truediv__(self, other):
+        return self._new(_mul_fraction(self.satoshis, 1 / Fraction(str(other))))
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+from decimal import ROUND_DOWN, Decimal
+
+from nectar.instance import shared_blockchain_instance
+
+from .amount import Amount
+from .asset import AssetRegistry, InternedAsset, get_asset
+from .exceptions import InvalidAssetException
+from .price import Price
+
+
+def _to_satoshis(value, precision):
+    """Returns the decimal value as integer number of satoshis, rounded towards zero"""
+    return int(Decimal(value).scaleb(precision).to_integral_value(rounding=ROUND_DOWN))
+
+
+def _resolve_asset(asset, blockchain_instance):
+    """Returns the shared asset of a symbol, NAI, asset id or asset dict"""
+    if isinstance(asset, InternedAsset):
+        return asset
+    if blockchain_instance is None:
+        blockchain_instance = shared_blockchain_instance()
+    if isinstance(asset, dict):
+        interned = AssetRegistry.for_chain(blockchain_instance).get(asset.get("asset"))
+        return interned if interned is not None else asset
+    return get_asset(asset, blockchain_instance)
+
+
+class AmountValue(object):
+    """Compact, immutable amount of an asset
+
+    The amount is stored as integer number of satoshis (``amount * 10 **
+    precision``) together with the shared asset of an
+    :class:`nectar.asset.AssetRegistry`. Only the shared asset keeps a
+    reference to the blockchain instance, the value itself has none. An
+    instance needs about 80 bytes instead of the 1 kB of a
+    :class:`nectar.amount.Amount`, so that millions of balances fit in RAM.
+
+    Arithmetic and comparisons behave like :class:`nectar.amount.Amount` with
+    ``fixed_point_arithmetic=True``: each result is rounded towards zero to
+    the precision of its asset.
+
+    :param amount: the same representations as :class:`nectar.amount.Amount`,
+        e.g. ``"1.000 HIVE"``, a NAI dict, ``[amount, precision, nai]``, an
+        :class:`nectar.amount.Amount` or a number together with ``asset``
+    :param asset: symbol, NAI or asset, when ``amount`` is a number
+    :param Blockchain blockchain_instance: Blockchain instance, which is only used
+        to resolve the asset
+
+    .. code-block:: python
+
+        >>> from nectar import Hive
+        >>> from nectar.amountvalue import AmountValue
+        >>> hive = Hive(offline=True)
+        >>> AmountValue("1.000 HIVE", blockchain_instance=hive) * 3
+        3.000 HIVE
+
+    """
+
+    __slots__ = ["satoshis", "asset"]
+
+    def __init__(self, amount, asset=None, blockchain_instance=None, **kwargs):
+        if blockchain_instance is None:
+            if kwargs.get("steem_instance"):
+                blockchain_instance = kwargs["steem_instance"]
+            elif kwargs.get("hive_instance"):
+                blockchain_instance = kwargs["hive_instance"]
+        if asset is None and isinstance(amount, AmountValue):
+            satoshis, asset = amount.satoshis, amount.asset
+        elif asset is None and isinstance(amount, Amount):
+            satoshis = int(amount)
+            asset = _resolve_asset(amount["asset"], amount.blockchain)
+        elif asset is None and isinstance(amount, str):
+            value, symbol = amount.split(" ")
+            asset = _resolve_asset(symbol, blockchain_instance)
+            satoshis = _to_satoshis(value, asset["precision"])
+        elif asset is None and isinstance(amount, list) and len(amount) == 3:
+            asset = _resolve_asset(amount[2], blockchain_instance)
+            satoshis = self._satoshis_from_precision(amount[0], amount[1], asset)
+        elif asset is None and isinstance(amount, dict) and "amount" in amount and "nai" in amount:
+            asset = _resolve_asset(amount["nai"], blockchain_instance)
+            satoshis = self._satoshis_from_precision(
+                amount["amount"], amount.get("precision", asset["precision"]), asset
+            )
+        elif (
+            asset is None
+            and isinstance(amount, dict)
+            and "amount" in amount
+            and ("asset_id" in amount or "asset" in amount)
+        ):
+            asset = _resolve_asset(amount.get("asset_id", amount.get("asset")), blockchain_instance)
+            satoshis = int(amount["amount"])
+        elif asset is not None and isinstance(amount, (int, float, Decimal, str)):
+            asset = _resolve_asset(asset, blockchain_instance)
+            if isinstance(amount, float):
+                amount = str(amount)
+            satoshis = _to_satoshis(amount, asset["precision"])
+        else:
+            raise ValueError("Couldn't parse 'AmountValue'.")
+        object.__setattr__(self, "satoshis", satoshis)
+        object.__setattr__(self, "asset", asset)
+
+    @staticmethod
+    def _satoshis_from_precision(amount, precision, asset):
+        if int(precision) == asset["precision"]:
+            return int(amount)
+        return _to_satoshis(Decimal(amount).scaleb(-int(precision)), asset["precision"])
+
+    @classmethod
+    def from_satoshis(cls, satoshis, asset):
+        """Returns a new instance from an integer number of satoshis and an asset"""
+        value = object.__new__(cls)
+        object.__setattr__(value, "satoshis", int(satoshis))
+        object.__setattr__(value, "asset", asset)
+        return value
+
+    @classmethod
+    def from_amount(cls, amount):
+        """Returns the value of a :class:`nectar.amount.Amount`"""
+        return cls(amount)
+
+    def to_amount(self, fixed_point_arithmetic=False, blockchain_instance=None):
+        """Returns the value as :class:`nectar.amount.Amount`
+
+        :param bool fixed_point_arithmetic: fixed point arithmetic of the new amount
+        :param Blockchain blockchain_instance: Blockchain instance of the new amount,
+            the instance of the asset is used when not set
+        """
+        return Amount(
+            self.amount_decimal,
+            self.asset,
+            fixed_point_arithmetic=fixed_point_arithmetic,
+            blockchain_instance=blockchain_instance or getattr(self.asset, "blockchain", None),
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("AmountValue is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (AmountValue.from_satoshis, (self.satoshis, self.asset))
+
+    @property
+    def precision(self):
+        """Returns the precision of the asset"""
+        return self.asset["precision"]
+
+    @property
+    def symbol(self):
+        """Returns the symbol of the asset"""
+        return self.asset["symbol"]
+
+    @property
+    def amount(self):
+        """Returns the amount as float"""
+        return float(self.amount_decimal)
+
+    @property
+    def amount_decimal(self):
+        """Returns the amount as decimal"""
+        return Decimal(self.satoshis).scaleb(-self.asset["precision"])
+
+    def __getitem__(self, key):
+        # Read access of the dict API of Amount
+        if key == "amount":
+            return self.amount_decimal
+        elif key == "symbol":
+            return self.symbol
+        elif key == "asset":
+            return self.asset
+        raise KeyError(key)
+
+    def tuple(self):
+        return float(self), self.symbol
+
+    def json(self, new_appbase_format=True):
+        """Returns the amount in the appbase format, as NAI dict or as list"""
+        if new_appbase_format:
+            return {
+                "amount": str(self.satoshis),
+                "nai": self.asset["asset"],
+                "precision": self.asset["precision"],
+            }
+        return [str(self.satoshis), self.asset["precision"], self.asset["asset"]]
+
+    def __str__(self):
+        return "{:.{prec}f} {}".format(
+            self.amount_decimal, self.asset["symbol"], prec=self.asset["precision"]
+        )
+
+    __repr__ = __str__
+
+    def __float__(self):
+        return float(self.amount_decimal)
+
+    def __int__(self):
+        return self.satoshis
+
+    def __hash__(self):
+        return hash(self.amount_decimal)
+
+    def _check_asset(self, other):
+        asset = other.asset
+        if asset is self.asset:
+            return
+        if not (
+            asset["symbol"] == self.asset["symbol"]
+            and asset["asset"] == self.asset["asset"]
+            and asset["precision"] == self.asset["precision"]
+        ):
+            raise AssertionError()
+
+    def _new(self, value, asset=None):
+        """Returns a new instance of the decimal value, rounded towards zero"""
+        asset = asset or self.asset
+        return AmountValue.from_satoshis(_to_satoshis(value, asset["precision"]), asset)
+
+    def __add__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return AmountValue.from_satoshis(self.satoshis + other.satoshis, self.asset)
+        return self._new(self.amount_decimal + Decimal(other))
+
+    def __radd__(self, other):
+        # Allows sum() of values
+        return self + other
+
+    def __sub__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return AmountValue.from_satoshis(self.satoshis - other.satoshis, self.asset)
+        return self._new(self.amount_decimal - Decimal(other))
+
+    def __mul__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return self._new(self.amount_decimal * other.amount_decimal)
+        elif isinstance(other, PriceValue):
+            if not self.asset == other.quote.asset:
+                raise AssertionError()
+            return self._new(self.amount_decimal * other.price, other.base.asset)
+        elif isinstance(other, int):
+            return AmountValue.from_satoshis(self.satoshis * other, self.asset)
+        return self._new(self.amount_decimal * Decimal(other))
+
+    def __truediv__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return PriceValue(self, other)
+        elif isinstance(other, PriceValue):
+            if not self.asset == other.base.asset:
+                raise AssertionError()
+            return self._new(self.amount_decimal / other.price, other.quote.asset)
+        return self._new(self.amount_decimal / Decimal(other))
+
+    def __floordiv__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return PriceValue(self, other)
+        return self._new(self.amount_decimal // Decimal(other))
+
+    def __mod__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return self._new(self.amount_decimal % other.amount_decimal)
+        return self._new(self.amount_decimal % Decimal(other))
+
+    def __pow__(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            other = other.amount_decimal
+        return self._new(self.amount_decimal ** Decimal(other))
+
+    def _other_satoshis(self, other):
+        if isinstance(other, AmountValue):
+            self._check_asset(other)
+            return other.satoshis
+        return _to_satoshis(other or 0, self.asset["precision"])
+
+    def __lt__(self, other):
+        return self.satoshis < self._other_satoshis(other)
+
+    def __le__(self, other):
+        return self.satoshis <= self._other_satoshis(other)
+
+    def __eq__(self, other):
+        return self.satoshis == self._other_satoshis(other)
+
+    def __ne__(self, other):
+        return self.satoshis != self._other_satoshis(other)
+
+    def __ge__(self, other):
+        return self.satoshis >= self._other_satoshis(other)
+
+    def __gt__(self, other):
+        return self.satoshis > self._other_satoshis(other)
+
+
+class PriceValue(object):
+    """Compact, immutable price of two :class:`AmountValue`, ``base`` per ``quote``
+
+    Arithmetic and comparisons behave like :class:`nectar.price.Price`, amounts
+    which result from it are rounded towards zero to the precision of their asset.
+
+    :param base: base amount, or a :class:`nectar.price.Price` or dict with
+        ``base`` and ``quote``
+    :param quote: quote amount
+    :param Blockchain blockchain_instance: Blockchain instance, which is only used
+        to resolve the assets
+
+    .. code-block:: python
+
+        >>> from nectar import Hive
+        >>> from nectar.amountvalue import AmountValue, PriceValue
+        >>> hive = Hive(offline=True)
+        >>> price = PriceValue("0.250 HBD", "1.000 HIVE", blockchain_instance=hive)
+        >>> AmountValue("10.000 HIVE", blockchain_instance=hive) * price
+        2.500 HBD
+
+    """
+
+    __slots__ = ["base", "quote"]
+
+    def __init__(self, base, quote=None, blockchain_instance=None, **kwargs):
+        if quote is None and isinstance(base, dict) and "base" in base and "quote" in base:
+            base, quote = base["base"], base["quote"]
+        if quote is None:
+            raise ValueError("Couldn't parse 'PriceValue'.")
+        object.__setattr__(
+            self, "base", AmountValue(base, blockchain_instance=blockchain_instance, **kwargs)
+        )
+        object.__setattr__(
+            self, "quote", AmountValue(quote, blockchain_instance=blockchain_instance, **kwargs)
+        )
+
+    @classmethod
+    def from_price(cls, price):
+        """Returns the value of a :class:`nectar.price.Price`"""
+        return cls(price["base"], price["quote"])
+
+    def to_price(self, blockchain_instance=None):
+        """Returns the value as :class:`nectar.price.Price`
+
+        :param Blockchain blockchain_instance: Blockchain instance of the new price,
+            the instance of the base asset is used when not set
+        """
+        if blockchain_instance is None:
+            blockchain_instance = getattr(self.base.asset, "blockchain", None)
+        return Price(
+            None,
+            base=self.base.to_amount(blockchain_instance=blockchain_instance),
+            quote=self.quote.to_amount(blockchain_instance=blockchain_instance),
+            blockchain_instance=blockchain_instance,
+        )
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PriceValue is immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (PriceValue, (self.base, self.quote))
+
+    @property
+    def price(self):
+        """Returns base per quote as decimal"""
+        if self.quote.satoshis == 0:
+            return float("Inf")
+        return self.base.amount_decimal / self.quote.amount_decimal
+
+    def __getitem__(self, key):
+        # Read access of the dict API of Price
+        if key == "price":
+            return self.price
+        elif key == "base":
+            return self.base
+        elif key == "quote":
+            return self.quote
+        raise KeyError(key)
+
+    def symbols(self):
+        return self.base.symbol, self.quote.symbol
+
+    def invert(self):
+        """Returns the inverted price (e.g. ``HIVE/HBD`` from ``HBD/HIVE``)"""
+        return PriceValue(self.quote, self.base)
+
+    def as_base(self, base):
+        """Returns the price with ``base`` as base asset"""
+        if base == self.base.symbol:
+            return self
+        elif base == self.quote.symbol:
+            return self.invert()
+        raise InvalidAssetException
+
+    def as_quote(self, quote):
+        """Returns the price with ``quote`` as quote asset"""
+        if quote == self.quote.symbol:
+            return self
+        elif quote == self.base.symbol:
+            return self.invert()
+        raise InvalidAssetException
+
+    def json(self, new_appbase_format=True):
+        return {
+            "base": self.base.json(new_appbase_format),
+            "quote": self.quote.json(new_appbase_format),
+        }
+
+    def __repr__(self):
+        return "{price:.{precision}f} {base}/{quote}".format(
+            price=self.price,
+            base=self.base.symbol,
+            quote=self.quote.symbol,
+            precision=self.base.precision + self.quote.precision,
+        )
+
+    __str__ = __repr__
+
+    def __float__(self):
+        return float(self.price)
+
+    def __hash__(self):
+        return hash((self.price, self.base.symbol, self.quote.symbol))
+
+    def _check_other(self, other):
+        if not other.base.symbol == self.base.symbol:
+            raise AssertionError()
+        if not other.quote.symbol == self.quote.symbol:
+            raise AssertionError()
+
+    def __mul__(self, other):
+        if isinstance(other, PriceValue):
+            if self.quote.symbol not in other.symbols() and self.base.symbol not in other.symbols():
+                raise InvalidAssetException
+            # a/b * b/c = a/c
+            if self.quote.symbol == other.base.symbol:
+                base_asset, quote_asset = self.base.asset, other.quote.asset
+            # a/b * c/a = c/b
+            elif self.base.symbol == other.quote.symbol:
+                base_asset, quote_asset = other.base.asset, self.quote.asset
+            else:
+                raise ValueError("Wrong rotation of prices")
+            base = self.base.amount_decimal * other.base.amount_decimal
+            quote = self.quote.amount_decimal * other.quote.amount_decimal
+            return PriceValue(self.base._new(base, base_asset), self.quote._new(quote, quote_asset))
+        elif isinstance(other, AmountValue):
+            return other * self
+        return PriceValue(self.base * other, self.quote)
+
+    def __truediv__(self, other):
+        if isinstance(other, PriceValue):
+            if sorted(self.symbols()) == sorted(other.symbols()):
+                return float(self) / float(other.as_base(self.base.symbol))
+            elif self.quote.symbol in other.symbols():
+                other = other.as_base(self.quote.symbol)
+            elif self.base.symbol in other.symbols():
+                other = other.as_base(self.base.symbol)
+            else:
+                raise InvalidAssetException
+            base = self.base.amount_decimal / other.base.amount_decimal
+            quote = self.quote.amount_decimal / other.quote.amount_decimal
+            return PriceValue(
+                self.base._new(base, other.quote.asset), self.quote._new(quote, self.quote.asset)
+            )
+        elif isinstance(other, AmountValue):
+            if not other.asset == self.quote.asset:
+                raise AssertionError()
+            return other._new(other.amount_decimal / self.price, self.base.asset)
+        return PriceValue(self.base / other, self.quote)
+
+    def __floordiv__(self, other):
+        raise NotImplementedError("This is not possible as the price is a ratio")
+
+    def _other_price(self, other):
+        if isinstance(other, PriceValue):
+            self._check_other(other)
+            return other.price
+        return float(other or 0)
+
+    def __lt__(self, other):
+        return self.price < self._other_price(other)
+
+    def __le__(self, other):
+        return self.price <= self._other_price(other)
+
+    def __eq__(self, other):
+        return self.price == self._other_price(other)
+
+    def __ne__(self, other):
+        return self.price != self._other_price(other)
+
+    def __ge__(self, other):
+        return self.price >= self._other_price(other)
+
+    def __gt__(self, other):
+        return self.price > self._other_price(other)
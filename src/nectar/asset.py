@@ -1,4 +1,6 @@
 # -*- coding: utf-8 -*-
+import threading
+
 from .blockchainobject import BlockchainObject
 from .exceptions import AssetDoesNotExistsException
 
@@ -80,3 +82,192 @@ class Asset(BlockchainObject):
             )
         else:
             return self["symbol"] != other
+
+
+class InternedAsset(Asset):
+    """Immutable asset of an :class:`AssetRegistry`, which is shared by all
+    amounts of the asset. Use ``dict(asset)`` or ``asset.copy()`` for a
+    changeable copy.
+    """
+
+    def __init__(self, data, blockchain_instance=None):
+        super(InternedAsset, self).__init__(
+            data, lazy=True, use_cache=False, blockchain_instance=blockchain_instance
+        )
+        # All data is known, refresh() must not be called
+        self.cached = True
+        self.identifier = self["symbol"]
+
+    def refresh(self):
+        pass
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError("Interned assets can not be changed, use asset.copy()")
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        # Unpickling would change the asset, it is looked up in its registry instead
+        return (
+            _unpickle_interned_asset,
+            (getattr(self, "registry_key", None), dict(self), self.blockchain),
+        )
+
+    def __hash__(self):
+        return id(self)
+
+
+def _unpickle_interned_asset(registry_key, data, blockchain_instance):
+    """Returns the interned asset of the unpickled data
+
+    The blockchain instance may not be unpickled completely yet, so that the
+    registry is found by its key. A registry, which is missing in this
+    process, is created from the key. Without key, a plain :class:`Asset` is
+    returned.
+    """
+    if registry_key is not None:
+        registry = AssetRegistry.get_registry(registry_key, blockchain_instance)
+        asset = registry.get(data["symbol"])
+        if asset is not None and asset == data:
+            return asset
+    asset = Asset(data, lazy=True, use_cache=False, blockchain_instance=blockchain_instance)
+    asset.cached = True
+    return asset
+
+
+class AssetRegistry(object):
+    """Interned assets of one chain
+
+    The ``chain_assets`` of the chain are resolved once. Symbol, NAI and asset
+    id of an asset map to the same shared :class:`InternedAsset`, so that
+    :class:`nectar.amount.Amount` does not create a new :class:`Asset` for each
+    amount.
+
+    :param list chain_assets: ``chain_assets`` of the chain parameters
+    :param str chain_id: chain id
+    :param Blockchain blockchain_instance: Blockchain instance
+
+    .. code-block:: python
+
+        >>> from nectar import Hive
+        >>> from nectar.asset import AssetRegistry
+        >>> hive = Hive(offline=True)
+        >>> registry = AssetRegistry.for_chain(hive)
+        >>> registry["HBD"] is registry["@@000000013"]
+        True
+
+    """
+
+    _chain_registries = {}
+    _chain_registries_lock = threading.Lock()
+
+    def __init__(self, chain_assets, chain_id=None, blockchain_instance=None, key=None):
+        self.chain_id = chain_id
+        self.key = key
+        self.assets = []
+        self._index = {}
+        for data in chain_assets:
+            asset = InternedAsset(
+                {
+                    "asset": data["asset"],
+                    "precision": data["precision"],
+                    "id": data["id"],
+                    "symbol": data["symbol"],
+                },
+                blockchain_instance=blockchain_instance,
+            )
+            asset.registry_key = key
+            self.assets.append(asset)
+            for identifier in (data["symbol"], data["asset"], data["id"]):
+                self._index.setdefault(identifier, asset)
+
+    @classmethod
+    def for_chain(cls, blockchain_instance):
+        """Returns the registry of the chain of a blockchain instance, which is
+        shared in this process. The chain parameters are only read on the first
+        call of each instance.
+        """
+        rpc = getattr(blockchain_instance, "rpc", None)
+        chain_id = getattr(rpc, "chain_id", None)
+        registry = getattr(blockchain_instance, "_asset_registry", None)
+        if registry is not None and (chain_id is None or registry.chain_id == chain_id):
+            return registry
+        chain_params = blockchain_instance.get_network()
+        if chain_params is None:
+            from nectargraphenebase.chains import known_chains
+
+            chain_params = known_chains["HIVE"]
+        chain_id = chain_params.get("chain_id", chain_id)
+        # Chains may share a chain id (e.g. testnets), so that the assets are part of the key
+        key = (chain_id,) + tuple(
+            (a["symbol"], a["asset"], a["precision"], a["id"]) for a in chain_params["chain_assets"]
+        )
+        registry = cls.get_registry(key, blockchain_instance)
+        blockchain_instance._asset_registry = registry
+        return registry
+
+    @classmethod
+    def get_registry(cls, key, blockchain_instance):
+        """Returns the registry of a key ``(chain_id, (symbol, asset, precision,
+        id), ...)``, which is created when it is missing in this process
+        """
+        with cls._chain_registries_lock:
+            registry = cls._chain_registries.get(key)
+            if registry is None:
+                registry = cls(
+                    [
+                        {"symbol": symbol, "asset": asset, "precision": precision, "id": asset_id}
+                        for symbol, asset, precision, asset_id in key[1:]
+                    ],
+                    chain_id=key[0],
+                    blockchain_instance=blockchain_instance,
+                    key=key,
+                )
+                cls._chain_registries[key] = registry
+        return registry
+
+    def get(self, identifier, default=None):
+        """Returns the asset of a symbol, NAI or asset id, or default"""
+        try:
+            return self._index.get(identifier, default)
+        except TypeError:
+            # Unhashable identifiers, e.g. asset dicts
+            return default
+
+    def __getitem__(self, identifier):
+        asset = self.get(identifier)
+        if asset is None:
+            raise AssetDoesNotExistsException(str(identifier))
+        return asset
+
+    def __contains__(self, identifier):
+        return self.get(identifier) is not None
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __len__(self):
+        return len(self.assets)
+
+
+def get_asset(identifier, blockchain_instance):
+    """Returns the interned asset of a symbol, NAI or asset id, see
+    :class:`AssetRegistry`. Assets which are not part of the chain assets
+    are returned as new :class:`Asset`.
+    """
+    asset = AssetRegistry.for_chain(blockchain_instance).get(identifier)
+    if asset is None:
+        asset = Asset(identifier, blockchain_instance=blockchain_instance)
+    return asset
@@ -436,9 +436,12 @@ class Blocks(list):
 
         self.blockchain.rpc.set_next_node_on_empty_reply(False)
 
+        # The blocks are decoded one by one while the reply is read
         blocks = self.blockchain.rpc.get_block_range(
-            {"starting_block_num": starting_block_num, "count": count}, api="block"
-        )["blocks"]
+            {"starting_block_num": starting_block_num, "count": count},
+            api="block",
+            stream_path=("result", "blocks"),
+        )
 
         super(Blocks, self).__init__(
             [Block(x, lazy=lazy, full=full, blockchain_instance=self.blockchain) for x in blocks]
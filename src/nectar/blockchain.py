@@ -3,31 +3,35 @@ import hashlib
 import json
 import logging
 import math
+import multiprocessing
 import time
-from datetime import timedelta
+from collections import deque
+from datetime import datetime, timedelta, timezone
 from queue import Queue
 from threading import Event, Thread
 from time import sleep
 
-import nectar as stm
 from nectar.instance import shared_blockchain_instance
-from nectarapi.exceptions import UnknownTransaction
+from nectarapi.exceptions import ApiNotSupported, UnknownTransaction
+from nectarbase.operationids import getVirtualOperationFilter
 
-from .block import Block, BlockHeader
+from .block import Block, BlockHeader, Blocks
+from .blocktimeindex import BlockTimeIndex
 from .exceptions import (
     BatchedCallsNotSupported,
+    BlockchainForkTooDeep,
     BlockDoesNotExistsException,
     BlockWaitTimeExceeded,
     OfflineHasNoRPCException,
 )
-from .utils import addTzInfo
+from .utils import addTzInfo, formatTimeString
 
 log = logging.getLogger(__name__)
 
 FUTURES_MODULE = None
 if not FUTURES_MODULE:
     try:
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        from concurrent.futures import ThreadPoolExecutor
 
         FUTURES_MODULE = "futures"
         # FUTURES_MODULE = None
@@ -177,6 +181,85 @@ class Pool:
         return results
 
 
+# blockchain instance of a worker process, created by _init_block_worker
+_worker_blockchain = None
+
+
+def _init_block_worker(blockchain_class, blockchain_kwargs):
+    """Creates the blockchain instance (and thereby the rpc connection) of a worker process"""
+    global _worker_blockchain
+    _worker_blockchain = blockchain_class(**blockchain_kwargs)
+
+
+def _fetch_block_shard(task):
+    """Fetches and parses the blocks of a shard in a worker process
+
+    ``task`` is a tuple of (start, stop, only_ops, only_virtual_ops, opNames, raw_ops,
+    yield_ops). Returns a list of block dicts, or a list of operations in the format of
+    :func:`Blockchain.stream` when ``yield_ops`` is True.
+    """
+    start, stop, only_ops, only_virtual_ops, opNames, raw_ops, yield_ops = task
+    blockchain = _worker_blockchain
+    blocks = []
+    block_num = start
+    if not only_ops and not only_virtual_ops and blockchain.rpc.get_use_appbase():
+        try:
+            while block_num <= stop:
+                block_range = Blocks(
+                    block_num, count=min(1000, stop - block_num + 1), blockchain_instance=blockchain
+                )
+                if len(block_range) == 0:
+                    break
+                blocks.extend(block_range)
+                block_num = int(block_range[-1].block_num) + 1
+        except ApiNotSupported:
+            pass
+    while block_num <= stop:
+        blocks.append(
+            Block(
+                block_num,
+                only_ops=only_ops,
+                only_virtual_ops=only_virtual_ops,
+                blockchain_instance=blockchain,
+            )
+        )
+        block_num += 1
+    ret = []
+    for block in blocks:
+        block["id"] = block.block_num
+        if yield_ops:
+            ret.extend(Blockchain.block_ops(block, opNames=opNames, raw_ops=raw_ops))
+        else:
+            ret.append(dict(block))
+    return ret
+
+
+class _CheckpointWriter(object):
+    """Stores the acknowledged positions of a stream in a checkpoint store
+
+    A position is written after ``interval`` acknowledged positions and by
+    :func:`flush`, so that not every operation costs a disk sync.
+    """
+
+    def __init__(self, checkpoint_store, checkpoint_name, interval):
+        self.checkpoint_store = checkpoint_store
+        self.checkpoint_name = checkpoint_name
+        self.interval = max(1, interval)
+        self.position = None
+        self.count = 0
+
+    def acknowledge(self, position):
+        self.position = position
+        self.count += 1
+        if self.count >= self.interval:
+            self.flush()
+
+    def flush(self):
+        if self.count > 0:
+            self.checkpoint_store.set_checkpoint(self.checkpoint_name, self.position)
+            self.count = 0
+
+
 class Blockchain(object):
     """This class allows to access the blockchain and read data
     from it
@@ -186,6 +269,15 @@ class Blockchain(object):
         actual head block (``head``)
     :param int max_block_wait_repetition: maximum wait repetition for next block
         where each repetition is block_interval long (default is 3)
+    :param float block_poll_offset: seconds after the expected production time of the
+        next block, at which the node is polled for it (default is 0.3)
+    :param float block_poll_backoff: first retry delay in seconds, when the next block
+        has not arrived at its expected time. The delay doubles with each retry, up to
+        block_interval (default is 0.25)
+    :param block_time_index: :class:`nectar.blocktimeindex.BlockTimeIndex` which
+        speeds up :func:`get_estimated_block_num`. When True, a persisted index which
+        is shared by all instances of the same chain is used. False (default)
+        disables the index.
 
     This class let's you deal with blockchain related data and methods.
     Read blockchain related data:
@@ -233,6 +325,9 @@ class Blockchain(object):
         mode="irreversible",
         max_block_wait_repetition=None,
         data_refresh_time_seconds=900,
+        block_poll_offset=0.3,
+        block_poll_backoff=0.25,
+        block_time_index=False,
         **kwargs,
     ):
         if blockchain_instance is None:
@@ -253,6 +348,12 @@ class Blockchain(object):
         else:
             self.max_block_wait_repetition = 3
         self.block_interval = self.blockchain.get_block_interval()
+        self.block_poll_offset = block_poll_offset
+        self.block_poll_backoff = block_poll_backoff
+        self.head_block_time = None
+        self.delivery_lag = None
+        self._block_time_index = block_time_index
+        self._prefetch_instances = None
 
     def is_irreversible_mode(self):
         return self.mode == "last_irreversible_block_num"
@@ -306,8 +407,38 @@ class Blockchain(object):
             raise ValueError("Could not receive dynamic_global_properties!")
         if self.mode not in props:
             raise ValueError(self.mode + " is not in " + str(props))
+        if isinstance(props.get("time"), str):
+            self.head_block_time = formatTimeString(props["time"])
         return int(props.get(self.mode))
 
+    def next_block_delay(self, retry=0):
+        """Returns the number of seconds to wait before the next block should be
+        requested.
+
+        The production time of the next block is predicted from the time of the
+        head block, as received by the last :func:`get_current_block_num` call.
+        When the predicted time has already passed, a short backoff is returned,
+        which doubles with every retry.
+
+        :param int retry: number of polls which did not return a new block
+        """
+        if self.head_block_time is None:
+            return self.block_interval
+        next_block_time = self.head_block_time + timedelta(seconds=self.block_interval)
+        delay = (next_block_time - datetime.now(timezone.utc)).total_seconds()
+        delay += self.block_poll_offset
+        if delay > 0 and retry == 0:
+            return min(delay, self.block_interval)
+        return min(self.block_poll_backoff * 2**retry, self.block_interval)
+
+    def _update_delivery_lag(self, block):
+        """Stores the seconds between the production and the delivery of the block"""
+        block_time = block.get("timestamp") if isinstance(block, dict) else None
+        if not isinstance(block_time, datetime) or block_time.year <= 1970:
+            return
+        self.delivery_lag = (datetime.now(timezone.utc) - block_time).total_seconds()
+        log.debug(f"Block {block.identifier} delivered after {self.delivery_lag:.3f} s")
+
     def get_current_block(self, only_ops=False, only_virtual_ops=False):
         """This call returns the current block
 
@@ -342,26 +473,50 @@ class Blockchain(object):
             True
 
         """
-        last_block = self.get_current_block()
         date = addTzInfo(date)
-        if estimateForwards:
-            block_offset = 10
-            first_block = BlockHeader(block_offset, blockchain_instance=self.blockchain)
-            time_diff = date - first_block.time()
-            block_number = math.floor(
-                time_diff.total_seconds() / self.block_interval + block_offset
-            )
+        block_time_index = self.get_block_time_index()
+        bounds = None
+        if block_time_index is not None and not estimateForwards:
+            bounds = block_time_index.bounds(date)
+        last_irreversible_block_num = None
+        if block_time_index is not None and not self.is_irreversible_mode():
+            if bounds is None or accurate:
+                # Only irreversible blocks are added to the index
+                props = self.blockchain.get_dynamic_global_properties()
+                last_irreversible_block_num = 0
+                if props is not None:
+                    last_irreversible_block_num = int(props["last_irreversible_block_num"])
+        if bounds is not None:
+            # The date lies between two known blocks, no api call is needed
+            block_number = block_time_index.estimate(date)
+            max_block_num = bounds[1]
         else:
-            time_diff = last_block.time() - date
-            block_number = math.floor(
-                last_block.identifier - time_diff.total_seconds() / self.block_interval
+            last_block = self.get_current_block()
+            self._add_block_time(
+                block_time_index,
+                last_block.identifier,
+                last_block.time(),
+                last_irreversible_block_num,
             )
+            max_block_num = last_block.identifier
+            if estimateForwards:
+                block_offset = 10
+                first_block = BlockHeader(block_offset, blockchain_instance=self.blockchain)
+                time_diff = date - first_block.time()
+                block_number = math.floor(
+                    time_diff.total_seconds() / self.block_interval + block_offset
+                )
+            else:
+                time_diff = last_block.time() - date
+                block_number = math.floor(
+                    last_block.identifier - time_diff.total_seconds() / self.block_interval
+                )
         if block_number < 1:
             block_number = 1
 
         if accurate:
-            if block_number > last_block.identifier:
-                block_number = last_block.identifier
+            if block_number > max_block_num:
+                block_number = max_block_num
             block_time_diff = timedelta(seconds=10)
 
             last_block_time_diff_seconds = 10
@@ -372,6 +527,9 @@ class Blockchain(object):
                 or block_time_diff.total_seconds() < -self.block_interval
             ):
                 block = BlockHeader(block_number, blockchain_instance=self.blockchain)
+                self._add_block_time(
+                    block_time_index, block_number, block.time(), last_irreversible_block_num
+                )
                 second_last_block_time_diff_seconds = last_block_time_diff_seconds
                 last_block_time_diff_seconds = block_time_diff.total_seconds()
                 block_time_diff = date - block.time()
@@ -388,11 +546,35 @@ class Blockchain(object):
                 block_number += delta
                 if block_number < 1:
                     break
-                if block_number > last_block.identifier:
+                if block_number > max_block_num:
                     break
 
         return int(block_number)
 
+    def get_block_time_index(self):
+        """Returns the :class:`nectar.blocktimeindex.BlockTimeIndex` which is used
+        by :func:`get_estimated_block_num`, or None when it is disabled.
+        """
+        if self._block_time_index is True:
+            if not self.blockchain.is_connected():
+                return None
+            chain_id = self.blockchain.chain_params["chain_id"]
+            self._block_time_index = BlockTimeIndex.for_chain(chain_id)
+        elif self._block_time_index is False:
+            return None
+        return self._block_time_index
+
+    def _add_block_time(
+        self, block_time_index, block_num, block_time, last_irreversible_block_num=None
+    ):
+        """Adds a block to the block time index, blocks above
+        ``last_irreversible_block_num`` are skipped"""
+        if block_time_index is None or block_time is None:
+            return
+        if last_irreversible_block_num is not None and block_num > last_irreversible_block_num:
+            return
+        block_time_index.add(block_num, block_time)
+
     def block_time(self, block_num):
         """Returns a datetime of the block with the given block
         number.
@@ -433,6 +615,11 @@ class Blockchain(object):
         thread_num=8,
         only_ops=False,
         only_virtual_ops=False,
+        block_range_size=None,
+        prefetch_window=None,
+        checkpoint_store=None,
+        checkpoint_name="blocks",
+        checkpoint_interval=100,
     ):
         """Yields blocks starting from ``start``.
 
@@ -445,142 +632,155 @@ class Blockchain(object):
         :param bool only_ops: Only yield operations (default: False).
             Cannot be combined with ``only_virtual_ops=True``.
         :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param int block_range_size: only for appbase nodes. When not None, blocks are
+            fetched with ``block_api.get_block_range`` in chunks of ``block_range_size``
+            blocks as long as the stream is at least one chunk behind the head block.
+            The remaining blocks are fetched one by one. Nodes limit the range to
+            1000 blocks per call. Has no effect when ``only_ops`` or ``only_virtual_ops``
+            is set (default: None)
+        :param int prefetch_window: Number of blocks which are fetched ahead of the last
+            yielded block, when `threading` is set (default: 2 * thread_num)
+        :param checkpoint_store: When set, the position after the last acknowledged block is
+            stored under ``checkpoint_name`` and the stream resumes from there, ignoring
+            ``start``. A block is acknowledged when the next block is requested. Can be
+            one of the checkpoint stores from :mod:`nectarstorage`, e.g.
+            :class:`nectarstorage.SqliteCheckpointStore` (default: None)
+        :param str checkpoint_name: Name of the checkpoint (default: "blocks")
+        :param int checkpoint_interval: The checkpoint is stored after this number of
+            acknowledged blocks and when the stream ends. After a crash, at most this
+            number of blocks is yielded again (default: 100)
 
         .. note:: If you want instant confirmation, you need to instantiate
                   class:`nectar.blockchain.Blockchain` with
                   ``mode="head"``, otherwise, the call will wait until
-                  confirmed in an irreversible block.
+                  confirmed in an irreversible block. Head blocks can be
+                  orphaned by a fork, use :func:`head_block_events` to be
+                  notified about rollbacks.
 
         """
+        kwargs = {
+            "max_batch_size": max_batch_size,
+            "threading": threading,
+            "thread_num": thread_num,
+            "only_ops": only_ops,
+            "only_virtual_ops": only_virtual_ops,
+            "block_range_size": block_range_size,
+            "prefetch_window": prefetch_window,
+        }
+        if checkpoint_store is None:
+            for block in self._record_block_times(self._blocks(start=start, stop=stop, **kwargs)):
+                yield block
+            return
+        checkpoint = checkpoint_store.get_checkpoint(checkpoint_name)
+        if checkpoint is not None:
+            start = checkpoint[0]
+            if stop and start > stop:
+                return
+        writer = _CheckpointWriter(checkpoint_store, checkpoint_name, checkpoint_interval)
+        try:
+            for block in self._record_block_times(self._blocks(start=start, stop=stop, **kwargs)):
+                yield block
+                writer.acknowledge((int(block.block_num) + 1, -1, -1))
+        finally:
+            writer.flush()
+
+    def _record_block_times(self, blocks):
+        """Adds the times of irreversible blocks to the block time index while
+        they are yielded"""
+        block_time_index = None
+        if self.mode == "last_irreversible_block_num":
+            block_time_index = self.get_block_time_index()
+        if block_time_index is None:
+            for block in blocks:
+                yield block
+            return
+        for block in blocks:
+            block_time = block.get("timestamp")
+            if isinstance(block_time, datetime) and block.identifier is not None:
+                block_time_index.add(block.identifier, block_time)
+            yield block
+
+    def _blocks(
+        self,
+        start=None,
+        stop=None,
+        max_batch_size=None,
+        threading=False,
+        thread_num=8,
+        only_ops=False,
+        only_virtual_ops=False,
+        block_range_size=None,
+        prefetch_window=None,
+    ):
+        """Yields blocks starting from ``start``, see :func:`blocks`"""
         # Let's find out how often blocks are generated!
         current_block = self.get_current_block()
         current_block_num = current_block.block_num
         if not start:
             start = current_block_num
         head_block_reached = False
-        if threading and FUTURES_MODULE is not None:
-            pool = ThreadPoolExecutor(max_workers=thread_num)
-        elif threading:
-            pool = Pool(thread_num, batch_mode=True)
+        use_block_range = (
+            block_range_size is not None
+            and block_range_size > 0
+            and not only_ops
+            and not only_virtual_ops
+            and self.blockchain.is_connected()
+            and self.blockchain.rpc.get_use_appbase()
+        )
+        if threading and FUTURES_MODULE is None:
+            threading = False
         if threading:
-            blockchain_instance = [self.blockchain]
-            nodelist = self.blockchain.rpc.nodes.export_working_nodes()
-            for i in range(thread_num - 1):
-                blockchain_instance.append(
-                    stm.Steem(
-                        node=nodelist,
-                        num_retries=self.blockchain.rpc.num_retries,
-                        num_retries_call=self.blockchain.rpc.num_retries_call,
-                        timeout=self.blockchain.rpc.timeout,
-                    )
-                )
+            if (
+                self.blockchain.is_connected()
+                and self.blockchain.rpc.ws_pipeline is not None
+                and self.blockchain.rpc.get_use_appbase()
+                and not only_ops
+                and not only_virtual_ops
+            ):
+                # All requests are multiplexed over the pipelined websocket
+                prefetch_instances = None
+            else:
+                prefetch_instances = self._get_prefetch_instances(thread_num)
+            if prefetch_window is None:
+                prefetch_window = 2 * thread_num
+        poll_retry = 0
         # We are going to loop indefinitely
-        latest_block = 0
         while True:
             if stop:
                 head_block = stop
             else:
                 current_block_num = self.get_current_block_num()
                 head_block = current_block_num
+            if use_block_range:
+                # Catch up in chunks of block_range_size while far behind the head block
+                while head_block - start + 1 >= block_range_size:
+                    try:
+                        block_range = self._stream_block_range(start, block_range_size)
+                    except ApiNotSupported as e:
+                        log.warning(f"get_block_range is not supported, disabling it: {e}")
+                        use_block_range = False
+                        break
+                    block_range_start = start
+                    for block in block_range:
+                        yield block
+                        start = int(block.block_num) + 1
+                    if start == block_range_start:
+                        break
+                    if not stop:
+                        current_block_num = self.get_current_block_num()
+                        head_block = current_block_num
             if threading and not head_block_reached:
-                latest_block = start - 1
-                result_block_nums = []
-                for blocknum in range(start, head_block + 1, thread_num):
-                    # futures = []
-                    i = 0
-                    if FUTURES_MODULE is not None:
-                        futures = []
-                    block_num_list = []
-                    # freeze = self.blockchain.rpc.nodes.freeze_current_node
-                    num_retries = self.blockchain.rpc.nodes.num_retries
-                    # self.blockchain.rpc.nodes.freeze_current_node = True
-                    self.blockchain.rpc.nodes.num_retries = thread_num
-                    error_cnt = self.blockchain.rpc.nodes.node.error_cnt
-                    while i < thread_num and blocknum + i <= head_block:
-                        block_num_list.append(blocknum + i)
-                        results = []
-                        if FUTURES_MODULE is not None:
-                            futures.append(
-                                pool.submit(
-                                    Block,
-                                    blocknum + i,
-                                    only_ops=only_ops,
-                                    only_virtual_ops=only_virtual_ops,
-                                    blockchain_instance=blockchain_instance[i],
-                                )
-                            )
-                        else:
-                            pool.enqueue(
-                                Block,
-                                blocknum + i,
-                                only_ops=only_ops,
-                                only_virtual_ops=only_virtual_ops,
-                                blockchain_instance=blockchain_instance[i],
-                            )
-                        i += 1
-                    if FUTURES_MODULE is not None:
-                        try:
-                            results = [r.result() for r in as_completed(futures)]
-                        except Exception as e:
-                            log.error(str(e))
-                    else:
-                        pool.run(True)
-                        pool.join()
-                        for result in pool.results():
-                            results.append(result)
-                        pool.abort()
-                    self.blockchain.rpc.nodes.num_retries = num_retries
-                    # self.blockchain.rpc.nodes.freeze_current_node = freeze
-                    new_error_cnt = self.blockchain.rpc.nodes.node.error_cnt
-                    self.blockchain.rpc.nodes.node.error_cnt = error_cnt
-                    if new_error_cnt > error_cnt:
-                        self.blockchain.rpc.nodes.node.error_cnt += 1
-                    #    self.blockchain.rpc.next()
-
-                    checked_results = []
-                    for b in results:
-                        if b.block_num is not None and int(b.block_num) not in result_block_nums:
-                            b["id"] = b.block_num
-                            b.identifier = b.block_num
-                            checked_results.append(b)
-                            result_block_nums.append(int(b.block_num))
-
-                    missing_block_num = list(set(block_num_list).difference(set(result_block_nums)))
-                    while len(missing_block_num) > 0:
-                        for blocknum in missing_block_num:
-                            try:
-                                block = Block(
-                                    blocknum,
-                                    only_ops=only_ops,
-                                    only_virtual_ops=only_virtual_ops,
-                                    blockchain_instance=self.blockchain,
-                                )
-                                checked_results.append(block)
-                                result_block_nums.append(int(block.block_num))
-                            except Exception as e:
-                                log.error(str(e))
-                        missing_block_num = list(
-                            set(block_num_list).difference(set(result_block_nums))
-                        )
-                    from operator import itemgetter
-
-                    blocks = sorted(checked_results, key=itemgetter("id"))
-                    for b in blocks:
-                        if latest_block < int(b.block_num):
-                            latest_block = int(b.block_num)
-                        yield b
-
-                if latest_block <= head_block:
-                    for blocknum in range(latest_block + 1, head_block + 1):
-                        if blocknum not in result_block_nums:
-                            block = Block(
-                                blocknum,
-                                only_ops=only_ops,
-                                only_virtual_ops=only_virtual_ops,
-                                blockchain_instance=self.blockchain,
-                            )
-                            result_block_nums.append(blocknum)
-                            yield block
+                for block in self._prefetch_blocks(
+                    prefetch_instances,
+                    start,
+                    head_block,
+                    prefetch_window,
+                    only_ops=only_ops,
+                    only_virtual_ops=only_virtual_ops,
+                ):
+                    if head_block_reached:
+                        self._update_delivery_lag(block)
+                    yield block
             elif (
                 max_batch_size is not None
                 and (head_block - start) >= max_batch_size
@@ -589,7 +789,6 @@ class Blockchain(object):
                 if not self.blockchain.is_connected():
                     raise OfflineHasNoRPCException("No RPC available in offline mode!")
                 self.blockchain.rpc.set_next_node_on_empty_reply(False)
-                latest_block = start - 1
                 batches = max_batch_size
                 for blocknumblock in range(start, head_block + 1, batches):
                     # Get full block
@@ -662,7 +861,14 @@ class Blockchain(object):
                         block_number_check_cnt=5,
                         last_current_block_num=current_block_num,
                     )
+                    if head_block_reached:
+                        self._update_delivery_lag(block)
                     yield block
+            # Count the polls which did not return a new block
+            if head_block_reached and start > head_block:
+                poll_retry += 1
+            else:
+                poll_retry = 0
             # Set new start
             start = head_block + 1
             head_block_reached = True
@@ -670,8 +876,306 @@ class Blockchain(object):
             if stop and start > stop:
                 return
 
-            # Sleep for one block
-            time.sleep(self.block_interval)
+            # Sleep until the next block is expected
+            time.sleep(self.next_block_delay(poll_retry))
+
+    def _get_prefetch_instances(self, thread_num):
+        """Returns the queue of blockchain instances used by the threaded block
+        stream and its size. They are created once and reused by later calls.
+        """
+        if self._prefetch_instances is not None and self._prefetch_instances[1] == thread_num:
+            return self._prefetch_instances
+        nodelist = self.blockchain.rpc.nodes.export_working_nodes()
+        instances = Queue()
+        for i in range(thread_num):
+            instances.put(
+                self.blockchain.__class__(
+                    node=nodelist,
+                    num_retries=self.blockchain.rpc.num_retries,
+                    num_retries_call=self.blockchain.rpc.num_retries_call,
+                    timeout=self.blockchain.rpc.timeout,
+                )
+            )
+        self._prefetch_instances = (instances, thread_num)
+        return self._prefetch_instances
+
+    def _stream_block_range(self, start, count):
+        """Returns an iterator over the blocks of one ``get_block_range`` call.
+        The blocks are decoded one by one while the reply is read, so that
+        memory stays flat for large ``count`` values.
+        """
+        self.blockchain.rpc.set_next_node_on_empty_reply(False)
+        blocks = self.blockchain.rpc.get_block_range(
+            {"starting_block_num": start, "count": count},
+            api="block",
+            stream_path=("result", "blocks"),
+        )
+        return self._wrap_block_range(blocks)
+
+    def _wrap_block_range(self, blocks):
+        for data in blocks:
+            block = Block(data, blockchain_instance=self.blockchain)
+            block["id"] = block.block_num
+            block.identifier = block.block_num
+            yield block
+
+    def _prefetch_blocks(
+        self,
+        prefetch_instances,
+        start,
+        stop,
+        prefetch_window,
+        only_ops=False,
+        only_virtual_ops=False,
+    ):
+        """Yields the blocks from ``start`` to ``stop`` in order. Up to ``prefetch_window``
+        blocks ahead of the last yielded block are fetched by a thread pool, so that a
+        slow block does not stall the other threads. The pool is shut down when the
+        generator ends. When ``prefetch_instances`` is None, the blocks are requested
+        at once over the pipelined websocket of the main instance.
+        """
+        pool = None
+        if prefetch_instances is None:
+
+            def submit(block_num):
+                return self.blockchain.rpc.get_block(
+                    {"block_num": block_num}, api="block", return_future=True
+                )
+
+        else:
+            instances, thread_num = prefetch_instances
+            pool = ThreadPoolExecutor(max_workers=thread_num, thread_name_prefix="nectar-prefetch")
+
+            def fetch_block(block_num):
+                blockchain_instance = instances.get()
+                try:
+                    return Block(
+                        block_num,
+                        only_ops=only_ops,
+                        only_virtual_ops=only_virtual_ops,
+                        blockchain_instance=blockchain_instance,
+                    )
+                finally:
+                    instances.put(blockchain_instance)
+
+            def submit(block_num):
+                return pool.submit(fetch_block, block_num)
+
+        futures = {}
+        next_block_num = start
+        try:
+            for block_num in range(start, stop + 1):
+                while next_block_num <= stop and next_block_num - block_num < prefetch_window:
+                    futures[next_block_num] = submit(next_block_num)
+                    next_block_num += 1
+                try:
+                    block = futures.pop(block_num).result()
+                    if block is not None and not isinstance(block, Block):
+                        block = block.get("block")
+                        block = Block(block, blockchain_instance=self.blockchain) if block else None
+                except Exception as e:
+                    log.error(str(e))
+                    block = None
+                if block is None or block.block_num is None or int(block.block_num) != block_num:
+                    # Fetch missing or wrong blocks again with the main instance
+                    block = self.wait_for_and_get_block(
+                        block_num,
+                        only_ops=only_ops,
+                        only_virtual_ops=only_virtual_ops,
+                        block_number_check_cnt=5,
+                        last_current_block_num=stop,
+                    )
+                    if (
+                        block is None
+                        or block.block_num is None
+                        or int(block.block_num) != block_num
+                    ):
+                        raise BlockDoesNotExistsException(
+                            "Block %d could not be received" % block_num
+                        )
+                block["id"] = block.block_num
+                block.identifier = block.block_num
+                yield block
+        finally:
+            for future in futures.values():
+                future.cancel()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    def virtual_ops_blocks(
+        self, start=None, stop=None, opNames=[], limit=1000, block_range_size=2000
+    ):
+        """Yields blocks with virtual operations only, which are fetched by
+        ``account_history_api.enum_virtual_ops`` for whole block ranges. Blocks
+        without (matching) virtual operations are skipped.
+
+        :param int start: Starting block
+        :param int stop: Stop at this block, when not set, new blocks are awaited
+        :param array opNames: List of virtual operations to filter for. The filter is applied
+            by the node.
+        :param int limit: Maximum number of operations per call (default: 1000)
+        :param int block_range_size: Maximum number of blocks per call (default: 2000)
+
+        .. note:: Reversible blocks are only included when the class was instantiated
+                  with ``mode="head"``.
+
+        """
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        op_filter = None
+        if bool(opNames):
+            op_filter = getVirtualOperationFilter(opNames)
+            if op_filter == 0:
+                return
+        if not start:
+            start = self.get_current_block_num()
+        while True:
+            if stop:
+                head_block = stop
+            else:
+                head_block = self.get_current_block_num()
+            block_range_begin = start
+            operation_begin = None
+            pending_block = None
+            while block_range_begin <= head_block:
+                block_range_end = min(block_range_begin + block_range_size, head_block + 1)
+                params = {
+                    "block_range_begin": block_range_begin,
+                    "block_range_end": block_range_end,
+                    "include_reversible": not self.is_irreversible_mode(),
+                    "group_by_block": True,
+                    "limit": limit,
+                }
+                if operation_begin:
+                    params["operation_begin"] = operation_begin
+                if op_filter is not None:
+                    params["filter"] = op_filter
+                self.blockchain.rpc.set_next_node_on_empty_reply(False)
+                ret = self.blockchain.rpc.enum_virtual_ops(params, api="account_history")
+                for ops_block in ret.get("ops_by_block", []):
+                    # A block may be split over two pages
+                    if pending_block is not None and pending_block["block"] == ops_block["block"]:
+                        pending_block["operations"].extend(ops_block["ops"])
+                        continue
+                    if pending_block is not None:
+                        yield self._virtual_ops_block(pending_block)
+                    pending_block = {
+                        "block": ops_block["block"],
+                        "timestamp": ops_block["timestamp"],
+                        "id": ops_block["block"],
+                        "operations": list(ops_block["ops"]),
+                    }
+                operation_begin = ret.get("next_operation_begin", 0)
+                if operation_begin:
+                    block_range_begin = ret["next_block_range_begin"]
+                else:
+                    block_range_begin = block_range_end
+            if pending_block is not None:
+                yield self._virtual_ops_block(pending_block)
+            start = head_block + 1
+            if stop and start > stop:
+                return
+            time.sleep(self.next_block_delay())
+
+    def _virtual_ops_block(self, block):
+        block = Block(
+            block,
+            only_ops=True,
+            only_virtual_ops=True,
+            blockchain_instance=self.blockchain,
+        )
+        block.identifier = block.block_num
+        return block
+
+    def head_block_events(self, start=None, stop=None, buffer_size=64):
+        """Yields reversible head blocks together with fork and irreversibility events
+
+        The ids of the last ``buffer_size`` blocks are kept in a ring buffer. When the
+        ``previous`` id of a new block does not match the last yielded block, the
+        orphaned blocks are rolled back one by one until the chain links again.
+
+        :param int start: Starting block number (default is the current head block)
+        :param int stop: Stop at this block number (default is None, runs forever)
+        :param int buffer_size: number of recent block ids which are kept to detect
+            and roll back forks (default is 64)
+
+        Each event is a dict, its ``type`` is one of:
+
+        * ``block``: ``block`` contains a new head block
+        * ``rollback``: the block ``block_num`` with ``block_id`` was orphaned by a
+          fork and must be reverted. Rollbacks are sent from the newest block on.
+        * ``replace``: ``block`` contains the block which replaces a rolled back
+          block on the new fork
+        * ``irreversible``: the block ``block_num`` with ``block_id`` has passed the
+          last irreversible block and will not be rolled back anymore
+
+        Raises :class:`nectar.exceptions.BlockchainForkTooDeep` when a fork reaches
+        below an irreversible block or further back than ``buffer_size`` blocks.
+
+        .. code-block:: python
+
+            from nectar.blockchain import Blockchain
+            blockchain = Blockchain()
+            for event in blockchain.head_block_events():
+                if event["type"] == "rollback":
+                    print("revert %d" % event["block_num"])
+                elif event["type"] in ["block", "replace"]:
+                    print("apply %d" % event["block"].block_num)
+
+        """
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        recent = deque(maxlen=buffer_size)
+        rolled_back = set()
+        irreversible_num = 0
+        next_num = start
+        poll_retry = 0
+        while True:
+            props = self.blockchain.get_dynamic_global_properties(False)
+            if props is None:
+                raise ValueError("Could not receive dynamic_global_properties!")
+            head_block = int(props["head_block_number"])
+            last_irreversible = int(props["last_irreversible_block_num"])
+            self.head_block_time = formatTimeString(props["time"])
+            if next_num is None:
+                next_num = head_block
+            if stop:
+                head_block = min(head_block, stop)
+            block_received = False
+            while next_num <= head_block:
+                try:
+                    block = Block(next_num, blockchain_instance=self.blockchain)
+                except BlockDoesNotExistsException:
+                    break
+                if recent and block["previous"] != recent[-1][1]:
+                    block_num, block_id = recent[-1]
+                    if block_num <= irreversible_num or len(recent) == 1:
+                        raise BlockchainForkTooDeep(
+                            "Block %d does not link to %s" % (block.block_num, block_id)
+                        )
+                    recent.pop()
+                    rolled_back.add(block_num)
+                    next_num = block_num
+                    yield {"type": "rollback", "block_num": block_num, "block_id": block_id}
+                    continue
+                block_received = True
+                recent.append((next_num, block["block_id"]))
+                self._update_delivery_lag(block)
+                if next_num in rolled_back:
+                    rolled_back.discard(next_num)
+                    yield {"type": "replace", "block": block}
+                else:
+                    yield {"type": "block", "block": block}
+                next_num += 1
+            for block_num, block_id in list(recent):
+                if irreversible_num < block_num <= last_irreversible:
+                    irreversible_num = block_num
+                    yield {"type": "irreversible", "block_num": block_num, "block_id": block_id}
+
+            if stop and next_num > stop:
+                return
+            poll_retry = 0 if block_received else poll_retry + 1
+            time.sleep(self.next_block_delay(poll_retry))
 
     def wait_for_and_get_block(
         self,
@@ -703,13 +1207,15 @@ class Blockchain(object):
             blocks_waiting_for = max(1, block_number - last_current_block_num)
 
             repetition = 0
+            max_wait = blocks_waiting_for * self.max_block_wait_repetition * self.block_interval
+            wait_start = time.monotonic()
             # can't return the block before the chain has reached it (support future block_num)
             while last_current_block_num < block_number:
+                time.sleep(self.next_block_delay(repetition))
                 repetition += 1
-                time.sleep(self.block_interval)
                 if last_current_block_num - block_number < 50:
                     last_current_block_num = self.get_current_block_num()
-                if repetition > blocks_waiting_for * self.max_block_wait_repetition:
+                if time.monotonic() - wait_start > max_wait:
                     raise BlockWaitTimeExceeded(
                         "Already waited %d s"
                         % (
@@ -720,6 +1226,8 @@ class Blockchain(object):
                     )
         # block has to be returned properly
         repetition = 0
+        max_wait = blocks_waiting_for * self.max_block_wait_repetition * self.block_interval
+        wait_start = time.monotonic()
         cnt = 0
         block = None
         while (
@@ -735,7 +1243,7 @@ class Blockchain(object):
                 cnt += 1
             except BlockDoesNotExistsException:
                 block = None
-                if repetition > blocks_waiting_for * self.max_block_wait_repetition:
+                if time.monotonic() - wait_start > max_wait:
                     raise BlockWaitTimeExceeded(
                         "Already waited %d s"
                         % (
@@ -744,8 +1252,8 @@ class Blockchain(object):
                             * self.block_interval
                         )
                     )
+                time.sleep(self.next_block_delay(repetition))
                 repetition += 1
-                time.sleep(self.block_interval)
 
         return block
 
@@ -782,18 +1290,27 @@ class Blockchain(object):
             return
         if stop is None:
             stop = current_block
-        for block in self.blocks(start=start, stop=stop, only_ops=False, only_virtual_ops=False):
+        # get_ops_in_block returns regular and virtual operations with a single call,
+        # so that both are counted in one sweep over the blocks
+        for block in self.blocks(
+            start=start, stop=stop, only_ops=with_virtual_ops, only_virtual_ops=False
+        ):
             if verbose:
-                print(block["identifier"] + " " + block["timestamp"])
+                print(f"{block.identifier} {block['timestamp']}")
             ops_stat = block.ops_statistics(add_to_ops_stat=ops_stat)
-        if with_virtual_ops:
-            for block in self.blocks(start=start, stop=stop, only_ops=True, only_virtual_ops=True):
-                if verbose:
-                    print(block["identifier"] + " " + block["timestamp"])
-                ops_stat = block.ops_statistics(add_to_ops_stat=ops_stat)
         return ops_stat
 
-    def stream(self, opNames=[], raw_ops=False, *args, **kwargs):
+    def stream(
+        self,
+        opNames=[],
+        raw_ops=False,
+        *args,
+        checkpoint_store=None,
+        checkpoint_name="stream",
+        checkpoint_interval=100,
+        use_enum_virtual_ops=False,
+        **kwargs,
+    ):
         """Yield specific operations (e.g. comments) only
 
         :param array opNames: List of operations to filter for
@@ -804,9 +1321,28 @@ class Blockchain(object):
             Cannot be combined with threading
         :param bool threading: Enables threading. Cannot be combined with batch calls
         :param int thread_num: Defines the number of threads, when `threading` is set.
+        :param int prefetch_window: Number of blocks which are fetched ahead, when `threading`
+            is set (default: 2 * thread_num)
+        :param checkpoint_store: When set, the position ``(block_num, trx_num, op_in_trx)``
+            of the last acknowledged operation is stored under ``checkpoint_name`` and the
+            stream resumes directly after it, ignoring ``start``. An operation is
+            acknowledged when the next operation is requested. The end of each block is
+            stored as well, so that blocks without matching operations are not fetched
+            again. Can be one of the checkpoint stores from :mod:`nectarstorage`, e.g.
+            :class:`nectarstorage.SqliteCheckpointStore` (default: None)
+        :param str checkpoint_name: Name of the checkpoint (default: "stream")
+        :param int checkpoint_interval: The checkpoint is stored after this number of
+            acknowledged operations and block ends, and when the stream ends. After a
+            crash, at most this number of operations is yielded again (default: 100)
+        :param bool use_enum_virtual_ops: When True, only virtual operations are streamed.
+            They are fetched for whole block ranges with ``enum_virtual_ops`` and
+            ``opNames`` is applied by the node, see :func:`virtual_ops_blocks`
+            (default: False)
         :param bool only_ops: Only yield operations (default: False)
             Cannot be combined with ``only_virtual_ops=True``
         :param bool only_virtual_ops: Only yield virtual operations (default: False)
+        :param int block_range_size: only for appbase nodes. When not None, blocks are
+            fetched with ``block_api.get_block_range`` while catching up (default: None)
 
         The dict output is formated such that ``type`` carries the
         operation type. Timestamp and block_num are taken from the
@@ -852,75 +1388,277 @@ class Blockchain(object):
             }
 
         """
-        for block in self.blocks(**kwargs):
-            if "transactions" in block:
-                trx = block["transactions"]
-            else:
-                trx = [block]
-            block_num = 0
-            trx_id = ""
-            _id = ""
-            timestamp = ""
-            for trx_nr in range(len(trx)):
-                if "operations" not in trx[trx_nr]:
-                    continue
-                for event in trx[trx_nr]["operations"]:
-                    if isinstance(event, list):
-                        op_type, op = event
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
-                    elif isinstance(event, dict) and "type" in event and "value" in event:
-                        op_type = event["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
-                            op_type = op_type[:-10]
-                        op = event["value"]
-                        trx_id = block["transaction_ids"][trx_nr]
-                        block_num = block.get("id")
-                        _id = self.hash_op(event)
-                        timestamp = block.get("timestamp")
-                    elif (
-                        "op" in event
-                        and isinstance(event["op"], dict)
-                        and "type" in event["op"]
-                        and "value" in event["op"]
-                    ):
-                        op_type = event["op"]["type"]
-                        if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
-                            op_type = op_type[:-10]
-                        op = event["op"]["value"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
-                    else:
-                        op_type, op = event["op"]
-                        trx_id = event.get("trx_id")
-                        block_num = event.get("block")
-                        _id = self.hash_op(event["op"])
-                        timestamp = event.get("timestamp")
-                    if not bool(opNames) or op_type in opNames and block_num > 0:
-                        if raw_ops:
-                            yield {
+        checkpoint = None
+        if checkpoint_store is not None:
+            checkpoint = checkpoint_store.get_checkpoint(checkpoint_name)
+        if checkpoint is not None:
+            kwargs["start"] = checkpoint[0]
+            if kwargs.get("stop") and kwargs["start"] > kwargs["stop"]:
+                return
+        if use_enum_virtual_ops:
+            blocks = self.virtual_ops_blocks(
+                start=kwargs.get("start"), stop=kwargs.get("stop"), opNames=opNames
+            )
+        else:
+            blocks = self.blocks(**kwargs)
+        if checkpoint_store is None:
+            for block in blocks:
+                for op in self.block_ops(block, opNames=opNames, raw_ops=raw_ops):
+                    yield op
+            return
+        writer = _CheckpointWriter(checkpoint_store, checkpoint_name, checkpoint_interval)
+        try:
+            for block in blocks:
+                for position, op in self._block_ops_with_position(
+                    block, opNames=opNames, raw_ops=raw_ops
+                ):
+                    if checkpoint is not None and position <= checkpoint:
+                        continue
+                    yield op
+                    writer.acknowledge(position)
+                writer.acknowledge((int(block["id"]) + 1, -1, -1))
+        finally:
+            writer.flush()
+
+    @staticmethod
+    def block_ops(block, opNames=[], raw_ops=False):
+        """Yields the operations of a single block in the format of :func:`stream`
+
+        :param Block block: Block (or block with operations only) to read the operations from
+        :param array opNames: List of operations to filter for
+        :param bool raw_ops: When set to True, it returns the unmodified operations (default: False)
+        """
+        for position, op in Blockchain._block_ops_with_position(
+            block, opNames=opNames, raw_ops=raw_ops
+        ):
+            yield op
+
+    @staticmethod
+    def _block_ops_with_position(block, opNames=[], raw_ops=False):
+        """Same as :func:`block_ops`, but yields the tuple ``(position, op)``, where position
+        is ``(block_num, trx_num, op_in_trx)``
+        """
+        if "transactions" in block:
+            trx = block["transactions"]
+        else:
+            trx = [block]
+        block_num = 0
+        trx_id = ""
+        _id = ""
+        timestamp = ""
+        for trx_nr in range(len(trx)):
+            if "operations" not in trx[trx_nr]:
+                continue
+            for op_nr, event in enumerate(trx[trx_nr]["operations"]):
+                if isinstance(event, list):
+                    op_type, op = event
+                    trx_id = block["transaction_ids"][trx_nr]
+                    block_num = block.get("id")
+                    _id = Blockchain.hash_op(event)
+                    timestamp = block.get("timestamp")
+                elif isinstance(event, dict) and "type" in event and "value" in event:
+                    op_type = event["type"]
+                    if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
+                        op_type = op_type[:-10]
+                    op = event["value"]
+                    trx_id = block["transaction_ids"][trx_nr]
+                    block_num = block.get("id")
+                    _id = Blockchain.hash_op(event)
+                    timestamp = block.get("timestamp")
+                elif (
+                    "op" in event
+                    and isinstance(event["op"], dict)
+                    and "type" in event["op"]
+                    and "value" in event["op"]
+                ):
+                    op_type = event["op"]["type"]
+                    if len(op_type) > 10 and op_type[len(op_type) - 10 :] == "_operation":
+                        op_type = op_type[:-10]
+                    op = event["op"]["value"]
+                    trx_id = event.get("trx_id")
+                    block_num = event.get("block")
+                    _id = Blockchain.hash_op(event["op"])
+                    timestamp = event.get("timestamp")
+                else:
+                    op_type, op = event["op"]
+                    trx_id = event.get("trx_id")
+                    block_num = event.get("block")
+                    _id = Blockchain.hash_op(event["op"])
+                    timestamp = event.get("timestamp")
+                if not bool(opNames) or op_type in opNames and block_num > 0:
+                    position = (int(block_num), trx_nr, op_nr)
+                    if raw_ops:
+                        yield (
+                            position,
+                            {
                                 "block_num": block_num,
                                 "trx_num": trx_nr,
                                 "op": [op_type, op],
                                 "timestamp": timestamp,
+                            },
+                        )
+                    else:
+                        updated_op = {"type": op_type}
+                        updated_op.update(op.copy())
+                        updated_op.update(
+                            {
+                                "_id": _id,
+                                "timestamp": timestamp,
+                                "block_num": block_num,
+                                "trx_num": trx_nr,
+                                "trx_id": trx_id,
                             }
-                        else:
-                            updated_op = {"type": op_type}
-                            updated_op.update(op.copy())
-                            updated_op.update(
-                                {
-                                    "_id": _id,
-                                    "timestamp": timestamp,
-                                    "block_num": block_num,
-                                    "trx_num": trx_nr,
-                                    "trx_id": trx_id,
-                                }
-                            )
-                            yield updated_op
+                        )
+                        yield position, updated_op
+
+    def _parallel_shards(
+        self,
+        start,
+        stop,
+        processes,
+        shard_size,
+        ordered,
+        only_ops,
+        only_virtual_ops,
+        opNames,
+        raw_ops,
+        yield_ops,
+    ):
+        """Distributes the block range onto worker processes and yields the results
+        of each shard
+        """
+        if not self.blockchain.is_connected():
+            raise OfflineHasNoRPCException("No RPC available in offline mode!")
+        if stop is None:
+            stop = self.get_current_block_num()
+        if start is None:
+            start = stop
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        blockchain_kwargs = {
+            "node": self.blockchain.rpc.nodes.export_working_nodes(),
+            "num_retries": self.blockchain.rpc.num_retries,
+            "num_retries_call": self.blockchain.rpc.num_retries_call,
+            "timeout": self.blockchain.rpc.timeout,
+        }
+        tasks = [
+            (
+                shard_start,
+                min(shard_start + shard_size - 1, stop),
+                only_ops,
+                only_virtual_ops,
+                opNames,
+                raw_ops,
+                yield_ops,
+            )
+            for shard_start in range(start, stop + 1, shard_size)
+        ]
+        with multiprocessing.Pool(
+            processes,
+            initializer=_init_block_worker,
+            initargs=(self.blockchain.__class__, blockchain_kwargs),
+        ) as pool:
+            if ordered:
+                results = pool.imap(_fetch_block_shard, tasks)
+            else:
+                results = pool.imap_unordered(_fetch_block_shard, tasks)
+            for shard in results:
+                yield shard
+
+    def blocks_parallel(
+        self,
+        start,
+        stop=None,
+        processes=None,
+        shard_size=100,
+        ordered=True,
+        only_ops=False,
+        only_virtual_ops=False,
+    ):
+        """Yields the blocks from ``start`` to ``stop``, which are fetched and parsed
+        by several worker processes. Each process uses its own rpc connection.
+
+        :param int start: Starting block
+        :param int stop: Stop at this block, if set to None, the current_block_num is taken
+        :param int processes: Number of worker processes (default: number of cpus)
+        :param int shard_size: Number of blocks which are handled by a worker process
+            at once (default: 100)
+        :param bool ordered: When True, all blocks are yielded in order. Otherwise
+            the shards are yielded in the order in which they are finished, while
+            the blocks of a shard are still ordered (default: True)
+        :param bool only_ops: Only yield operations (default: False).
+            Cannot be combined with ``only_virtual_ops=True``.
+        :param bool only_virtual_ops: Only yield virtual operations (default: False)
+
+        .. note:: Use this for historical ranges only, the stream ends at ``stop``.
+
+        """
+        for shard in self._parallel_shards(
+            start,
+            stop,
+            processes,
+            shard_size,
+            ordered,
+            only_ops,
+            only_virtual_ops,
+            [],
+            False,
+            False,
+        ):
+            for block in shard:
+                block = Block(
+                    block,
+                    only_ops=only_ops,
+                    only_virtual_ops=only_virtual_ops,
+                    blockchain_instance=self.blockchain,
+                )
+                block.identifier = block.block_num
+                yield block
+
+    def stream_parallel(
+        self,
+        opNames=[],
+        raw_ops=False,
+        start=None,
+        stop=None,
+        processes=None,
+        shard_size=100,
+        ordered=True,
+        only_ops=False,
+        only_virtual_ops=False,
+    ):
+        """Yield specific operations from ``start`` to ``stop``. Fetching the blocks
+        and extracting the operations is done by several worker processes.
+
+        :param array opNames: List of operations to filter for
+        :param bool raw_ops: When set to True, it returns the unmodified operations (default: False)
+        :param int start: Start at this block
+        :param int stop: Stop at this block, if set to None, the current_block_num is taken
+        :param int processes: Number of worker processes (default: number of cpus)
+        :param int shard_size: Number of blocks which are handled by a worker process
+            at once (default: 100)
+        :param bool ordered: When False, the operations of a shard are yielded as soon
+            as the shard is finished (default: True)
+        :param bool only_ops: Only yield operations (default: False)
+        :param bool only_virtual_ops: Only yield virtual operations (default: False)
+
+        The output is the same as for :func:`stream`.
+
+        """
+        for shard in self._parallel_shards(
+            start,
+            stop,
+            processes,
+            shard_size,
+            ordered,
+            only_ops,
+            only_virtual_ops,
+            opNames,
+            raw_ops,
+            True,
+        ):
+            for op in shard:
+                yield op
 
     def awaitTxConfirmation(self, transaction, limit=10):
         """Returns the transaction as seen by the blockchain after being
@@ -935,20 +1673,26 @@ class Blockchain(object):
                   confirmed in an irreversible block.
 
         .. note:: This method returns once the blockchain has included a
-                  transaction with the **same signature**. Even though the
-                  signature is not usually used to identify a transaction,
-                  it still cannot be forfeited and is derived from the
-                  transaction contented and thus identifies a transaction
-                  uniquely.
+                  transaction with the same transaction id, or with the
+                  **same signature** when the transaction has no ``trx_id``.
+                  Even though the signature is not usually used to identify
+                  a transaction, it still cannot be forfeited and is derived
+                  from the transaction contented and thus identifies a
+                  transaction uniquely.
+
+        .. note:: All waiting calls share a single block stream, see
+                  :class:`nectar.transactiontracker.TransactionTracker`.
         """
-        counter = 0
-        for block in self.blocks():
-            counter += 1
-            for tx in block["transactions"]:
-                if sorted(tx["signatures"]) == sorted(transaction["signatures"]):
-                    return tx
-            if counter > limit:
-                raise Exception("The operation has not been added after %d blocks!" % (limit))
+        return self.get_transaction_tracker().wait(transaction, limit=limit)
+
+    def get_transaction_tracker(self):
+        """Returns the :class:`nectar.transactiontracker.TransactionTracker` which
+        is shared by all Blockchain objects of this blockchain instance and mode
+        """
+        from .transactiontracker import TransactionTracker
+
+        mode = "head" if self.mode == "head_block_number" else "irreversible"
+        return TransactionTracker.shared(blockchain_instance=self.blockchain, mode=mode)
 
     @staticmethod
     def hash_op(event):
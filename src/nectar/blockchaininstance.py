@@ -204,6 +204,8 @@ class BlockChainInstance(object):
         self.clear_data()
         self.data_refresh_time_seconds = data_refresh_time_seconds
         # self.refresh_data()
+        # Shared nectar.transactiontracker.TransactionTracker objects by mode
+        self.transaction_trackers = {}
 
         # txbuffers/propbuffer are initialized and cleared
         self.clear()
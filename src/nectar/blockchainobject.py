@@ -1,92 +1,411 @@
 # -*- coding: utf-8 -*-
+import heapq
 import json
+import math
+import sys
 import threading
-from datetime import datetime, timedelta, timezone
+import time
+from collections import OrderedDict
 
 from nectar.instance import shared_blockchain_instance
 
 
-class ObjectCache(dict):
-    def __init__(self, initial_data={}, default_expiration=10, auto_clean=True):
-        super(ObjectCache, self).__init__(initial_data)
+def get_object_size(obj, depth=4):
+    """Returns an estimate of the memory size of obj in bytes, including the
+    items of dicts, lists and tuples up to ``depth`` levels"""
+    size = sys.getsizeof(obj)
+    if depth <= 0:
+        return size
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += sys.getsizeof(key) + get_object_size(value, depth - 1)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            size += get_object_size(value, depth - 1)
+    return size
+
+
+class _CacheStripe(object):
+    """One part of an :class:`ObjectCache` with its own lock, LRU order and
+    expiry heap"""
+
+    __slots__ = [
+        "lock",
+        "entries",
+        "heap",
+        "seq",
+        "size",
+        "hits",
+        "misses",
+        "evictions",
+        "expirations",
+    ]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # key -> [value, expires, seq, size], least recently used first
+        self.entries = OrderedDict()
+        # (expires, seq, key), entries which were replaced or removed stay in
+        # the heap until they are popped or the heap is rebuilt
+        self.heap = []
+        self.seq = 0
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+
+class ObjectCache(object):
+    """Bounded cache of blockchain objects with a time to live
+
+    Entries expire ``default_expiration`` seconds after they were stored, on
+    monotonic time. When the cache holds more than ``max_entries`` entries (or
+    more than ``max_bytes``), the least recently used entries are removed.
+
+    The keys are spread over ``stripes`` parts with their own lock, so that
+    threads rarely wait for each other. Get and set take constant time,
+    expired entries are removed from an expiry heap when new entries are
+    stored (``auto_clean=True``) or when :func:`clear_expired_items` is called.
+
+    :param dict initial_data: entries which are stored at start
+    :param float default_expiration: time to live of new entries in seconds (default is 10),
+        None for entries which do not expire
+    :param bool auto_clean: remove expired entries when storing entries (default is True)
+    :param int max_entries: maximum number of entries (default is 10000), None for no limit
+    :param int max_bytes: maximum estimated size of all entries in bytes, see
+        :func:`get_object_size` (default is None, no limit)
+    :param int stripes: number of independently locked parts (default is 16)
+    :param bool track_size: estimate the size of all entries for :func:`get_stats`, also
+        when ``max_bytes`` is not set (default is False)
+
+    .. code-block:: python
+
+        >>> from nectar.blockchainobject import ObjectCache
+        >>> cache = ObjectCache(default_expiration=60, max_entries=1000)
+        >>> cache["foo"] = "bar"
+        >>> cache["foo"]
+        'bar'
+
+    """
+
+    def __init__(
+        self,
+        initial_data={},
+        default_expiration=10,
+        auto_clean=True,
+        max_entries=10000,
+        max_bytes=None,
+        stripes=16,
+        track_size=False,
+    ):
         self.set_expiration(default_expiration)
         self.auto_clean = auto_clean
-        self.lock = threading.RLock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.track_size = track_size
+        self._stripes = [_CacheStripe() for i in range(stripes)]
+        for key, value in initial_data.items():
+            self[key] = value
+
+    def _get_stripe(self, key):
+        return self._stripes[hash(key) % len(self._stripes)]
 
     def __setitem__(self, key, value):
-        data = {
-            "expires": datetime.now(timezone.utc) + timedelta(seconds=self.default_expiration),
-            "data": value,
-        }
-        with self.lock:
-            if key in self:
-                del self[key]
-            dict.__setitem__(self, key, data)
-        if self.auto_clean:
-            self.clear_expired_items()
+        stripe = self._get_stripe(key)
+        now = time.monotonic()
+        if self.default_expiration is None:
+            expires = math.inf
+        else:
+            expires = now + self.default_expiration
+        size = 0
+        if self.max_bytes is not None or self.track_size:
+            size = get_object_size(value)
+        with stripe.lock:
+            entry = stripe.entries.pop(key, None)
+            if entry is not None:
+                stripe.size -= entry[3]
+            stripe.seq += 1
+            stripe.entries[key] = [value, expires, stripe.seq, size]
+            stripe.size += size
+            if expires != math.inf:
+                heapq.heappush(stripe.heap, (expires, stripe.seq, key))
+            if self.auto_clean:
+                self._remove_expired(stripe, now)
+            self._evict(stripe)
 
     def __getitem__(self, key):
-        with self.lock:
-            if key in self:
-                value = dict.__getitem__(self, key)
-                if value is not None:
-                    return value["data"]
+        stripe = self._get_stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                stripe.misses += 1
+                return None
+            stripe.entries.move_to_end(key)
+            stripe.hits += 1
+            return entry[0]
+
+    def __delitem__(self, key):
+        stripe = self._get_stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.pop(key)
+            stripe.size -= entry[3]
 
     def get(self, key, default):
-        with self.lock:
-            if key in self:
-                if self[key] is not None:
-                    return self[key]
-                else:
-                    return default
-            else:
-                return default
-
-    def clear_expired_items(self):
-        with self.lock:
-            del_list = []
-            utc_now = datetime.now(timezone.utc)
-            for key in self:
-                value = dict.__getitem__(self, key)
-                if value is None:
-                    del_list.append(key)
-                    continue
-                if utc_now >= value["expires"]:
-                    del_list.append(key)
-            for key in del_list:
-                del self[key]
+        value = self[key]
+        if value is None:
+            return default
+        return value
 
     def __contains__(self, key):
-        with self.lock:
-            if dict.__contains__(self, key):
-                value = dict.__getitem__(self, key)
-                if value is None:
-                    return False
-                if datetime.now(timezone.utc) < value["expires"]:
-                    return True
-                else:
-                    value["data"] = None
-            return False
+        stripe = self._get_stripe(key)
+        with stripe.lock:
+            entry = stripe.entries.get(key)
+            return entry is not None and entry[1] > time.monotonic()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return sum(len(stripe.entries) for stripe in self._stripes)
+
+    def keys(self):
+        """Returns the keys of all stored entries, including expired entries
+        which were not removed yet"""
+        keys = []
+        for stripe in self._stripes:
+            with stripe.lock:
+                keys.extend(stripe.entries.keys())
+        return keys
+
+    def clear(self):
+        """Removes all entries"""
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.entries.clear()
+                stripe.heap = []
+                stripe.size = 0
+
+    def clear_expired_items(self):
+        """Removes all expired entries"""
+        now = time.monotonic()
+        for stripe in self._stripes:
+            with stripe.lock:
+                self._remove_expired(stripe, now)
+
+    def get_size(self):
+        """Returns the estimated size of all entries in bytes, only entries
+        stored while ``max_bytes`` or ``track_size`` was set are counted"""
+        return sum(stripe.size for stripe in self._stripes)
+
+    def get_stats(self):
+        """Returns the number of entries, their estimated size in bytes (see
+        :func:`get_size`), hits, misses, evictions of least recently used
+        entries and removals of expired entries as dict"""
+        stats = {
+            "entries": 0,
+            "bytes": 0,
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        for stripe in self._stripes:
+            with stripe.lock:
+                stats["entries"] += len(stripe.entries)
+                stats["bytes"] += stripe.size
+                stats["hits"] += stripe.hits
+                stats["misses"] += stripe.misses
+                stats["evictions"] += stripe.evictions
+                stats["expirations"] += stripe.expirations
+        return stats
+
+    def _remove_expired(self, stripe, now):
+        heap = stripe.heap
+        entries = stripe.entries
+        while heap and heap[0][0] <= now:
+            expires, seq, key = heapq.heappop(heap)
+            entry = entries.get(key)
+            if entry is not None and entry[2] == seq:
+                del entries[key]
+                stripe.size -= entry[3]
+                stripe.expirations += 1
+        # Drop the heap items of replaced entries
+        if len(heap) > 2 * len(entries) + 64:
+            stripe.heap = [
+                (entry[1], entry[2], key) for key, entry in entries.items() if entry[1] != math.inf
+            ]
+            heapq.heapify(stripe.heap)
+
+    def _evict(self, stripe):
+        stripes = len(self._stripes)
+        entries = stripe.entries
+        if self.max_entries is not None:
+            max_entries = max(-(-self.max_entries // stripes), 1)
+            while len(entries) > max_entries:
+                key, entry = entries.popitem(last=False)
+                stripe.size -= entry[3]
+                stripe.evictions += 1
+        if self.max_bytes is not None:
+            max_bytes = self.max_bytes / stripes
+            while stripe.size > max_bytes and len(entries) > 1:
+                key, entry = entries.popitem(last=False)
+                stripe.size -= entry[3]
+                stripe.evictions += 1
 
     def __str__(self):
         if self.auto_clean:
             self.clear_expired_items()
-        n = 0
-        with self.lock:
-            n = len(list(self.keys()))
-        return "ObjectCache(n={}, default_expiration={})".format(n, self.default_expiration)
+        return "ObjectCache(n={}, default_expiration={})".format(len(self), self.default_expiration)
 
     def set_expiration(self, expiration):
         """Set new default expiration time in seconds (default: 10s)"""
         self.default_expiration = expiration
 
 
+#: Cache settings per class name, see :class:`ObjectCache`. Classes without
+#: own settings use ``default``. A ``default_expiration`` of None keeps the
+#: objects until they are removed as least recently used.
+DEFAULT_OBJECT_CACHE_POLICIES = {
+    "default": {"default_expiration": 10, "max_entries": 10000, "max_bytes": None},
+    # Blocks do not change, only reversible blocks are replaced on a fork
+    "Block": {"default_expiration": 60, "max_entries": 1000},
+    "BlockHeader": {"default_expiration": 60, "max_entries": 10000},
+    "Account": {"default_expiration": 10, "max_entries": 10000},
+    "Asset": {"default_expiration": None, "max_entries": 1000},
+}
+
+
+class ObjectCacheNamespaces(object):
+    """Holds one :class:`ObjectCache` per chain id and class name, so that
+    e.g. ``Block(123)`` and an object with the id 123 of another class, or
+    the objects of two chains, never replace each other
+
+    Each class has its own time to live and size limits, see
+    :data:`DEFAULT_OBJECT_CACHE_POLICIES`.
+
+    :param dict policies: settings per class name, which are added to or
+        replace :data:`DEFAULT_OBJECT_CACHE_POLICIES`
+    :param bool auto_clean: remove expired entries when storing entries (default is True)
+    :param bool track_size: estimate the size of all entries for :func:`get_stats`
+        (default is False)
+
+    .. code-block:: python
+
+        >>> from nectar.blockchainobject import BlockchainObject
+        >>> BlockchainObject._cache.set_policy("Account", default_expiration=30)
+        >>> stats = BlockchainObject.get_cache_stats()
+
+    """
+
+    def __init__(self, policies=None, auto_clean=True, track_size=False):
+        self.policies = {
+            name: dict(policy) for name, policy in DEFAULT_OBJECT_CACHE_POLICIES.items()
+        }
+        for name, policy in (policies or {}).items():
+            self.policies.setdefault(name, {}).update(policy)
+        self._auto_clean = auto_clean
+        self.track_size = track_size
+        self.lock = threading.Lock()
+        self._caches = {}
+
+    def get_policy(self, name):
+        """Returns the cache settings of a class name"""
+        policy = dict(self.policies["default"])
+        policy.update(self.policies.get(name, {}))
+        return policy
+
+    def set_policy(self, name, **policy):
+        """Changes the cache settings of a class name, also for its existing caches
+
+        :param str name: class name, e.g. ``Block``, or ``default``
+        :param policy: ``default_expiration``, ``max_entries`` or ``max_bytes``
+        """
+        with self.lock:
+            self.policies.setdefault(name, {}).update(policy)
+            caches = list(self._caches.items())
+        for (chain_id, cache_name), cache in caches:
+            if name == "default" or cache_name == name:
+                for key, value in self.get_policy(cache_name).items():
+                    setattr(cache, key, value)
+
+    @property
+    def auto_clean(self):
+        return self._auto_clean
+
+    @auto_clean.setter
+    def auto_clean(self, auto_clean):
+        self._auto_clean = auto_clean
+        with self.lock:
+            for cache in self._caches.values():
+                cache.auto_clean = auto_clean
+
+    def get_cache(self, chain_id, name):
+        """Returns the cache of a chain id and class name"""
+        key = (chain_id, name)
+        cache = self._caches.get(key)
+        if cache is not None:
+            return cache
+        with self.lock:
+            cache = self._caches.get(key)
+            if cache is None:
+                cache = ObjectCache(
+                    auto_clean=self._auto_clean, track_size=self.track_size, **self.get_policy(name)
+                )
+                self._caches[key] = cache
+            return cache
+
+    def __len__(self):
+        return sum(len(cache) for cache in self._get_caches())
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        """Returns the keys of all caches"""
+        keys = []
+        for cache in self._get_caches():
+            keys.extend(cache.keys())
+        return keys
+
+    def clear(self):
+        """Removes all entries of all caches, the settings are kept"""
+        with self.lock:
+            self._caches = {}
+
+    def clear_expired_items(self):
+        """Removes the expired entries of all caches"""
+        for cache in self._get_caches():
+            cache.clear_expired_items()
+
+    def get_stats(self):
+        """Returns the statistics of each cache as list of dicts with the keys
+        ``chain_id``, ``type`` and the keys of :func:`ObjectCache.get_stats`"""
+        with self.lock:
+            caches = list(self._caches.items())
+        stats = []
+        for (chain_id, name), cache in caches:
+            cache_stats = {"chain_id": chain_id, "type": name}
+            cache_stats.update(cache.get_stats())
+            stats.append(cache_stats)
+        return stats
+
+    def _get_caches(self):
+        with self.lock:
+            return list(self._caches.values())
+
+    def __str__(self):
+        if self._auto_clean:
+            self.clear_expired_items()
+        return "ObjectCacheNamespaces(n={}, namespaces={})".format(len(self), len(self._caches))
+
+
 class BlockchainObject(dict):
     space_id = 1
     type_id = None
     type_ids = []
 
-    _cache = ObjectCache()
+    _cache = ObjectCacheNamespaces()
 
     def __init__(
         self,
@@ -144,8 +463,9 @@ class BlockchainObject(dict):
             if self.test_valid_objectid(self.identifier):
                 # Here we assume we deal with an id
                 self.testid(self.identifier)
-            if self.iscached(data):
-                super(BlockchainObject, self).__init__(self.getcache(data))
+            cached = self.getcache(data)
+            if cached is not None:
+                super(BlockchainObject, self).__init__(cached)
             elif not lazy and not self.cached:
                 self.refresh()
 
@@ -155,7 +475,20 @@ class BlockchainObject(dict):
 
     @staticmethod
     def clear_cache():
-        BlockchainObject._cache = ObjectCache()
+        BlockchainObject._cache.clear()
+
+    @staticmethod
+    def get_cache_stats():
+        """Returns the statistics of the object caches, see
+        :func:`ObjectCacheNamespaces.get_stats`"""
+        return BlockchainObject._cache.get_stats()
+
+    def _get_cache(self):
+        """Returns the cache of the chain and class of this object"""
+        rpc = getattr(self.blockchain, "rpc", None)
+        return BlockchainObject._cache.get_cache(
+            getattr(rpc, "chain_id", None), self.__class__.__name__
+        )
 
     def test_valid_objectid(self, i):
         if isinstance(i, str):
@@ -175,28 +508,29 @@ class BlockchainObject(dict):
     def cache(self):
         # store in cache
         if dict.__contains__(self, self.id_item):
-            BlockchainObject._cache[self.get(self.id_item)] = self
+            self._get_cache()[self.get(self.id_item)] = self
 
     def clear_cache_from_expired_items(self):
         BlockchainObject._cache.clear_expired_items()
 
     def set_cache_expiration(self, expiration):
-        BlockchainObject._cache.default_expiration = expiration
+        """Sets the time to live of cached objects of this class in seconds"""
+        BlockchainObject._cache.set_policy(self.__class__.__name__, default_expiration=expiration)
 
     def set_cache_auto_clean(self, auto_clean):
         BlockchainObject._cache.auto_clean = auto_clean
 
     def get_cache_expiration(self):
-        return BlockchainObject._cache.default_expiration
+        return BlockchainObject._cache.get_policy(self.__class__.__name__)["default_expiration"]
 
     def get_cache_auto_clean(self):
         return BlockchainObject._cache.auto_clean
 
     def iscached(self, id):
-        return id in BlockchainObject._cache
+        return id in self._get_cache()
 
     def getcache(self, id):
-        return BlockchainObject._cache.get(id, None)
+        return self._get_cache().get(id, None)
 
     def __getitem__(self, key):
         if not self.cached:
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+import logging
+import math
+import os
+import struct
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+from appdirs import user_data_dir
+
+log = logging.getLogger(__name__)
+
+_RECORD = struct.Struct("<qq")
+
+
+class BlockTimeIndex(object):
+    """Sparse index which maps block times to block numbers
+
+    Every ``sample_interval`` blocks one ``(block_num, timestamp)`` sample is
+    kept. A date which lies between two samples is turned into a block number
+    by interpolation, without any api call. The estimate is off by the number
+    of missed blocks between both samples at most.
+
+    New samples are appended to a binary file, so that the index grows over
+    time and is shared between processes using the same file.
+
+    :param str path: File in which the samples are stored. When None, the
+        index is only kept in RAM.
+    :param int sample_interval: minimal block distance between two samples
+        (default is 1000)
+
+    .. code-block:: python
+
+        >>> from nectar.blocktimeindex import BlockTimeIndex
+        >>> from datetime import datetime, timezone
+        >>> index = BlockTimeIndex()
+        >>> index.add(1000, datetime(2019, 6, 18, 0, 0, 0, tzinfo=timezone.utc))
+        >>> index.add(2000, datetime(2019, 6, 18, 0, 50, 0, tzinfo=timezone.utc))
+        >>> index.estimate(datetime(2019, 6, 18, 0, 25, 0, tzinfo=timezone.utc))
+        1500
+
+    """
+
+    _chain_indexes = {}
+    _chain_indexes_lock = threading.Lock()
+
+    def __init__(self, path=None, sample_interval=1000):
+        self.path = path
+        self.sample_interval = sample_interval
+        self.lock = threading.Lock()
+        self._block_nums = array("q")
+        self._timestamps = array("q")
+        if path is not None and os.path.isfile(path):
+            self._load()
+
+    @classmethod
+    def for_chain(cls, chain_id, data_dir=None, sample_interval=1000):
+        """Returns the index for the given chain id, which is shared in this process
+
+        :param str chain_id: chain id of the blockchain
+        :param str data_dir: directory of the index file. Uses the same OS protected
+            user directory as :class:`nectarstorage.sqlite.SQLiteFile` by default.
+        :param int sample_interval: minimal block distance between two samples
+        """
+        with cls._chain_indexes_lock:
+            if chain_id not in cls._chain_indexes:
+                if data_dir is None:
+                    data_dir = user_data_dir("nectar", "nectar")
+                if not os.path.isdir(data_dir):  # pragma: no cover
+                    os.makedirs(data_dir)
+                path = os.path.join(data_dir, "blocktimes-{}.bin".format(chain_id[:16]))
+                cls._chain_indexes[chain_id] = cls(path=path, sample_interval=sample_interval)
+            return cls._chain_indexes[chain_id]
+
+    def _load(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        data = data[: len(data) - len(data) % _RECORD.size]
+        samples = dict(_RECORD.iter_unpack(data))
+        for block_num in sorted(samples):
+            self._insert(block_num, samples[block_num])
+
+    def _insert(self, block_num, timestamp):
+        """Inserts a sample, returns False when a sample is too close"""
+        pos = bisect_left(self._block_nums, block_num)
+        if pos > 0 and block_num - self._block_nums[pos - 1] < self.sample_interval:
+            return False
+        if pos < len(self._block_nums) and self._block_nums[pos] - block_num < self.sample_interval:
+            return False
+        if (pos > 0 and timestamp < self._timestamps[pos - 1]) or (
+            pos < len(self._timestamps) and timestamp > self._timestamps[pos]
+        ):
+            log.warning(f"Block time of block {block_num} is out of order, skipped.")
+            return False
+        self._block_nums.insert(pos, block_num)
+        self._timestamps.insert(pos, timestamp)
+        return True
+
+    def add(self, block_num, block_time):
+        """Adds the time of a block to the index
+
+        The sample is only stored when no other sample lies within
+        ``sample_interval`` blocks.
+
+        :param int block_num: block number
+        :param datetime block_time: time of the block
+        """
+        block_num = int(block_num)
+        if block_num < 1:
+            return
+        timestamp = int(block_time.timestamp())
+        with self.lock:
+            if not self._insert(block_num, timestamp):
+                return
+            if self.path is not None:
+                try:
+                    with open(self.path, "ab") as f:
+                        f.write(_RECORD.pack(block_num, timestamp))
+                except OSError as e:
+                    log.warning(f"Could not store block time index: {e}")
+
+    def estimate(self, date):
+        """Returns the interpolated block number for the given date, or None
+        when the date is not enclosed by two samples.
+
+        :param datetime date: block time
+        """
+        timestamp = date.timestamp()
+        with self.lock:
+            pos = bisect_right(self._timestamps, timestamp)
+            if pos == 0 or pos == len(self._timestamps):
+                if pos > 0 and self._timestamps[pos - 1] == timestamp:
+                    return self._block_nums[pos - 1]
+                return None
+            low_num, low_time = self._block_nums[pos - 1], self._timestamps[pos - 1]
+            high_num, high_time = self._block_nums[pos], self._timestamps[pos]
+        if low_time == timestamp:
+            return low_num
+        return low_num + math.floor(
+            (timestamp - low_time) * (high_num - low_num) / (high_time - low_time)
+        )
+
+    def bounds(self, date):
+        """Returns the block numbers of the samples enclosing the given date,
+        or None when the date is not enclosed by two samples.
+
+        :param datetime date: block time
+        """
+        timestamp = date.timestamp()
+        with self.lock:
+            pos = bisect_right(self._timestamps, timestamp)
+            if pos == 0 or pos == len(self._timestamps):
+                return None
+            return self._block_nums[pos - 1], self._block_nums[pos]
+
+    def first(self):
+        """Returns the first sample as tuple of block number and datetime, or None"""
+        with self.lock:
+            if not self._block_nums:
+                return None
+            return self._block_nums[0], datetime.fromtimestamp(self._timestamps[0], tz=timezone.utc)
+
+    def last(self):
+        """Returns the last sample as tuple of block number and datetime, or None"""
+        with self.lock:
+            if not self._block_nums:
+                return None
+            return self._block_nums[-1], datetime.fromtimestamp(
+                self._timestamps[-1], tz=timezone.utc
+            )
+
+    def __len__(self):
+        return len(self._block_nums)
+
+    def __str__(self):
+        return "BlockTimeIndex(n={}, sample_interval={})".format(len(self), self.sample_interval)
@@ -13,6 +13,7 @@ from nectarbase import operations
 
 from .account import Account
 from .amount import Amount
+from .amountarray import AmountArray
 from .blockchainobject import BlockchainObject
 from .exceptions import ContentDoesNotExistsException, VotingInvalidOnArchivedPost
 from .instance import shared_blockchain_instance
@@ -543,6 +544,42 @@ class Comment(BlockchainObject):
             "curator_payout": curator_payout,
         }
 
+    @staticmethod
+    def get_reward_array(comments, blockchain_instance=None):
+        """Returns the estimated total reward (see :func:`reward`) of many
+        comments as :class:`nectar.amountarray.AmountArray` with the authors
+        as accounts. numpy needs to be installed.
+
+        :param list comments: Comment objects or comment dicts
+        :param Blockchain blockchain_instance: Blockchain instance
+
+        .. code-block:: python
+
+            from nectar.comment import AccountPosts, Comment
+            posts = AccountPosts("blog", "thecrazygm")
+            rewards = Comment.get_reward_array(posts)
+            print(rewards.sum())
+            print(rewards.group_by_account().to_dict())
+
+        """
+        comments = list(comments)
+        if blockchain_instance is None and len(comments) > 0:
+            blockchain_instance = getattr(comments[0], "blockchain", None)
+        blockchain = blockchain_instance or shared_blockchain_instance()
+        symbol = blockchain.backed_token_symbol
+        zero = "0.000 %s" % symbol
+        authors = [comment["author"] for comment in comments]
+        reward = None
+        for key in ["total_payout_value", "curator_payout_value", "pending_payout_value"]:
+            amounts = AmountArray(
+                [comment.get(key, zero) for comment in comments],
+                asset=symbol,
+                accounts=authors,
+                blockchain_instance=blockchain,
+            )
+            reward = amounts if reward is None else reward + amounts
+        return reward
+
     def get_author_rewards(self):
         """Returns the author rewards.
 
@@ -153,3 +153,15 @@ class BlockWaitTimeExceeded(NectarException):
     """Wait time for new block exceeded"""
 
     pass
+
+
+class BlockchainForkTooDeep(NectarException):
+    """A fork reaches further back than the recent blocks which can be rolled back"""
+
+    pass
+
+
+class TransactionExpired(NectarException):
+    """The transaction expired without being included into a block"""
+
+    pass
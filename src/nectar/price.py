@@ -5,16 +5,17 @@ from fractions import Fraction
 from nectar.instance import shared_blockchain_instance
 
 from .amount import Amount
-from .asset import Asset
+from .asset import Asset, get_asset
 from .exceptions import InvalidAssetException
 from .utils import assets_from_string, formatTimeString
 
 
 def check_asset(other, self, stm):
+    if other is self:
+        # Interned assets are shared
+        return
     if isinstance(other, dict) and "asset" in other and isinstance(self, dict) and "asset" in self:
-        if not Asset(other["asset"], blockchain_instance=stm) == Asset(
-            self["asset"], blockchain_instance=stm
-        ):
+        if not get_asset(other["asset"], stm) == get_asset(self["asset"], stm):
             raise AssertionError()
     else:
         if not other == self:
@@ -99,8 +100,8 @@ class Price(dict):
         if price is not None and isinstance(price, str) and not base and not quote:
             price, assets = price.split(" ")
             base_symbol, quote_symbol = assets_from_string(assets)
-            base = Asset(base_symbol, blockchain_instance=self.blockchain)
-            quote = Asset(quote_symbol, blockchain_instance=self.blockchain)
+            base = get_asset(base_symbol, self.blockchain)
+            quote = get_asset(quote_symbol, self.blockchain)
             frac = Fraction(float(price)).limit_denominator(10 ** base["precision"])
             self["quote"] = Amount(
                 amount=frac.denominator, asset=quote, blockchain_instance=self.blockchain
@@ -131,8 +132,8 @@ class Price(dict):
             )
 
         elif price is not None and isinstance(base, str) and isinstance(quote, str):
-            base = Asset(base, blockchain_instance=self.blockchain)
-            quote = Asset(quote, blockchain_instance=self.blockchain)
+            base = get_asset(base, self.blockchain)
+            quote = get_asset(quote, self.blockchain)
             frac = Fraction(float(price)).limit_denominator(10 ** base["precision"])
             self["quote"] = Amount(
                 amount=frac.denominator, asset=quote, blockchain_instance=self.blockchain
@@ -161,8 +162,8 @@ class Price(dict):
             isinstance(price, float) or isinstance(price, int) or isinstance(price, Decimal)
         ) and isinstance(base, str):
             base_symbol, quote_symbol = assets_from_string(base)
-            base = Asset(base_symbol, blockchain_instance=self.blockchain)
-            quote = Asset(quote_symbol, blockchain_instance=self.blockchain)
+            base = get_asset(base_symbol, self.blockchain)
+            quote = get_asset(quote_symbol, self.blockchain)
             frac = Fraction(float(price)).limit_denominator(10 ** base["precision"])
             self["quote"] = Amount(
                 amount=frac.denominator, asset=quote, blockchain_instance=self.blockchain
@@ -7,6 +7,7 @@ from datetime import date, datetime, time, timedelta, timezone
 
 from nectar.account import Account
 from nectar.amount import Amount
+from nectar.amountarray import AmountArray
 from nectar.constants import STEEM_100_PERCENT, STEEM_VOTE_REGENERATION_SECONDS
 from nectar.instance import shared_blockchain_instance
 from nectar.utils import (
@@ -521,6 +522,25 @@ class AccountSnapshot(list):
         ]:
             return
 
+    def get_delegation_array(self, index=-1, incoming=False):
+        """Returns the delegations at one state as
+        :class:`nectar.amountarray.AmountArray` of vests with the delegatees
+        (or the delegators) as accounts. numpy needs to be installed.
+
+        :param int index: index of the state, the latest state is used by default
+        :param bool incoming: returns the incoming delegations, when True
+        """
+        if incoming:
+            delegations = self.delegated_vests_in[index]
+        else:
+            delegations = self.delegated_vests_out[index]
+        return AmountArray(
+            list(delegations.values()),
+            asset=self.blockchain.vest_token_symbol,
+            accounts=list(delegations.keys()),
+            blockchain_instance=self.blockchain,
+        )
+
     def build_sp_arrays(self):
         """Builds the own_sp and eff_sp array"""
         self.own_sp = []
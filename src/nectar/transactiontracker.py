@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from .blockchain import Blockchain
+from .exceptions import BlockWaitTimeExceeded, TransactionExpired
+from .instance import shared_blockchain_instance
+from .utils import formatTimeString
+
+log = logging.getLogger(__name__)
+
+_shared_lock = threading.Lock()
+
+
+class _PendingTransaction(object):
+    __slots__ = ["trx_id", "signatures", "expiration", "limit", "deadline", "blocks", "future"]
+
+    def __init__(self, trx_id, signatures, expiration, limit, deadline):
+        self.trx_id = trx_id
+        self.signatures = signatures
+        self.expiration = expiration
+        self.limit = limit
+        self.deadline = deadline
+        self.blocks = 0
+        self.future = Future()
+
+
+class TransactionTracker(object):
+    """Waits for many broadcasted transactions at once
+
+    A single block stream is shared by all tracked transactions. Every
+    transaction of a new block is looked up by its transaction id (or by its
+    signatures, when no id is known) in a hash index, so that the cost per
+    block does not depend on the number of pending transactions.
+
+    The stream is started when the first transaction is tracked and stops
+    again, when no transaction is pending anymore.
+
+    :param Steem/Hive blockchain_instance: Steem or Hive instance
+    :param str mode: (default) Irreversible block (``irreversible``) or
+        actual head block (``head``)
+
+    .. code-block:: python
+
+        from nectar.transactiontracker import TransactionTracker
+        tracker = TransactionTracker.shared(mode="head")
+        future = tracker.track(account.transfer("test", 1, "HIVE"), timeout=60)
+        print(future.result()["block_num"])
+
+    """
+
+    def __init__(self, blockchain_instance=None, mode="irreversible", **kwargs):
+        self.blockchain = Blockchain(blockchain_instance=blockchain_instance, mode=mode, **kwargs)
+        self.lock = threading.Lock()
+        self._by_id = {}
+        self._by_signatures = {}
+        self._thread = None
+
+    @classmethod
+    def shared(cls, blockchain_instance=None, mode="irreversible"):
+        """Returns the tracker which is shared by all users of the given
+        blockchain instance and mode
+
+        :param Steem/Hive blockchain_instance: Steem or Hive instance
+        :param str mode: ``irreversible`` or ``head``
+        """
+        blockchain_instance = blockchain_instance or shared_blockchain_instance()
+        with _shared_lock:
+            trackers = blockchain_instance.transaction_trackers
+            if mode not in trackers:
+                trackers[mode] = cls(blockchain_instance=blockchain_instance, mode=mode)
+            return trackers[mode]
+
+    def __len__(self):
+        with self.lock:
+            return len(self._by_id) + len(self._by_signatures)
+
+    def track(self, transaction, limit=None, timeout=None, callback=None):
+        """Starts waiting for a transaction and returns a
+        :class:`concurrent.futures.Future`
+
+        The future resolves to the transaction as included in the block, with
+        the additional fields ``transaction_id``, ``block_num`` and
+        ``transaction_num``. It fails with
+        :class:`nectar.exceptions.TransactionExpired` when a block past the
+        expiration of the transaction was received, and with
+        :class:`nectar.exceptions.BlockWaitTimeExceeded` when ``limit`` or
+        ``timeout`` is exceeded.
+
+        :param transaction: transaction id, or signed transaction as returned by
+            :func:`nectar.transactionbuilder.TransactionBuilder.broadcast`
+        :param int limit: maximum number of blocks to wait for (default: None)
+        :param float timeout: maximum number of seconds to wait for. It is checked
+            whenever a new block was received (default: None)
+        :param callable callback: is called with the future, once it is done
+        """
+        if isinstance(transaction, str):
+            trx_id, signatures, expiration = transaction, None, None
+        else:
+            trx_id = transaction.get("trx_id", transaction.get("transaction_id"))
+            signatures = None
+            if trx_id is None:
+                signatures = tuple(sorted(transaction["signatures"]))
+            expiration = transaction.get("expiration")
+            if isinstance(expiration, str):
+                expiration = formatTimeString(expiration)
+        deadline = None
+        if timeout is not None:
+            deadline = time.monotonic() + timeout
+        with self.lock:
+            index = self._by_id if trx_id is not None else self._by_signatures
+            key = trx_id if trx_id is not None else signatures
+            # A transaction which is already tracked shares the same future
+            pending = index.get(key)
+            if pending is None:
+                pending = _PendingTransaction(trx_id, signatures, expiration, limit, deadline)
+                index[key] = pending
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+        if callback is not None:
+            pending.future.add_done_callback(callback)
+        return pending.future
+
+    def wait(self, transaction, limit=None, timeout=None):
+        """Blocks until the transaction was included into a block and returns it,
+        see :func:`track`
+        """
+        return self.track(transaction, limit=limit, timeout=timeout).result()
+
+    def _run(self):
+        try:
+            for block in self.blockchain.blocks():
+                self.process_block(block)
+                with self.lock:
+                    if not self._by_id and not self._by_signatures:
+                        self._thread = None
+                        return
+        except Exception as e:
+            log.warning(f"Transaction tracking stopped: {e}")
+            with self.lock:
+                pending = list(self._by_id.values()) + list(self._by_signatures.values())
+                self._by_id = {}
+                self._by_signatures = {}
+                self._thread = None
+            for p in pending:
+                p.future.set_exception(e)
+
+    def process_block(self, block):
+        """Resolves all pending transactions which are included in the block, and
+        fails the expired ones
+
+        :param Block block: full block
+        """
+        block_num = block.block_num
+        block_time = block.time()
+        transaction_ids = block.get("transaction_ids", [])
+        found = []
+        failed = []
+        now = time.monotonic()
+        with self.lock:
+            for trx_num, tx in enumerate(block.get("transactions", [])):
+                trx_id = transaction_ids[trx_num] if trx_num < len(transaction_ids) else None
+                pending = self._by_id.pop(trx_id, None)
+                if pending is None and self._by_signatures:
+                    signatures = tuple(sorted(tx.get("signatures", [])))
+                    pending = self._by_signatures.pop(signatures, None)
+                if pending is not None:
+                    trx = {"transaction_id": trx_id}
+                    trx.update(tx)
+                    trx.update({"block_num": block_num, "transaction_num": trx_num})
+                    found.append((pending, trx))
+            for index in [self._by_id, self._by_signatures]:
+                for key, pending in list(index.items()):
+                    pending.blocks += 1
+                    if pending.expiration is not None and block_time > pending.expiration:
+                        error = TransactionExpired(
+                            "Transaction expired at %s without being included" % pending.expiration
+                        )
+                    elif pending.limit is not None and pending.blocks > pending.limit:
+                        error = BlockWaitTimeExceeded(
+                            "The operation has not been added after %d blocks!" % pending.limit
+                        )
+                    elif pending.deadline is not None and now > pending.deadline:
+                        error = BlockWaitTimeExceeded("Transaction was not confirmed in time")
+                    else:
+                        continue
+                    del index[key]
+                    failed.append((pending, error))
+        for pending, trx in found:
+            pending.future.set_result(trx)
+        for pending, error in failed:
+            pending.future.set_exception(error)
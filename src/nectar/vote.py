@@ -7,6 +7,7 @@ from prettytable import PrettyTable
 from nectarapi.exceptions import InvalidParameters, UnknownKey
 
 from .account import Account
+from .amountarray import AmountArray
 from .blockchainobject import BlockchainObject
 from .comment import Comment
 from .exceptions import VoteDoesNotExistsException
@@ -259,6 +260,20 @@ class VotesObject(list):
         )
         return sortedList
 
+    def get_payout_array(self, use_stored_data=True):
+        """Returns the current value of all votes in the backed token (e.g. HBD)
+        as :class:`nectar.amountarray.AmountArray` with the voters as accounts.
+        numpy needs to be installed.
+
+        :param bool use_stored_data: use the stored reward fund and median price
+        """
+        return AmountArray.from_rshares(
+            [vote.rshares for vote in self],
+            accounts=[vote.voter for vote in self],
+            blockchain_instance=self.blockchain,
+            use_stored_data=use_stored_data,
+        )
+
     def printAsTable(
         self,
         voter=None,
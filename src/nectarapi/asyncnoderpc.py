@@ -0,0 +1,481 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import base64
+import logging
+import socket
+import ssl
+import struct
+import time
+from urllib.parse import urlparse
+
+from nectargraphenebase.version import version as nectar_version
+
+from . import exceptions
+from .graphenerpc import GrapheneRPC
+from .jsoncodec import dumps, loads
+from .node import Nodes
+from .noderpc import NodeRPC
+from .rpcutils import get_api_name, get_query
+
+log = logging.getLogger(__name__)
+
+
+class _AsyncNodes(Nodes):
+    """Nodes, which remember the retry delay instead of sleeping, so that the
+    event loop is not blocked"""
+
+    def __init__(self, *args, **kwargs):
+        super(_AsyncNodes, self).__init__(*args, **kwargs)
+        self.retry_delay = 0
+
+    def sleep_and_check_retries(self, errorMsg=None, sleep=True, call_retry=False, showMsg=True):
+        super(_AsyncNodes, self).sleep_and_check_retries(
+            errorMsg, sleep=False, call_retry=call_retry, showMsg=showMsg
+        )
+        if sleep:
+            self.retry_delay = max(self.retry_delay, self.prepare_retry(call_retry=call_retry))
+
+    def pop_retry_delay(self):
+        delay = self.retry_delay
+        self.retry_delay = 0
+        return delay
+
+
+class _ConnectionPool(object):
+    """Keep-alive HTTP/1.1 connections to one node, built on asyncio streams.
+    Connections are tunneled through ``proxy`` when it is set, either a SOCKS5
+    (``socks5://``, ``socks5h://``) or an HTTP (``http://``) proxy url.
+    """
+
+    def __init__(self, url, max_connections, timeout, user=None, password=None, proxy=None):
+        parsed = urlparse(url)
+        self.host = parsed.hostname
+        self.use_ssl = parsed.scheme == "https"
+        self.port = parsed.port or (443 if self.use_ssl else 80)
+        self.path = parsed.path or "/"
+        if parsed.query:
+            self.path += "?" + parsed.query
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.proxy = urlparse(proxy) if proxy else None
+        self._semaphore = None
+        self._idle = []
+        self._ssl_context = ssl.create_default_context() if self.use_ssl else None
+        host = self.host if parsed.port is None else "%s:%d" % (self.host, parsed.port)
+        self._header = (
+            "POST {} HTTP/1.1\r\n"
+            "Host: {}\r\n"
+            "User-Agent: nectar v{}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            "Connection: keep-alive\r\n"
+        ).format(self.path, host, nectar_version)
+        if user is not None and password is not None:
+            credentials = base64.b64encode(("%s:%s" % (user, password)).encode("utf8"))
+            self._header += "Authorization: Basic %s\r\n" % credentials.decode("ascii")
+
+    async def post(self, body):
+        """Sends the body and returns the status code and the reply body"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_connections)
+        async with self._semaphore:
+            reused = bool(self._idle)
+            while True:
+                if self._idle:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.wait_for(self._connect(), self.timeout)
+                try:
+                    status, data, keep_alive = await asyncio.wait_for(
+                        self._request(reader, writer, body), self.timeout
+                    )
+                except (ConnectionError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    if reused:
+                        # The node closed an idle connection, retry on a new one
+                        log.debug(f"Idle connection closed: {e}")
+                        reused = bool(self._idle)
+                        continue
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return status, data
+
+    async def _connect(self):
+        server_hostname = self.host if self.use_ssl else None
+        if self.proxy is None:
+            return await asyncio.open_connection(
+                self.host, self.port, ssl=self._ssl_context, server_hostname=server_hostname
+            )
+        loop = asyncio.get_running_loop()
+        proxy_port = self.proxy.port or (1080 if self.proxy.scheme != "http" else 8080)
+        family, type_, proto, _, address = (
+            await loop.getaddrinfo(self.proxy.hostname, proxy_port, type=socket.SOCK_STREAM)
+        )[0]
+        sock = socket.socket(family, type_, proto)
+        sock.setblocking(False)
+        try:
+            await loop.sock_connect(sock, address)
+            if self.proxy.scheme == "http":
+                await self._http_tunnel(loop, sock)
+            else:
+                await self._socks5_tunnel(loop, sock)
+        except BaseException:
+            sock.close()
+            raise
+        return await asyncio.open_connection(
+            sock=sock, ssl=self._ssl_context, server_hostname=server_hostname
+        )
+
+    @staticmethod
+    async def _recv_exactly(loop, sock, size):
+        data = b""
+        while len(data) < size:
+            chunk = await loop.sock_recv(sock, size - len(data))
+            if not chunk:
+                raise ConnectionError("Proxy closed the connection")
+            data += chunk
+        return data
+
+    async def _socks5_tunnel(self, loop, sock):
+        """Opens a connection to the node over a SOCKS5 proxy (RFC 1928 and 1929)"""
+        user, password = self.proxy.username, self.proxy.password
+        methods = b"\x00\x02" if user is not None else b"\x00"
+        await loop.sock_sendall(sock, b"\x05" + bytes([len(methods)]) + methods)
+        _, method = await self._recv_exactly(loop, sock, 2)
+        if method == 0x02 and user is not None:
+            user, password = user.encode("utf8"), (password or "").encode("utf8")
+            await loop.sock_sendall(
+                sock, b"\x01" + bytes([len(user)]) + user + bytes([len(password)]) + password
+            )
+            if (await self._recv_exactly(loop, sock, 2))[1] != 0:
+                raise ConnectionError("SOCKS5 proxy authentication failed")
+        elif method != 0x00:
+            raise ConnectionError("SOCKS5 proxy refused the authentication methods")
+        if self.proxy.scheme == "socks5h":
+            # The proxy resolves the host name
+            host = self.host.encode("idna")
+            address = b"\x03" + bytes([len(host)]) + host
+        else:
+            family, _, _, _, sockaddr = (
+                await loop.getaddrinfo(self.host, self.port, type=socket.SOCK_STREAM)
+            )[0]
+            address = (b"\x04" if family == socket.AF_INET6 else b"\x01") + socket.inet_pton(
+                family, sockaddr[0]
+            )
+        await loop.sock_sendall(sock, b"\x05\x01\x00" + address + struct.pack(">H", self.port))
+        _, reply, _, address_type = await self._recv_exactly(loop, sock, 4)
+        if reply != 0:
+            raise ConnectionError("SOCKS5 proxy error %d" % reply)
+        if address_type == 0x03:
+            size = (await self._recv_exactly(loop, sock, 1))[0]
+        else:
+            size = 16 if address_type == 0x04 else 4
+        await self._recv_exactly(loop, sock, size + 2)
+
+    async def _http_tunnel(self, loop, sock):
+        """Opens a connection to the node with CONNECT over an HTTP proxy"""
+        target = "%s:%d" % (self.host, self.port)
+        request = "CONNECT {0} HTTP/1.1\r\nHost: {0}\r\n".format(target)
+        if self.proxy.username is not None:
+            credentials = "%s:%s" % (self.proxy.username, self.proxy.password or "")
+            request += "Proxy-Authorization: Basic %s\r\n" % base64.b64encode(
+                credentials.encode("utf8")
+            ).decode("ascii")
+        await loop.sock_sendall(sock, (request + "\r\n").encode("latin-1"))
+        # Read byte by byte, nothing after the header belongs to the proxy
+        header = b""
+        while not header.endswith(b"\r\n\r\n"):
+            header += await self._recv_exactly(loop, sock, 1)
+        status = header.split(b"\r\n", 1)[0].split()
+        if len(status) < 2 or status[1] != b"200":
+            raise ConnectionError("HTTP proxy error: %s" % header.split(b"\r\n", 1)[0])
+
+    async def _request(self, reader, writer, body):
+        writer.write(
+            (self._header + "Content-Length: %d\r\n\r\n" % len(body)).encode("latin-1") + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    # Skip trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return status, data, keep_alive
+
+    def close(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            writer.close()
+
+
+class AsyncNodeRPC(object):
+    """This class allows to call API methods of the witness nodes from asyncio
+    code. It follows the node failover and retry semantics of
+    :class:`nectarapi.noderpc.NodeRPC`, without blocking the event loop.
+
+    Requests are sent over keep-alive HTTP/1.1 connections which are built on
+    asyncio streams. Many coroutines can call the nodes at the same time, at
+    most ``max_connections`` requests per node are sent concurrently.
+
+    :param str urls: Either a single Http URL, or a list of URLs. Websocket
+        URLs are skipped.
+    :param str user: Username for Authentication
+    :param str password: Password for Authentication
+    :param int num_retries: Try x times to num_retries to a node on disconnect, -1 for indefinitely
+    :param int num_retries_call: Repeat num_retries_call times a rpc call on node error (default is 5)
+    :param int timeout: Timeout setting for https nodes (default is 60)
+    :param bool use_condenser: Use the old condenser_api rpc protocol
+    :param int max_connections: Maximum number of connections per node (default is 32)
+    :param bool use_tor: When set to true, 'socks5h://localhost:9050' is set as proxy
+    :param dict proxies: Proxy urls by url scheme, e.g.
+        ``{"https": "socks5h://localhost:1080"}``. SOCKS5 and HTTP proxies are supported.
+    :param bool adaptive_node_selection: Send each call to the node with the lowest
+        latency and error rate, see :func:`nectarapi.node.Nodes.select_node`
+        (default is False)
+
+    .. code-block:: python
+
+        import asyncio
+        from nectarapi.asyncnoderpc import AsyncNodeRPC
+
+        async def main():
+            async with AsyncNodeRPC("https://api.hive.blog") as rpc:
+                blocks = await asyncio.gather(
+                    *[rpc.get_block({"block_num": n}, api="block") for n in range(1, 101)]
+                )
+
+        asyncio.run(main())
+
+    """
+
+    def __init__(self, urls, user=None, password=None, **kwargs):
+        self.timeout = kwargs.get("timeout", 60)
+        self.use_condenser = kwargs.get("use_condenser", False)
+        self.max_connections = kwargs.get("max_connections", 32)
+        self.adaptive_node_selection = kwargs.get("adaptive_node_selection", False)
+        self.proxies = dict(kwargs.get("proxies") or {})
+        if kwargs.get("use_tor", False):
+            self.proxies["http"] = "socks5h://localhost:9050"
+            self.proxies["https"] = "socks5h://localhost:9050"
+        for proxy in self.proxies.values():
+            if urlparse(proxy).scheme not in ("socks5", "socks5h", "http"):
+                raise ValueError("Unsupported proxy: %s" % proxy)
+        nodes = Nodes(urls, -1, -1)
+        urls = [nodes[i].url for i in range(len(nodes)) if nodes[i].url[:4] == "http"]
+        if len(nodes) > 0 and len(urls) == 0:
+            raise exceptions.WorkingNodeMissing("AsyncNodeRPC needs at least one http node.")
+        self.nodes = _AsyncNodes(
+            urls, kwargs.get("num_retries", 100), kwargs.get("num_retries_call", 5)
+        )
+        self.user = user
+        self.password = password
+        self.url = None
+        self._pools = {}
+        self._request_id = 0
+        if self.nodes.working_nodes_count > 0:
+            self.url = next(self.nodes)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        self.close()
+
+    @property
+    def num_retries(self):
+        return self.nodes.num_retries
+
+    @property
+    def num_retries_call(self):
+        return self.nodes.num_retries_call
+
+    @property
+    def error_cnt_call(self):
+        return self.nodes.error_cnt_call
+
+    @property
+    def error_cnt(self):
+        return self.nodes.error_cnt
+
+    def get_request_id(self):
+        """Get request id."""
+        self._request_id += 1
+        return self._request_id
+
+    def get_use_appbase(self):
+        """Returns True if appbase calls are used"""
+        return not self.use_condenser
+
+    def next(self):
+        """Switches to the next node url"""
+        self.url = next(self.nodes)
+        self.nodes.reset_error_cnt_call()
+
+    def close(self):
+        """Closes all idle connections"""
+        for (loop, url), pool in self._pools.items():
+            if not loop.is_closed():
+                pool.close()
+        self._pools = {}
+
+    def _get_pool(self, url):
+        """Returns the connection pool of the url for the running event loop, as
+        connections can not be shared between event loops
+        """
+        key = (asyncio.get_running_loop(), url)
+        if key not in self._pools:
+            # The connections of a closed event loop are gone with it
+            self._pools = {k: pool for k, pool in self._pools.items() if not k[0].is_closed()}
+            self._pools[key] = _ConnectionPool(
+                url,
+                self.max_connections,
+                self.timeout,
+                self.user,
+                self.password,
+                self.proxies.get(urlparse(url).scheme),
+            )
+        return self._pools[key]
+
+    # Reply processing and error classification are shared with the
+    # synchronous client, they only use self.nodes and self.next()
+    _check_for_server_error = GrapheneRPC._check_for_server_error
+    _process_reply = GrapheneRPC._process_reply
+    _retry_on_next_node = NodeRPC._retry_on_next_node
+    _check_error_message = NodeRPC._check_error_message
+    _switch_to_next_node = NodeRPC._switch_to_next_node
+    _check_api_name = NodeRPC._check_api_name
+
+    async def _send(self, payload):
+        """Sends the payload, switches the node on connection errors"""
+        if self.nodes.working_nodes_count == 0:
+            raise exceptions.WorkingNodeMissing("No working nodes available.")
+        data = dumps(payload)
+        while True:
+            self.nodes.increase_error_cnt_call()
+            start_time = time.monotonic()
+            try:
+                status, reply = await self._get_pool(self.url).post(data)
+                if status == 401:
+                    raise exceptions.UnauthorizedError
+                if bool(reply):
+                    self.nodes.record_latency(time.monotonic() - start_time)
+                    break
+                try:
+                    self.nodes.sleep_and_check_retries("Empty Reply", call_retry=True)
+                except exceptions.CallRetriesReached:
+                    self.nodes.increase_error_cnt()
+                    self.nodes.sleep_and_check_retries("Empty Reply", sleep=False, call_retry=False)
+                    self.next()
+            except KeyboardInterrupt:
+                raise
+            except (exceptions.NumRetriesReached, exceptions.CallRetriesReached):
+                raise
+            except Exception as e:
+                self.nodes.increase_error_cnt()
+                self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
+                self.next()
+            await asyncio.sleep(self.nodes.pop_retry_delay())
+        try:
+            ret = loads(reply)
+        except ValueError:
+            reply = reply.decode("utf8", errors="replace")
+            log.error(f"Non-JSON response: {reply} Node: {self.url}")
+            self._check_for_server_error(reply)
+        return self._process_reply(ret)
+
+    async def rpcexec(self, payload):
+        """Execute a call by sending the payload.
+
+        :param json payload: Payload data
+        :raises ValueError: if the server does not respond in proper JSON format
+        :raises RPCError: if the server returns an error
+        :raises CallRetriesReached: if the call failed ``num_retries_call`` times
+        """
+        if self.url is None:
+            raise exceptions.RPCConnection("RPC is not connected!")
+        if self.adaptive_node_selection:
+            url = self.nodes.select_node()
+            if url != self.url:
+                self.url = url
+                self.nodes.reset_error_cnt_call()
+        doRetry = True
+        maxRetryCountReached = False
+        while doRetry and not maxRetryCountReached:
+            doRetry = False
+            try:
+                return await self._send(payload)
+            except exceptions.RPCErrorDoRetry as e:
+                msg = exceptions.decodeRPCErrorMsg(e).strip()
+                try:
+                    self.nodes.sleep_and_check_retries(str(msg), call_retry=True)
+                    doRetry = True
+                except exceptions.CallRetriesReached:
+                    if self.nodes.working_nodes_count > 1:
+                        self._retry_on_next_node(msg)
+                        doRetry = True
+                    else:
+                        raise exceptions.CallRetriesReached
+            except exceptions.RPCError as e:
+                try:
+                    doRetry = self._check_error_message(e, self.error_cnt_call)
+                except exceptions.CallRetriesReached:
+                    msg = exceptions.decodeRPCErrorMsg(e).strip()
+                    if self.nodes.working_nodes_count > 1:
+                        self._retry_on_next_node(msg)
+                        doRetry = True
+                    else:
+                        raise exceptions.CallRetriesReached
+            await asyncio.sleep(self.nodes.pop_retry_delay())
+            maxRetryCountReached = self.nodes.num_retries_call_reached
+        raise exceptions.CallRetriesReached
+
+    def __getattr__(self, name):
+        """Map all methods to RPC calls and pass through the arguments."""
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def method(*args, **kwargs):
+            api_name = get_api_name(True, *args, **kwargs)
+            if self.use_condenser and api_name != "bridge":
+                api_name = "condenser_api"
+            if api_name is None:
+                api_name = "database_api"
+            query = get_query(
+                not self.use_condenser or api_name == "bridge",
+                self.get_request_id(),
+                api_name,
+                name,
+                args,
+            )
+            return await self.rpcexec(query)
+
+        return method
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+from .exceptions import RPCError
+
+log = logging.getLogger(__name__)
+
+# Result of a call, which has to be sent on its own
+_FALLBACK = object()
+
+
+class CoalescedBatch(list):
+    """Batch of queries sent by :class:`CallCoalescer`. The rpc returns the
+    unprocessed replies of such a batch, so that each one can be sent back to
+    its caller by id."""
+
+
+class CallCoalescer(object):
+    """Gathers single JSON-RPC calls of many threads and sends them as one batch
+
+    A dispatcher thread waits up to ``window`` seconds after the first call
+    (or until ``max_size`` calls are pending), sends all pending calls as one
+    JSON-RPC batch and returns each result to its caller by request id. When
+    the batch fails, for example because the node does not accept batches,
+    every caller sends its call on its own. A node, which rejected a batch,
+    is not sent batches anymore.
+
+    The dispatcher thread exits when no calls were made for a second. Calls,
+    which the dispatcher thread makes itself (e.g. while reconnecting), are
+    sent on their own.
+
+    :param GrapheneRPC rpc: rpc, which sends the batches
+    :param float window: seconds to wait for more calls (default is 0.005)
+    :param int max_size: maximum number of calls in one batch (default is 100)
+
+    .. code-block:: python
+
+        from concurrent.futures import ThreadPoolExecutor
+        from nectarapi.noderpc import NodeRPC
+        rpc = NodeRPC("https://api.hive.blog", coalesce_calls=True)
+        with ThreadPoolExecutor(32) as pool:
+            accounts = list(pool.map(
+                lambda name: rpc.find_accounts({"accounts": [name]}, api="database"),
+                names,
+            ))
+
+    """
+
+    def __init__(self, rpc, window=0.005, max_size=100):
+        self.rpc = rpc
+        self.window = window
+        self.max_size = max_size
+        self.condition = threading.Condition()
+        self.rejected_urls = set()
+        self.stats = {"batches": 0, "coalesced_calls": 0, "batch_fallbacks": 0}
+        self._pending = []
+        self._dispatcher = None
+
+    def accepts(self, query):
+        """Returns True when the query can be coalesced on the current node"""
+        return isinstance(query, dict) and self.rpc.url not in self.rejected_urls
+
+    def call(self, query):
+        """Adds the query to the next batch and returns its result"""
+        if threading.current_thread() is self._dispatcher:
+            # Calls of the dispatcher itself (e.g. get_config while it
+            # reconnects after a failed batch) could never be sent
+            return self.rpc.rpcexec(query)
+        future = Future()
+        with self.condition:
+            self._pending.append((query, future))
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch_loop, daemon=True)
+                self._dispatcher.start()
+            self.condition.notify_all()
+        result = future.result()
+        if result is _FALLBACK:
+            return self.rpc.rpcexec(query)
+        return result
+
+    def _dispatch_loop(self):
+        while True:
+            with self.condition:
+                if not self._pending:
+                    self.condition.wait(1)
+                    if not self._pending:
+                        self._dispatcher = None
+                        return
+                deadline = time.monotonic() + self.window
+                while len(self._pending) < self.max_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self.condition.wait(timeout)
+                calls = self._pending[: self.max_size]
+                self._pending = self._pending[self.max_size :]
+            self._send(calls)
+
+    def _send(self, calls):
+        if len(calls) == 1:
+            query, future = calls[0]
+            future.set_result(_FALLBACK)
+            return
+        batch = CoalescedBatch()
+        for request_id, (query, future) in enumerate(calls):
+            query = dict(query)
+            query["id"] = request_id
+            batch.append(query)
+        url = self.rpc.url
+        try:
+            replies = self.rpc.rpcexec(batch)
+            if not isinstance(replies, list):
+                raise ValueError("Batch reply is not a list")
+        except Exception as e:
+            log.warning(
+                f"Batch of {len(calls)} calls failed on {url}, sending them one by one: {e}"
+            )
+            if isinstance(e, (RPCError, ValueError)):
+                # The node answered, but not to the batch
+                self.rejected_urls.add(url)
+            self.stats["batch_fallbacks"] += 1
+            for query, future in calls:
+                future.set_result(_FALLBACK)
+            return
+        self.stats["batches"] += 1
+        self.stats["coalesced_calls"] += len(calls)
+        replies_by_id = {r.get("id"): r for r in replies if isinstance(r, dict)}
+        for request_id, (query, future) in enumerate(calls):
+            reply = replies_by_id.get(request_id)
+            if isinstance(reply, dict) and "result" in reply and "error" not in reply:
+                future.set_result(reply["result"])
+            else:
+                # Errors are raised by a call of its own, which is handled as usual
+                future.set_result(_FALLBACK)
@@ -1,12 +1,16 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
 import re
 import ssl
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from itertools import chain, islice
 
 from nectargraphenebase.chains import known_chains
 from nectargraphenebase.version import version as nectar_version
 
+from .coalescer import CallCoalescer, CoalescedBatch
 from .exceptions import (
     CallRetriesReached,
     RPCConnection,
@@ -15,8 +19,20 @@ from .exceptions import (
     UnauthorizedError,
     WorkingNodeMissing,
 )
+from .jsoncodec import LazyJson, dumps, loads
+from .jsonstream import iter_json_items
 from .node import Nodes
-from .rpcutils import get_api_name, get_query, is_network_appbase_ready
+from .ratelimit import THROTTLE_STATUS_CODES, get_node_limiters, parse_retry_after
+from .responsecache import IMMUTABLE, NEVER, ResponseCache, get_block_num
+from .rpcutils import (
+    get_api_name,
+    get_chain_id,
+    get_query,
+    is_broadcast_query,
+    is_network_appbase_ready,
+)
+from .singleflight import SingleFlight, get_call_key
+from .wspipeline import WebsocketPipeline
 
 WEBSOCKET_MODULE = None
 if not WEBSOCKET_MODULE:
@@ -44,6 +60,8 @@ if not REQUEST_MODULE:
 
 log = logging.getLogger(__name__)
 
+_END = object()
+
 
 class SessionInstance(object):
     """Singleton for the Session Instance"""
@@ -93,6 +111,39 @@ class GrapheneRPC(object):
     :param bool use_condenser: Use the old condenser_api RPC protocol
     :param bool use_tor: Use Tor proxy for connections
     :param dict custom_chains: Custom chains to add to known chains
+    :param bool ws_pipelining: Send requests over websockets without waiting for the
+        previous reply, so that many threads can share one connection (default is False)
+    :param bool adaptive_node_selection: Send each call of a http node list to the node
+        with the lowest latency and error rate. The node is only switched when its
+        score is clearly better, and the new node is verified like on connect
+        (default is False)
+    :param bool hedge_requests: When a http node has not answered within the
+        ``hedge_percentile`` of its recent latencies, the same request is also sent
+        to the next best node and the first good reply is used. Broadcasts are
+        never hedged (default is False)
+    :param float hedge_percentile: Latency percentile of the current node after which
+        a request is hedged (default is 95)
+    :param bool coalesce_calls: Gather the calls of many threads and send them as one
+        JSON-RPC batch, see :class:`nectarapi.coalescer.CallCoalescer` (default is False)
+    :param float coalesce_window: Seconds to wait for more calls to coalesce (default is 0.005)
+    :param int coalesce_max_size: Maximum number of calls in one batch (default is 100)
+    :param bool deduplicate_calls: Identical calls of many threads, which are made while
+        the same call is in flight, wait for its result instead of asking the node again,
+        see :class:`nectarapi.singleflight.SingleFlight` (default is False)
+    :param bool response_cache: Cache results by method aware policies, see
+        :class:`nectarapi.responsecache.ResponseCache` (default is False)
+    :param int cache_max_bytes: Maximum size of the cached results (default is 32 MB)
+    :param dict cache_policies: Cache policies per method name, which are added to
+        :data:`nectarapi.responsecache.DEFAULT_CACHE_POLICIES`
+    :param bool breaker_probes: Probe http nodes with an open circuit breaker in a
+        background thread, so that they are used again as soon as they work (default is True)
+    :param bool rate_limit: Limit the requests to each http node by an adaptive token
+        bucket and concurrency limit, which back off on 429 and 503 replies and on
+        ``Retry-After`` headers, see :class:`nectarapi.ratelimit.AdaptiveLimiter`
+        (default is False)
+    :param node_limiters: :class:`nectarapi.ratelimit.NodeLimiters` to use with
+        ``rate_limit``, the limiters shared by all instances of the process are used
+        when not set
     """
 
     def __init__(self, urls, user=None, password=None, **kwargs):
@@ -106,6 +157,39 @@ class GrapheneRPC(object):
         self.use_condenser = kwargs.get("use_condenser", False)
         self.use_tor = kwargs.get("use_tor", False)
         self.disable_chain_detection = kwargs.get("disable_chain_detection", False)
+        self.ws_pipelining = kwargs.get("ws_pipelining", False)
+        self.adaptive_node_selection = kwargs.get("adaptive_node_selection", False)
+        self.hedge_requests = kwargs.get("hedge_requests", False)
+        self.hedge_percentile = kwargs.get("hedge_percentile", 95)
+        self._hedge_executor = None
+        self.breaker_probes = kwargs.get("breaker_probes", True)
+        self.node_limiters = None
+        if kwargs.get("rate_limit", False):
+            self.node_limiters = kwargs.get("node_limiters") or get_node_limiters()
+        self._probe_thread = None
+        self._probe_lock = threading.Lock()
+        self.coalescer = None
+        if kwargs.get("coalesce_calls", False):
+            self.coalescer = CallCoalescer(
+                self,
+                window=kwargs.get("coalesce_window", 0.005),
+                max_size=kwargs.get("coalesce_max_size", 100),
+            )
+        self.singleflight = None
+        if kwargs.get("deduplicate_calls", False):
+            self.singleflight = SingleFlight()
+        self.response_cache = None
+        if kwargs.get("response_cache", False):
+            self.response_cache = ResponseCache(
+                max_bytes=kwargs.get("cache_max_bytes", 32 * 1024 * 1024),
+                policies=kwargs.get("cache_policies"),
+            )
+        self._lib_refresh_time = 0
+        self._connecting = False
+        # Set by rpcconnect or get_network, results are cached per chain
+        self.chain_id = None
+        self._stats_lock = threading.Lock()
+        self.rpc_stats = {"calls": 0}
         self.known_chains = known_chains
         custom_chain = kwargs.get("custom_chains", {})
         if len(custom_chain) > 0:
@@ -114,12 +198,14 @@ class GrapheneRPC(object):
                     self.known_chains[c] = custom_chain[c]
 
         self.nodes = Nodes(urls, num_retries, num_retries_call)
+        self.nodes.breaker_open_callback = self._start_breaker_probes
         if self.nodes.working_nodes_count == 0:
             self.current_rpc = self.rpc_methods["offline"]
 
         self.user = user
         self.password = password
         self.ws = None
+        self.ws_pipeline = None
         self.url = None
         self.session = None
         self.rpc_queue = []
@@ -156,6 +242,97 @@ class GrapheneRPC(object):
                 log.warning(str(e))
         self.rpcconnect()
 
+    def get_rpc_stats(self):
+        """Returns the number of calls, the number of deduplicated calls and
+        the statistics of the call coalescer as dict"""
+        with self._stats_lock:
+            stats = dict(self.rpc_stats)
+        if self.singleflight is not None:
+            stats["deduplicated_calls"] = self.singleflight.hits
+        if self.coalescer is not None:
+            stats.update(self.coalescer.stats)
+        if self.response_cache is not None:
+            stats.update(self.response_cache.get_stats())
+        return stats
+
+    def _count_call(self, key="calls"):
+        with self._stats_lock:
+            self.rpc_stats[key] = self.rpc_stats.get(key, 0) + 1
+
+    def _cached_call(self, api_name, name, args, execute):
+        """Returns the cached result of a call, or executes and caches it"""
+        cache = self.response_cache
+        policy = cache.get_policy(name)
+        if policy == NEVER or self.chain_id is None:
+            result = execute()
+            cache.observe(name, result)
+            return result
+        key = (self.chain_id,) + get_call_key(api_name, name, args)
+        try:
+            return cache.get(key)
+        except KeyError:
+            pass
+        result = execute()
+        if policy == IMMUTABLE and result:
+            block_num = get_block_num(args, result)
+            last_irreversible_block_num = cache.last_irreversible_block_num
+            if block_num is not None and (
+                last_irreversible_block_num is None or block_num > last_irreversible_block_num
+            ):
+                self._refresh_last_irreversible_block()
+        cache.set(key, name, args, result)
+        return result
+
+    def _refresh_last_irreversible_block(self):
+        """Lets the response cache learn the last irreversible block, at most
+        every three seconds"""
+        if time.monotonic() - self._lib_refresh_time < 3:
+            return
+        self._lib_refresh_time = time.monotonic()
+        try:
+            self.get_dynamic_global_properties(api="database")
+        except Exception as e:
+            log.debug(f"Could not refresh the last irreversible block: {e}")
+
+    def select_node(self):
+        """Switches to the best scoring node for the next call, see
+        :func:`nectarapi.node.Nodes.select_node`. Only http nodes are switched,
+        websocket connections stay on their node.
+
+        The new node is connected and checked as by :func:`rpcconnect`. When
+        this fails or the node has another chain id, the current node is kept.
+        """
+        if (
+            not self.adaptive_node_selection
+            or self._connecting
+            or self.ws is not None
+            or self.url is None
+        ):
+            return
+        previous_url, previous_rpc = self.url, self.current_rpc
+        index = self.nodes.current_node_index
+        url = self.nodes.select_node()
+        if url == previous_url:
+            return
+        log.debug("Switching to node %s" % url)
+        self._connecting = True
+        try:
+            self._use_url(url)
+            props = self._connect_node()
+            if props is not None and get_chain_id(props) != self.chain_id:
+                raise RPCError("Node %s has the chain id %s" % (url, get_chain_id(props)))
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            log.warning(f"Keeping node {previous_url}, switching to {url} failed: {e}")
+            self.nodes.record_error(url=url)
+            self.nodes.current_node_index = index
+            self.url = previous_url
+            self.current_rpc = previous_rpc
+            self.nodes.reset_error_cnt_call()
+        finally:
+            self._connecting = False
+
     def is_appbase_ready(self):
         """Check if node is appbase ready"""
         return self.current_rpc in [self.rpc_methods["wsappbase"], self.rpc_methods["appbase"]]
@@ -168,71 +345,97 @@ class GrapheneRPC(object):
         """Connect to next url in a loop."""
         if self.nodes.working_nodes_count == 0:
             return
-        while True:
-            if next_url:
-                self.url = next(self.nodes)
-                self.nodes.reset_error_cnt_call()
-                log.debug("Trying to connect to node %s" % self.url)
-                if self.url[:3] == "wss":
-                    self.ws = create_ws_instance(use_ssl=True)
-                    self.ws.settimeout(self.timeout)
-                    self.current_rpc = self.rpc_methods["wsappbase"]
-                elif self.url[:2] == "ws":
-                    self.ws = create_ws_instance(use_ssl=False)
-                    self.ws.settimeout(self.timeout)
-                    self.current_rpc = self.rpc_methods["wsappbase"]
-                else:
-                    self.ws = None
-                    self.session = shared_session_instance()
-                    if self.use_tor:
-                        self.session.proxies = {}
-                        self.session.proxies["http"] = "socks5h://localhost:9050"
-                        self.session.proxies["https"] = "socks5h://localhost:9050"
-                    self.current_rpc = self.rpc_methods["appbase"]
-                    self.headers = {
-                        "User-Agent": "nectar v%s" % (nectar_version),
-                        "content-type": "application/json; charset=utf-8",
-                    }
-            try:
-                if self.ws:
-                    self.ws.connect(self.url)
-                    self.rpclogin(self.user, self.password)
-                if self.disable_chain_detection:
-                    # Set to appbase rpc format
-                    if self.current_rpc == self.rpc_methods["ws"]:
-                        self.current_rpc = self.rpc_methods["wsappbase"]
-                    else:
-                        self.current_rpc = self.rpc_methods["appbase"]
-                    break
+        connecting = self._connecting
+        self._connecting = True
+        try:
+            while True:
+                if next_url:
+                    if self.ws_pipeline is not None:
+                        try:
+                            self.rpcclose()
+                        except Exception as e:
+                            log.warning(str(e))
+                    self._use_url(next(self.nodes))
                 try:
-                    props = None
-                    if not self.use_condenser:
-                        props = self.get_config(api="database")
-                    else:
-                        props = self.get_config()
+                    props = self._connect_node()
+                    if props is not None:
+                        self.chain_id = get_chain_id(props)
+                    break
+                except KeyboardInterrupt:
+                    raise
                 except Exception as e:
-                    if re.search("Bad Cast:Invalid cast from type", str(e)):
-                        # retry with not appbase
-                        if self.current_rpc == self.rpc_methods["wsappbase"]:
-                            self.current_rpc = self.rpc_methods["ws"]
-                        else:
-                            self.current_rpc = self.rpc_methods["appbase"]
-                        props = self.get_config(api="database")
-                if props is None:
-                    raise RPCError("Could not receive answer for get_config")
-                if is_network_appbase_ready(props):
-                    if self.ws:
-                        self.current_rpc = self.rpc_methods["wsappbase"]
-                    else:
-                        self.current_rpc = self.rpc_methods["appbase"]
-                break
-            except KeyboardInterrupt:
-                raise
-            except Exception as e:
-                self.nodes.increase_error_cnt()
-                do_sleep = not next_url or (next_url and self.nodes.working_nodes_count == 1)
-                self.nodes.sleep_and_check_retries(str(e), sleep=do_sleep)
-                next_url = True
+                    self.nodes.increase_error_cnt()
+                    do_sleep = not next_url or (next_url and self.nodes.working_nodes_count == 1)
+                    self.nodes.sleep_and_check_retries(str(e), sleep=do_sleep)
+                    next_url = True
+        finally:
+            self._connecting = connecting
+
+    def _use_url(self, url):
+        """Sets the node url and prepares its connection"""
+        self.url = url
+        self.nodes.reset_error_cnt_call()
+        log.debug("Trying to connect to node %s" % self.url)
+        if self.url[:3] == "wss":
+            self.ws = create_ws_instance(use_ssl=True)
+            self.ws.settimeout(self.timeout)
+            self.current_rpc = self.rpc_methods["wsappbase"]
+        elif self.url[:2] == "ws":
+            self.ws = create_ws_instance(use_ssl=False)
+            self.ws.settimeout(self.timeout)
+            self.current_rpc = self.rpc_methods["wsappbase"]
+        else:
+            self.ws = None
+            self.ws_pipeline = None
+            self.session = shared_session_instance()
+            if self.use_tor:
+                self.session.proxies = {}
+                self.session.proxies["http"] = "socks5h://localhost:9050"
+                self.session.proxies["https"] = "socks5h://localhost:9050"
+            self.current_rpc = self.rpc_methods["appbase"]
+            self.headers = {
+                "User-Agent": "nectar v%s" % (nectar_version),
+                "content-type": "application/json; charset=utf-8",
+            }
+
+    def _connect_node(self):
+        """Connects to the node url and detects its rpc format. Returns the
+        config of the node, or None when the chain detection is disabled.
+        """
+        if self.ws:
+            self.ws.connect(self.url)
+            if self.ws_pipelining:
+                self.ws_pipeline = WebsocketPipeline(self.ws)
+            self.rpclogin(self.user, self.password)
+        if self.disable_chain_detection:
+            # Set to appbase rpc format
+            if self.current_rpc == self.rpc_methods["ws"]:
+                self.current_rpc = self.rpc_methods["wsappbase"]
+            else:
+                self.current_rpc = self.rpc_methods["appbase"]
+            return None
+        try:
+            props = None
+            if not self.use_condenser:
+                props = self.get_config(api="database")
+            else:
+                props = self.get_config()
+        except Exception as e:
+            if re.search("Bad Cast:Invalid cast from type", str(e)):
+                # retry with not appbase
+                if self.current_rpc == self.rpc_methods["wsappbase"]:
+                    self.current_rpc = self.rpc_methods["ws"]
+                else:
+                    self.current_rpc = self.rpc_methods["appbase"]
+                props = self.get_config(api="database")
+        if props is None:
+            raise RPCError("Could not receive answer for get_config")
+        if is_network_appbase_ready(props):
+            if self.ws:
+                self.current_rpc = self.rpc_methods["wsappbase"]
+            else:
+                self.current_rpc = self.rpc_methods["appbase"]
+        return props
 
     def rpclogin(self, user, password):
         """Login into Websocket"""
@@ -243,26 +446,165 @@ class GrapheneRPC(object):
         """Close Websocket"""
         if self.ws is None:
             return
+        if self.ws_pipeline is not None:
+            self.ws_pipeline.close()
+            self.ws_pipeline = None
+            return
         # if self.ws.connected:
         self.ws.close()
 
-    def request_send(self, payload):
-        if self.user is not None and self.password is not None:
-            response = self.session.post(
-                self.url,
-                data=payload,
-                headers=self.headers,
-                timeout=self.timeout,
-                auth=(self.user, self.password),
-            )
-        else:
-            response = self.session.post(
-                self.url, data=payload, headers=self.headers, timeout=self.timeout
-            )
+    def request_send(self, payload, url=None, stream=False):
+        if url is None:
+            url = self.url
+        limiter = None
+        if self.node_limiters is not None:
+            limiter = self.node_limiters.get(url)
+            if not limiter.acquire(timeout=self.timeout):
+                log.debug(f"Rate limit of {url} not released within {self.timeout} s")
+        start_time = time.monotonic()
+        try:
+            if self.user is not None and self.password is not None:
+                response = self.session.post(
+                    url,
+                    data=payload,
+                    headers=self.headers,
+                    timeout=self.timeout,
+                    auth=(self.user, self.password),
+                    stream=stream,
+                )
+            else:
+                response = self.session.post(
+                    url, data=payload, headers=self.headers, timeout=self.timeout, stream=stream
+                )
+        except BaseException:
+            if limiter is not None:
+                limiter.release()
+            raise
+        if limiter is not None:
+            if response.status_code in THROTTLE_STATUS_CODES:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                limiter.release(throttled=True, retry_after=retry_after)
+            else:
+                limiter.release(latency=time.monotonic() - start_time)
         if response.status_code == 401:
             raise UnauthorizedError
         return response
 
+    def hedged_request_send(self, payload):
+        """Sends the payload to the current node. When no reply was received
+        within the ``hedge_percentile`` of its recent latencies, the payload is
+        also sent to the best scoring other node. The first good response is
+        returned, the other request is cancelled or its response is discarded.
+
+        Only idempotent payloads may be sent by this method.
+        """
+        primary_url = self.url
+        delay = self.nodes.get_latency_percentile(self.hedge_percentile, url=primary_url)
+        hedge_url = self.nodes.get_hedge_url()
+        if delay is None or hedge_url is None:
+            return self.request_send(payload)
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="nectar-hedge"
+            )
+        started = {}
+
+        def submit(url):
+            future = self._hedge_executor.submit(self.request_send, payload, url)
+            started[future] = (url, time.monotonic())
+            return future
+
+        pending = {submit(primary_url)}
+        done, pending = wait(pending, timeout=delay)
+        if not done:
+            log.debug(f"No reply from {primary_url} after {delay:.3f} s, hedging to {hedge_url}")
+            pending.add(submit(hedge_url))
+        winner = None
+        fallback = None
+        while winner is None and (pending or done):
+            if not done:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            future = done.pop()
+            try:
+                response = future.result()
+            except Exception:
+                fallback = fallback or future
+                continue
+            if response.status_code < 500 and bool(response.content):
+                winner = future
+            else:
+                fallback = fallback or future
+        for future in pending | done:
+            if not future.cancel():
+                future.add_done_callback(self._discard_hedged_response(started[future]))
+        future = winner or fallback
+        url, start_time = started[future]
+        if winner is not None:
+            self.nodes.record_latency(time.monotonic() - start_time, url=url)
+        return future.result()
+
+    def _discard_hedged_response(self, started):
+        """Returns a callback, which records the latency of a losing request
+        and releases its connection"""
+        url, start_time = started
+
+        def discard(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            response = future.result()
+            if response.status_code < 500:
+                self.nodes.record_latency(time.monotonic() - start_time, url=url)
+            response.close()
+
+        return discard
+
+    def probe_node(self, url):
+        """Sends a cheap request to a http node and records the result in its
+        circuit breaker. Returns True when the node answered.
+        """
+        payload = dumps(
+            {
+                "jsonrpc": "2.0",
+                "id": 0,
+                "method": "database_api.get_dynamic_global_properties",
+                "params": {},
+            }
+        )
+        start_time = time.monotonic()
+        try:
+            response = self.request_send(payload, url=url)
+            ok = response.status_code == 200 and "result" in loads(response.content)
+        except Exception as e:
+            log.debug(f"Probe of {url} failed: {e}")
+            ok = False
+        if ok:
+            log.info(f"Node {url} answered the probe, closing its circuit breaker")
+            self.nodes.record_latency(time.monotonic() - start_time, url=url)
+        else:
+            self.nodes.record_error(url=url)
+        return ok
+
+    def _start_breaker_probes(self, url):
+        if not self.breaker_probes or self.session is None or url[:4] != "http":
+            return
+        with self._probe_lock:
+            if self._probe_thread is not None and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self._probe_breakers, daemon=True)
+            self._probe_thread.start()
+
+    def _probe_breakers(self):
+        """Probes half open http nodes until all breakers are closed"""
+        while True:
+            next_probe_time = self.nodes.get_next_probe_time()
+            urls = [url for url in self.nodes.get_probe_urls() if url[:4] == "http"]
+            if next_probe_time is None and len(urls) == 0:
+                return
+            for url in urls:
+                self.probe_node(url)
+            if next_probe_time is not None:
+                time.sleep(min(max(next_probe_time - time.time(), 0.05), 1))
+
     def ws_send(self, payload):
         if self.ws is None:
             raise RPCConnection("No websocket available!")
@@ -359,6 +701,7 @@ class GrapheneRPC(object):
 
         if chain_id is None:
             raise RPCError("Connecting to unknown network!")
+        self.chain_id = chain_id
         highest_version_chain = None
         for k, v in list(self.known_chains.items()):
             if (
@@ -384,6 +727,23 @@ class GrapheneRPC(object):
         else:
             return highest_version_chain
 
+    def _retry_throttled(self):
+        """Returns True, when a call, which the current node throttled, is sent
+        again to the same node. The rate limiter of the node delays the retry, so
+        that throttling does not count as node error. When the node asked for a
+        pause of more than one second and another node is available, or when the
+        call retries are used up, False is returned and the reply is handled as
+        server error.
+        """
+        self._count_call("throttled_calls")
+        if self.node_limiters is None or self.nodes.num_retries_call_reached:
+            return False
+        pause = self.node_limiters.get(self.url).get_pause()
+        if pause > 1 and self.nodes.get_hedge_url() is not None:
+            return False
+        log.warning(f"Node {self.url} throttled the call, retrying in {pause:.1f} seconds")
+        return True
+
     def _check_for_server_error(self, reply):
         """Checks for server error message in reply"""
         if re.search("Internal Server Error", reply) or re.search("500", reply):
@@ -431,27 +791,48 @@ class GrapheneRPC(object):
         :raises ValueError: if the server does not respond in proper JSON format
         :raises RPCError: if the server returns an error
         """
-        log.debug(f"Payload: {json.dumps(payload)}")
         if self.nodes.working_nodes_count == 0:
             raise WorkingNodeMissing("No working nodes available.")
         if self.url is None:
             raise RPCConnection("RPC is not connected!")
+        data = None
+        if self.ws_pipeline is None:
+            data = dumps(payload)
+            log.debug("Payload: %s", LazyJson(data))
+        else:
+            log.debug("Payload: %s", LazyJson(payload))
 
         reply = {}
         response = None
+        ret = None
         while True:
             self.nodes.increase_error_cnt_call()
+            start_time = time.monotonic()
             try:
-                if (
+                if self.ws_pipeline is not None:
+                    ret = self.ws_pipeline.call(payload, timeout=self.timeout)
+                    reply = ret
+                elif (
                     self.current_rpc == self.rpc_methods["ws"]
                     or self.current_rpc == self.rpc_methods["wsappbase"]
                 ):
-                    reply = self.ws_send(json.dumps(payload, ensure_ascii=False).encode("utf8"))
-                else:
-                    response = self.request_send(
-                        json.dumps(payload, ensure_ascii=False).encode("utf8")
+                    reply = self.ws_send(data if data is not None else dumps(payload))
+                elif self.hedge_requests and not is_broadcast_query(payload):
+                    response = self.hedged_request_send(
+                        data if data is not None else dumps(payload)
                     )
-                    reply = response.text
+                    reply = response.content
+                    # The latency was recorded for the node which answered
+                    start_time = None
+                else:
+                    response = self.request_send(data if data is not None else dumps(payload))
+                    reply = response.content
+                if (
+                    response is not None
+                    and response.status_code in THROTTLE_STATUS_CODES
+                    and self._retry_throttled()
+                ):
+                    continue
                 if not bool(reply):
                     try:
                         self.nodes.sleep_and_check_retries("Empty Reply", call_retry=True)
@@ -462,6 +843,8 @@ class GrapheneRPC(object):
                         )
                         self.rpcconnect()
                 else:
+                    if start_time is not None:
+                        self.nodes.record_latency(time.monotonic() - start_time)
                     break
             except KeyboardInterrupt:
                 raise
@@ -482,21 +865,135 @@ class GrapheneRPC(object):
                 self.nodes.sleep_and_check_retries(str(e), sleep=False, call_retry=False)
                 self.rpcconnect()
 
+        if ret is None and response is None:
+            try:
+                ret = loads(reply)
+            except ValueError:
+                log.error(f"Non-JSON response: {reply} Node: {self.url}")
+                self._check_for_server_error(reply)
+                raise RPCError("Invalid response format")
+        elif ret is None:
+            try:
+                ret = loads(reply)
+            except ValueError:
+                self._check_for_server_error(response.text)
+
+        log.debug("Reply: %s", LazyJson(reply))
+        if isinstance(payload, CoalescedBatch) and isinstance(ret, list):
+            # The coalescer returns each reply to its caller
+            self.nodes.reset_error_cnt_call()
+            return ret
+        return self._process_reply(ret)
+
+    def rpcexec_stream(self, payload, path=("result",)):
+        """Sends the payload and returns an iterator over the items of the array
+        at ``path`` of the reply. On http nodes, the items are decoded one by one
+        while the reply is read, see :func:`nectarapi.jsonstream.iter_json_items`,
+        so that large replies do not need memory for the whole reply text and
+        the whole decoded result at once.
+
+        The request is sent and the first item is decoded before this method
+        returns. Errors, non-200 replies and websocket nodes are handled by
+        :func:`rpcexec` as usual. When the stream fails after some items were
+        returned, the call is sent again by :func:`rpcexec`, which retries and
+        switches nodes, and the remaining items are returned from its reply.
+
+        :param json payload: Payload data
+        :param tuple path: keys leading from the reply to the array,
+            e.g. ``("result", "blocks")``
+
+        .. code-block:: python
+
+            blocks = rpc.get_block_range(
+                {"starting_block_num": 1, "count": 1000}, api="block", stream_path=("result", "blocks")
+            )
+
+        """
+        if self.ws is not None or self.session is None or not isinstance(payload, dict):
+            return self._iter_result_items(self.rpcexec(payload), path)
+        response = None
+        try:
+            start_time = time.monotonic()
+            response = self.request_send(dumps(payload), stream=True)
+            if response.status_code != 200:
+                raise RPCError("Status code %d" % response.status_code)
+            items = iter_json_items(response.iter_content(chunk_size=65536), path)
+            first = next(items, _END)
+            self.nodes.record_latency(time.monotonic() - start_time)
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            if response is not None:
+                response.close()
+            log.debug(f"Streaming failed, sending the call again: {e}")
+            return self._iter_result_items(self.rpcexec(payload), path)
+        if first is _END:
+            response.close()
+            return iter([])
+        return self._resume_on_error(chain([first], items), response, payload, path)
+
+    def _resume_on_error(self, items, response, payload, path):
+        count = 0
         try:
-            if response is None:
+            while True:
                 try:
-                    ret = json.loads(reply, strict=False)
-                except ValueError:
-                    log.error(f"Non-JSON response: {reply} Node: {self.url}")
-                    self._check_for_server_error(reply)
-                    raise RPCError("Invalid response format")
-            else:
-                ret = response.json()
-        except ValueError:
-            self._check_for_server_error(reply)
+                    item = next(items)
+                except StopIteration:
+                    return
+                except KeyboardInterrupt:
+                    raise
+                except Exception as e:
+                    log.warning(
+                        f"Streaming failed after {count} items, sending the call again: {e}"
+                    )
+                    break
+                count += 1
+                yield item
+        finally:
+            response.close()
+        # The items, which were already returned, are skipped
+        yield from islice(self._iter_result_items(self.rpcexec(payload), path), count, None)
+
+    @staticmethod
+    def _iter_result_items(result, path):
+        for key in path[1:]:
+            result = result.get(key) if isinstance(result, dict) else None
+        if isinstance(result, dict):
+            return iter(list(result.items()))
+        return iter(result or [])
 
-        log.debug(f"Reply: {json.dumps(reply)}")
+    def rpcexec_async(self, payload):
+        """
+        Sends the payload and returns a :class:`concurrent.futures.Future`, which
+        resolves to the result of the call.
+
+        On a pipelined websocket (``ws_pipelining=True``), the call returns at once
+        and many calls can be in flight on the same connection. Otherwise, the
+        call is executed by :func:`rpcexec` before the future is returned.
 
+        .. note:: Failed calls are not retried, the future fails instead.
+
+        :param json payload: Payload data
+        """
+        future = Future()
+        if self.ws_pipeline is None:
+            try:
+                future.set_result(self.rpcexec(payload))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        def process(reply_future):
+            try:
+                future.set_result(self._process_reply(reply_future.result()))
+            except Exception as e:
+                future.set_exception(e)
+
+        self.ws_pipeline.send(payload).add_done_callback(process)
+        return future
+
+    def _process_reply(self, ret):
+        """Returns the result of a decoded reply, raises RPCError on errors"""
         if isinstance(ret, dict) and "error" in ret:
             if isinstance(ret["error"], dict):
                 error_message = ret["error"].get(
@@ -540,6 +1037,8 @@ class GrapheneRPC(object):
             stored_num_retries_call = self.nodes.num_retries_call
             self.nodes.num_retries_call = kwargs.get("num_retries_call", stored_num_retries_call)
             add_to_queue = kwargs.get("add_to_queue", False)
+            return_future = kwargs.get("return_future", False)
+            stream_path = kwargs.get("stream_path")
             query = get_query(
                 self.is_appbase_ready() and not self.use_condenser or api_name == "bridge",
                 self.get_request_id(),
@@ -555,8 +1054,32 @@ class GrapheneRPC(object):
                 self.rpc_queue.append(query)
                 query = self.rpc_queue
                 self.rpc_queue = []
-            r = self.rpcexec(query)
-            self.nodes.num_retries_call = stored_num_retries_call
-            return r
+            self._count_call()
+            if stream_path is not None and isinstance(query, dict):
+                try:
+                    return self.rpcexec_stream(query, tuple(stream_path))
+                finally:
+                    self.nodes.num_retries_call = stored_num_retries_call
+            if return_future:
+                self.nodes.num_retries_call = stored_num_retries_call
+                return self.rpcexec_async(query)
+            is_read = isinstance(query, dict) and not is_broadcast_query(query)
+
+            def execute():
+                if self.coalescer is not None and is_read and self.coalescer.accepts(query):
+                    return self.coalescer.call(query)
+                return self.rpcexec(query)
+
+            def execute_once():
+                if self.singleflight is not None and is_read:
+                    return self.singleflight.do(get_call_key(api_name, name, args), execute)
+                return execute()
+
+            try:
+                if self.response_cache is not None and is_read:
+                    return self._cached_call(api_name, name, args, execute_once)
+                return execute_once()
+            finally:
+                self.nodes.num_retries_call = stored_num_retries_call
 
         return method
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+
+log = logging.getLogger(__name__)
+
+JSON_MODULES = ["orjson", "ujson", "json"]
+
+orjson = None
+ujson = None
+try:
+    import orjson
+except ImportError:
+    try:
+        import ujson
+    except ImportError:
+        pass
+
+
+class JsonCodec(object):
+    """Encodes and decodes the JSON-RPC messages
+
+    The fastest installed module of ``orjson``, ``ujson`` and the standard
+    library ``json`` is used. Messages, which the fast module can not handle
+    (e.g. unescaped control characters in strings or non-string dict keys),
+    are handled by the standard library with the previous, lenient settings.
+
+    :param str module: ``orjson``, ``ujson`` or ``json``, the fastest installed
+        module is used when not set
+    """
+
+    def __init__(self, module=None):
+        if module is None:
+            module = "orjson" if orjson is not None else "ujson" if ujson is not None else "json"
+        if module not in JSON_MODULES:
+            raise ValueError("module must be one of %s" % ", ".join(JSON_MODULES))
+        if (module == "orjson" and orjson is None) or (module == "ujson" and ujson is None):
+            raise ImportError("%s is not installed" % module)
+        self.module = module
+
+    def __repr__(self):
+        return "JsonCodec(%s)" % self.module
+
+    def dumps(self, obj):
+        """Returns obj as utf8 encoded JSON bytes"""
+        if self.module == "orjson":
+            try:
+                return orjson.dumps(obj)
+            except TypeError:
+                pass
+        elif self.module == "ujson":
+            try:
+                return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode(
+                    "utf8"
+                )
+            except (TypeError, OverflowError):
+                pass
+        return json.dumps(obj, ensure_ascii=False).encode("utf8")
+
+    def loads(self, data):
+        """Decodes JSON from bytes or str
+
+        :raises ValueError: when data is no valid JSON
+        """
+        if self.module == "orjson":
+            try:
+                return orjson.loads(data)
+            except ValueError:
+                pass
+        elif self.module == "ujson":
+            try:
+                return ujson.loads(data)
+            except ValueError:
+                pass
+        if isinstance(data, (bytes, bytearray)):
+            data = data.decode("utf8")
+        return json.loads(data, strict=False)
+
+
+_codec = JsonCodec()
+
+
+def get_json_codec():
+    """Returns the codec, which is used for all rpc messages"""
+    return _codec
+
+
+def set_json_module(module=None):
+    """Selects the JSON module for all rpc messages
+
+    :param str module: ``orjson``, ``ujson`` or ``json``, the fastest installed
+        module is used when not set
+    """
+    global _codec
+    _codec = JsonCodec(module)
+
+
+def dumps(obj):
+    """Returns obj as utf8 encoded JSON bytes, see :class:`JsonCodec`"""
+    return _codec.dumps(obj)
+
+
+def loads(data):
+    """Decodes JSON from bytes or str, see :class:`JsonCodec`"""
+    return _codec.loads(data)
+
+
+class LazyJson(object):
+    """Serializes obj only when it is formatted, so that debug log messages
+    cost nothing when debug logging is disabled
+
+    .. code-block:: python
+
+        log.debug("Payload: %s", LazyJson(payload))
+
+    """
+
+    __slots__ = ["obj"]
+
+    def __init__(self, obj):
+        self.obj = obj
+
+    def __str__(self):
+        if isinstance(self.obj, (bytes, bytearray)):
+            return self.obj.decode("utf8", errors="replace")
+        if isinstance(self.obj, str):
+            return self.obj
+        return dumps(self.obj).decode("utf8")
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+import re
+
+from .exceptions import RPCError
+from .jsoncodec import loads
+
+# Strings (which may contain structural characters), structural characters
+# and literals (numbers, true, false, null)
+_TOKEN = re.compile(rb'\s*(?:("(?:[^"\\]|\\.)*")|([\[\]{},:])|([^\s\[\]{},:"]+))', re.DOTALL)
+
+
+class _Scanner(object):
+    """Reads JSON tokens from an iterable of byte chunks. Only the part of
+    the input, which was not read yet (or which belongs to a marked value),
+    is kept in memory."""
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buf = b""
+        self.pos = 0
+        self.mark = None
+        self.eof = False
+
+    def _fill(self):
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            keep = self.pos if self.mark is None else self.mark
+            self.buf = self.buf[keep:] + chunk
+            self.pos -= keep
+            if self.mark is not None:
+                self.mark -= keep
+            return True
+        self.eof = True
+        return False
+
+    def next_token(self):
+        """Returns the next token as bytes, sets self.start to its position"""
+        while True:
+            m = _TOKEN.match(self.buf, self.pos)
+            # A token at the end of the buffer may continue in the next chunk
+            if m is not None and (m.end() < len(self.buf) or self.eof):
+                break
+            if not self.eof and self._fill():
+                continue
+            if m is not None:
+                break
+            if self.buf[self.pos :].strip():
+                raise ValueError("Invalid JSON at: %r" % self.buf[self.pos : self.pos + 20])
+            raise ValueError("Unexpected end of JSON")
+        self.pos = m.end()
+        self.start = m.start(m.lastindex)
+        return m.group(m.lastindex)
+
+    def expect(self, token):
+        if self.next_token() != token:
+            raise ValueError("Expected %r" % token)
+
+    def skip_value(self, token):
+        """Skips the rest of the value, which starts with token"""
+        if token not in (b"{", b"["):
+            return
+        depth = 1
+        while depth > 0:
+            token = self.next_token()
+            if token in (b"{", b"["):
+                depth += 1
+            elif token in (b"}", b"]"):
+                depth -= 1
+
+    def read_value(self, token):
+        """Decodes the value, which starts with token"""
+        self.mark = self.start
+        self.skip_value(token)
+        data = self.buf[self.mark : self.pos]
+        self.mark = None
+        return loads(data)
+
+    def find_key(self, key, error_key=None):
+        """Reads the members of an object until key is found. Returns False,
+        when the object ends before. Raises RPCError, when error_key is found."""
+        token = self.next_token()
+        while token != b"}":
+            if token == b",":
+                token = self.next_token()
+                continue
+            member = loads(token)
+            self.expect(b":")
+            value_token = self.next_token()
+            if member == key:
+                self.value_token = value_token
+                return True
+            if member == error_key:
+                error = self.read_value(value_token)
+                if isinstance(error, dict):
+                    error = error.get("detail", error.get("message", "Unknown error"))
+                raise RPCError(error)
+            self.skip_value(value_token)
+            token = self.next_token()
+        return False
+
+
+def iter_json_items(chunks, path=("result",)):
+    """Decodes the items of one array in a JSON-RPC reply one by one, while
+    the reply is read
+
+    Only the current item is decoded, so that memory stays flat no matter how
+    large the reply is. For an object at ``path``, ``(key, value)`` tuples are
+    yielded.
+
+    :param chunks: iterable of bytes, e.g. ``response.iter_content(65536)``
+    :param tuple path: keys leading from the reply to the array,
+        e.g. ``("result", "blocks")``
+    :raises RPCError: when the reply contains an error
+    :raises ValueError: when the reply is no valid JSON object
+
+    .. code-block:: python
+
+        from nectarapi.jsonstream import iter_json_items
+        chunks = [b'{"jsonrpc": "2.0", "result": {"blocks": [{"a": 1},', b' {"a": 2}]}, "id": 1}']
+        for block in iter_json_items(chunks, ("result", "blocks")):
+            print(block)
+
+    """
+    scanner = _Scanner(chunks)
+    scanner.expect(b"{")
+    for depth, key in enumerate(path):
+        if not scanner.find_key(key, error_key="error" if depth == 0 else None):
+            return
+        token = scanner.value_token
+        if depth < len(path) - 1 and token != b"{":
+            return
+    if token == b"[":
+        token = scanner.next_token()
+        while token != b"]":
+            if token != b",":
+                yield scanner.read_value(token)
+            token = scanner.next_token()
+    elif token == b"{":
+        token = scanner.next_token()
+        while token != b"}":
+            if token != b",":
+                member = loads(token)
+                scanner.expect(b":")
+                yield (member, scanner.read_value(scanner.next_token()))
+            token = scanner.next_token()
@@ -1,30 +1,160 @@
 # -*- coding: utf-8 -*-
 import logging
+import random
 import re
+import threading
 import time
+from collections import deque
 
 from .exceptions import CallRetriesReached, NumRetriesReached
 
 log = logging.getLogger(__name__)
 
 
+class CircuitBreaker(object):
+    """Circuit breaker of one node
+
+    The breaker is ``closed`` while the node works. After ``failure_threshold``
+    consecutive failures it opens, and the node is skipped for a jittered,
+    exponentially growing time. Afterwards the breaker is ``half_open``: the
+    next request (or background probe) decides whether it closes again or
+    opens for a longer time.
+
+    Times are wall clock times, so that the state can be exported and shared
+    between processes.
+
+    :param int failure_threshold: consecutive failures which open the breaker
+    :param float reset_timeout: seconds the breaker stays open the first time
+    :param float max_reset_timeout: maximum seconds the breaker stays open
+    :param float switch_ratio: :func:`select_node` only switches to a node, whose
+        score is below this ratio of the score of the current node
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=1.0, max_reset_timeout=60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self.open_until = 0.0
+        self.lock = threading.Lock()
+
+    def get_state(self, now=None):
+        """Returns ``closed``, ``open`` or ``half_open``"""
+        if self.opened == 0:
+            return "closed"
+        if now is None:
+            now = time.time()
+        if now < self.open_until:
+            return "open"
+        return "half_open"
+
+    def is_available(self, now=None):
+        """Returns True when requests may be sent to the node"""
+        return self.get_state(now) != "open"
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened = 0
+            self.open_until = 0.0
+
+    def record_failure(self, now=None):
+        """Counts a failure, returns True when the breaker was opened"""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            self.failures += 1
+            if self.opened == 0 and self.failures < self.failure_threshold:
+                return False
+            if self.opened > 0 and now < self.open_until:
+                return False
+            self.opened += 1
+            timeout = min(self.max_reset_timeout, self.reset_timeout * 2 ** (self.opened - 1))
+            self.open_until = now + timeout * random.uniform(0.5, 1.0)
+            return True
+
+    def export_state(self):
+        return {"failures": self.failures, "opened": self.opened, "open_until": self.open_until}
+
+    def import_state(self, state):
+        with self.lock:
+            self.failures = state.get("failures", 0)
+            self.opened = state.get("opened", 0)
+            self.open_until = state.get("open_until", 0.0)
+
+
 class Node(object):
     def __init__(self, url):
         self.url = url
         self.error_cnt = 0
         self.error_cnt_call = 0
+        # Exponentially weighted moving averages of the call latency in seconds
+        # and of the error rate, the error rate decays with error_half_life
+        self.latency = None
+        self.error_rate = 0.0
+        self.error_time = 0.0
+        # Recent latency samples, used for percentiles
+        self.latencies = deque(maxlen=100)
+        self.breaker = CircuitBreaker()
 
     def __repr__(self):
         return self.url
 
+    def get_error_rate(self, now, error_half_life):
+        """Returns the error rate, decayed since the last error"""
+        if not self.error_rate:
+            return 0.0
+        return self.error_rate * 0.5 ** ((now - self.error_time) / error_half_life)
+
+    def score(self, now, error_half_life=60, error_penalty=5):
+        """Returns the expected cost of a call in seconds, lower is better.
+        Nodes without latency samples score zero, so that they are tried.
+        """
+        latency = self.latency or 0.0
+        return latency + error_penalty * self.get_error_rate(now, error_half_life)
+
 
 class Nodes(list):
-    """Stores Node URLs and error counts"""
+    """Stores Node URLs and error counts
 
-    def __init__(self, urls, num_retries, num_retries_call):
+    Each node has a :class:`CircuitBreaker`. Nodes with an open breaker are
+    skipped, and a failed call fails over to another available node at once
+    instead of sleeping. Only when no other node is available, the caller
+    sleeps with a jittered exponential backoff.
+
+    :param float ewma_alpha: smoothing factor of the latency and error rate averages
+    :param float error_half_life: seconds after which the error rate is halved
+    :param int failure_threshold: consecutive failures which open the breaker of a node
+    :param float reset_timeout: seconds the breaker stays open the first time
+    :param float max_reset_timeout: maximum seconds the breaker stays open
+    """
+
+    def __init__(
+        self,
+        urls,
+        num_retries,
+        num_retries_call,
+        ewma_alpha=0.3,
+        error_half_life=60,
+        failure_threshold=3,
+        reset_timeout=1.0,
+        max_reset_timeout=60.0,
+        switch_ratio=0.5,
+    ):
+        self.breaker_settings = {
+            "failure_threshold": failure_threshold,
+            "reset_timeout": reset_timeout,
+            "max_reset_timeout": max_reset_timeout,
+        }
         self.set_node_urls(urls)
         self.num_retries = num_retries
         self.num_retries_call = num_retries_call
+        self.ewma_alpha = ewma_alpha
+        self.error_half_life = error_half_life
+        self.switch_ratio = switch_ratio
+        # Called with the url of a node, when its breaker opens
+        self.breaker_open_callback = None
 
     def set_node_urls(self, urls):
         if isinstance(urls, str):
@@ -40,6 +170,8 @@ class Nodes(list):
         else:
             url_list = []
         super(Nodes, self).__init__([Node(x) for x in url_list])
+        for node in list.__iter__(self):
+            node.breaker = CircuitBreaker(**getattr(self, "breaker_settings", {}))
         self.current_node_index = -1
         self.freeze_current_node = False
 
@@ -59,6 +191,16 @@ class Nodes(list):
             next_node_count += 1
             if next_node_count > self.working_nodes_count + 1:
                 raise StopIteration
+        # Skip nodes with an open circuit breaker, when others are available
+        now = time.time()
+        if self.working_nodes_count > 1 and not self.node.breaker.is_available(now):
+            if len(self._working_node_indices(available_only=True)) > 0:
+                for i in range(self.working_nodes_count):
+                    if self.node.breaker.is_available(now):
+                        break
+                    self.current_node_index = (self.current_node_index + 1) % (
+                        self.working_nodes_count
+                    )
         return self.url
 
     next = __next__  # Python 2
@@ -126,6 +268,181 @@ class Nodes(list):
         """Increase node error count for current node"""
         if self.node is not None:
             self.node.error_cnt += 1
+            self.record_error()
+
+    def get_node(self, url=None):
+        """Returns the node with the given url, or the current node"""
+        if url is None:
+            return self.node
+        for node in list.__iter__(self):
+            if node.url == url:
+                return node
+        return None
+
+    def get_latency_percentile(self, percentile, url=None, min_samples=10):
+        """Returns a percentile of the recent latencies of a node in seconds,
+        or None when less than ``min_samples`` calls were measured
+
+        :param float percentile: percentile between 0 and 100
+        :param str url: node url, the current node is used when not set
+        :param int min_samples: minimum number of latency samples
+        """
+        node = self.get_node(url)
+        if node is None or len(node.latencies) < max(min_samples, 1):
+            return None
+        latencies = sorted(node.latencies)
+        index = int(round(percentile / 100.0 * (len(latencies) - 1)))
+        return latencies[min(max(index, 0), len(latencies) - 1)]
+
+    def get_hedge_url(self):
+        """Returns the url of the best scoring working node besides the current
+        one, or None when there is no other working node"""
+        if self.freeze_current_node:
+            return None
+        now = time.monotonic()
+        current = max(self.current_node_index, 0)
+        candidates = [i for i in self._working_node_indices(available_only=True) if i != current]
+        if len(candidates) == 0:
+            return None
+        best = min(candidates, key=lambda i: self[i].score(now, self.error_half_life))
+        return self[best].url
+
+    def _working_node_indices(self, available_only=False):
+        now = time.time()
+        return [
+            i
+            for i in range(len(self))
+            if (self.num_retries < 0 or self[i].error_cnt <= self.num_retries)
+            and (not available_only or self[i].breaker.is_available(now))
+        ]
+
+    def record_latency(self, latency, url=None):
+        """Adds the latency of a successful call in seconds to a node
+
+        :param float latency: latency in seconds
+        :param str url: node url, the current node is used when not set
+        """
+        node = self.get_node(url)
+        if node is None:
+            return
+        node.latencies.append(latency)
+        node.breaker.record_success()
+        if node.latency is None:
+            node.latency = latency
+        else:
+            node.latency += self.ewma_alpha * (latency - node.latency)
+        now = time.monotonic()
+        node.error_rate = (1 - self.ewma_alpha) * node.get_error_rate(now, self.error_half_life)
+        node.error_time = now
+
+    def record_error(self, url=None):
+        """Adds a failed call to the error rate and circuit breaker of a node
+
+        :param str url: node url, the current node is used when not set
+        """
+        node = self.get_node(url)
+        if node is None:
+            return
+        now = time.monotonic()
+        error_rate = node.get_error_rate(now, self.error_half_life)
+        node.error_rate = error_rate + self.ewma_alpha * (1 - error_rate)
+        node.error_time = now
+        if node.breaker.record_failure():
+            log.warning(
+                "Circuit breaker opened for node %s for %.1f seconds"
+                % (node.url, node.breaker.open_until - time.time())
+            )
+            if self.breaker_open_callback is not None:
+                self.breaker_open_callback(node.url)
+
+    def get_breaker_state(self):
+        """Returns the circuit breaker state of all nodes as dict, e.g.
+        ``{"https://api.hive.blog": "closed"}``"""
+        now = time.time()
+        return {node.url: node.breaker.get_state(now) for node in list.__iter__(self)}
+
+    def export_breaker_state(self):
+        """Returns the circuit breaker state of all nodes as json serializable
+        dict, which can be loaded by :func:`import_breaker_state`, also in
+        another process"""
+        return {node.url: node.breaker.export_state() for node in list.__iter__(self)}
+
+    def import_breaker_state(self, state):
+        """Loads circuit breaker states exported by :func:`export_breaker_state`.
+        Unknown node urls are ignored.
+        """
+        for node in list.__iter__(self):
+            if node.url in state:
+                node.breaker.import_state(state[node.url])
+
+    def get_probe_urls(self):
+        """Returns the urls of working nodes with a half open breaker"""
+        now = time.time()
+        return [
+            self[i].url
+            for i in self._working_node_indices()
+            if self[i].breaker.get_state(now) == "half_open"
+        ]
+
+    def get_next_probe_time(self):
+        """Returns the wall clock time at which the next open breaker turns
+        half open, or None when no breaker is open"""
+        now = time.time()
+        times = [
+            self[i].breaker.open_until
+            for i in self._working_node_indices()
+            if self[i].breaker.get_state(now) == "open"
+        ]
+        if len(times) == 0:
+            return None
+        return min(times)
+
+    def select_node(self):
+        """Switches to the best scoring node and returns its url
+
+        Two randomly chosen working nodes, which have latency samples, are
+        compared by their latency and error rate (power of two choices). The
+        current node is kept, unless the better one of them scores below
+        ``switch_ratio`` of its score. Nodes without latency samples are
+        only chosen when the current node is not available.
+        """
+        if self.freeze_current_node:
+            return self.url
+        working = self._working_node_indices(available_only=True)
+        current = max(self.current_node_index, 0)
+        if current in working:
+            candidates = [i for i in working if i != current and self[i].latency is not None]
+        else:
+            candidates = working
+        if len(candidates) == 0:
+            return self.url
+        now = time.monotonic()
+        a = candidates[0]
+        if len(candidates) > 1:
+            a, b = random.sample(candidates, 2)
+            if self[b].score(now, self.error_half_life) < self[a].score(now, self.error_half_life):
+                a = b
+        if current in working and self[a].score(
+            now, self.error_half_life
+        ) >= self.switch_ratio * self[current].score(now, self.error_half_life):
+            return self.url
+        self.current_node_index = a
+        return self.url
+
+    def get_node_stats(self):
+        """Returns latency, error rate and score of all nodes as list of dicts"""
+        now = time.monotonic()
+        return [
+            {
+                "url": node.url,
+                "latency": node.latency,
+                "error_rate": node.get_error_rate(now, self.error_half_life),
+                "score": node.score(now, self.error_half_life),
+                "error_cnt": node.error_cnt,
+                "breaker": node.breaker.get_state(),
+            }
+            for node in list.__iter__(self)
+        ]
 
     def increase_error_cnt_call(self):
         """Increase call error count for current node"""
@@ -142,6 +459,40 @@ class Nodes(list):
         if self.node is not None:
             self.node.error_cnt = 0
 
+    def get_retry_delay(self, call_retry=False):
+        """Returns the seconds to wait before the next retry on the current node
+
+        While the breaker of the current node is open, this is the time until
+        the first breaker turns half open. Otherwise, the delay grows
+        exponentially with jitter up to 10 seconds.
+        """
+        now = time.time()
+        if self.node is not None and not self.node.breaker.is_available(now):
+            next_probe_time = self.get_next_probe_time()
+            if next_probe_time is not None:
+                return max(next_probe_time - now, 0)
+        cnt = self.error_cnt_call if call_retry else self.error_cnt
+        if cnt < 1:
+            return 0
+        return min(10, 0.5 * 2 ** (cnt - 1)) * random.uniform(0.5, 1.0)
+
+    def prepare_retry(self, call_retry=False):
+        """Prepares the retry of a failed call and returns the seconds to wait
+
+        :raises CallRetriesReached: when another node is available, so that the
+            call fails over at once
+        """
+        current = max(self.current_node_index, 0)
+        if not self.freeze_current_node and any(
+            i != current for i in self._working_node_indices(available_only=True)
+        ):
+            if call_retry:
+                raise CallRetriesReached()
+            return 0
+        if call_retry:
+            self.record_error()
+        return self.get_retry_delay(call_retry=call_retry)
+
     def sleep_and_check_retries(self, errorMsg=None, sleep=True, call_retry=False, showMsg=True):
         """Sleep and check if num_retries is reached"""
         if errorMsg:
@@ -167,12 +518,7 @@ class Nodes(list):
                 )
         if not sleep:
             return
-        if cnt < 1:
-            sleeptime = 0
-        elif cnt < 10:
-            sleeptime = (cnt - 1) * 1.5 + 0.5
-        else:
-            sleeptime = 10
+        sleeptime = self.prepare_retry(call_retry=call_retry)
         if sleeptime:
-            log.warning("Retrying in %d seconds" % sleeptime)
+            log.warning("Retrying in %.1f seconds" % sleeptime)
             time.sleep(sleeptime)
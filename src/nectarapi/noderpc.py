@@ -54,6 +54,7 @@ class NodeRPC(GrapheneRPC):
         """
         if self.url is None:
             raise exceptions.RPCConnection("RPC is not connected!")
+        self.select_node()
         doRetry = True
         maxRetryCountReached = False
         while doRetry and not maxRetryCountReached:
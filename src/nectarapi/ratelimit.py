@@ -0,0 +1,317 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+#: Http status codes, which tell the client to slow down
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+def parse_retry_after(value, now=None):
+    """Returns the seconds to wait from a ``Retry-After`` header, or None
+
+    :param str value: header value, either seconds or a http date
+    :param float now: current unix time, only used for http dates
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(date.timestamp() - now, 0.0)
+
+
+class TokenBucket(object):
+    """Allows ``rate`` requests per second with bursts of up to ``capacity``
+    requests. The bucket is not thread safe, :class:`AdaptiveLimiter` uses it
+    under its lock.
+
+    :param float rate: tokens which are added per second
+    :param float capacity: maximum number of tokens, ``rate`` when not set
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or max(rate, 1))
+        self.tokens = self.capacity
+        self.timestamp = time.monotonic()
+
+    def refill(self, now=None):
+        """Adds the tokens of the time since the last refill"""
+        if now is None:
+            now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.timestamp) * self.rate)
+        self.timestamp = now
+
+    def get_wait(self, now=None):
+        """Returns the seconds until a token is available"""
+        self.refill(now)
+        if self.tokens >= 1:
+            return 0
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        """Removes one token"""
+        self.tokens -= 1
+
+    def set_rate(self, rate):
+        """Changes the rate, the capacity is changed by the same factor"""
+        self.refill()
+        self.capacity = max(self.capacity * rate / self.rate, 1.0)
+        self.tokens = min(self.tokens, self.capacity)
+        self.rate = float(rate)
+
+
+class AdaptiveLimiter(object):
+    """Limits the requests to one node by a token bucket and a concurrency limit,
+    which both adapt by additive increase and multiplicative decrease (AIMD)
+
+    * When a request succeeds while the limit was reached, the concurrency limit
+      grows by one per round trip and the rate grows by ``rate_step`` requests
+      per second and second.
+    * A throttling reply (429 or 503) multiplies both by ``backoff``. A
+      ``Retry-After`` header pauses all requests to the node for that time.
+    * Only when ``latency_tolerance`` is set: when the average latency grows
+      above ``latency_tolerance`` times the lowest latency seen, both are
+      multiplied by ``latency_backoff``. The latencies of all methods are
+      averaged together, so this only suits uniform calls. Slow calls mixed
+      with fast ones (e.g. ``get_block_range`` and
+      ``get_dynamic_global_properties``) would look like congestion.
+
+    By default the limits start at ``max_rate`` and ``max_concurrency``, so
+    that requests are only limited after the node asked to slow down.
+
+    Both are decreased at most once per round trip, so that the replies of one
+    burst count as one congestion signal.
+
+    :param float rate: initial requests per second, ``max_rate`` when not set
+    :param float min_rate: lowest requests per second (default is 1)
+    :param float max_rate: highest requests per second (default is 500)
+    :param float rate_step: rate increase per second of requests at the rate limit
+        (default is 5)
+    :param int concurrency: initial number of concurrent requests,
+        ``max_concurrency`` when not set
+    :param int max_concurrency: highest number of concurrent requests (default is 64)
+    :param float backoff: factor applied on throttling replies (default is 0.5)
+    :param float latency_backoff: factor applied on latency growth (default is 0.9)
+    :param float latency_tolerance: latency growth, which is treated as congestion,
+        e.g. 2.5. Latencies are not used as congestion signal when not set
+        (default).
+    :param float max_pause: maximum pause by a ``Retry-After`` header in seconds
+        (default is 60)
+
+    .. code-block:: python
+
+        from nectarapi.ratelimit import AdaptiveLimiter
+        limiter = AdaptiveLimiter()
+        limiter.acquire()
+        try:
+            response = session.post(url, data=payload)
+        except Exception:
+            limiter.release()
+            raise
+        limiter.release(latency=response.elapsed.total_seconds())
+
+    """
+
+    def __init__(
+        self,
+        rate=None,
+        min_rate=1,
+        max_rate=500,
+        rate_step=5,
+        concurrency=None,
+        max_concurrency=64,
+        backoff=0.5,
+        latency_backoff=0.9,
+        latency_tolerance=None,
+        max_pause=60,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate_step = rate_step
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff
+        self.latency_backoff = latency_backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_pause = max_pause
+        self.lock = threading.Condition()
+        self.bucket = TokenBucket(max_rate if rate is None else rate)
+        self.limit = float(max_concurrency if concurrency is None else concurrency)
+        self.in_flight = 0
+        self.paused_until = 0
+        self.latency = None
+        self.min_latency = None
+        self.latency_samples = 0
+        self.throttled = 0
+        self._decrease_time = 0
+        self._rate_limited = False
+
+    def __repr__(self):
+        return "<AdaptiveLimiter rate=%.1f concurrency=%d in_flight=%d>" % (
+            self.bucket.rate,
+            int(self.limit),
+            self.in_flight,
+        )
+
+    @property
+    def rate(self):
+        """Current requests per second"""
+        return self.bucket.rate
+
+    @property
+    def concurrency(self):
+        """Current number of concurrent requests"""
+        return max(int(self.limit), 1)
+
+    def get_pause(self, now=None):
+        """Returns the remaining seconds of a ``Retry-After`` pause"""
+        if now is None:
+            now = time.monotonic()
+        return max(self.paused_until - now, 0)
+
+    def acquire(self, timeout=None):
+        """Waits until a request may be sent and counts it as in flight
+
+        :param float timeout: maximum seconds to wait. The request is counted
+            and may be sent after the timeout, but False is returned.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.lock:
+            while True:
+                now = time.monotonic()
+                wait = self.get_pause(now)
+                if wait <= 0 and self.in_flight < self.concurrency:
+                    wait = self.bucket.get_wait(now)
+                    if wait <= 0:
+                        self._rate_limited = self.bucket.tokens < 2
+                        self.bucket.take()
+                        self.in_flight += 1
+                        return True
+                elif wait <= 0:
+                    # Wait for the release of a request
+                    wait = None
+                if deadline is not None:
+                    if now >= deadline:
+                        self.bucket.take()
+                        self.in_flight += 1
+                        return False
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self.lock.wait(wait)
+
+    def release(self, latency=None, throttled=False, retry_after=None):
+        """Marks a request as done and adapts the limits
+
+        :param float latency: latency of a successful request in seconds. When
+            neither latency nor throttled is set, the request failed for other
+            reasons and the limits are not changed.
+        :param bool throttled: the node answered with a throttling reply
+        :param float retry_after: seconds from the ``Retry-After`` header
+        """
+        with self.lock:
+            at_limit = self.in_flight >= self.concurrency
+            self.in_flight = max(self.in_flight - 1, 0)
+            now = time.monotonic()
+            if throttled:
+                self.throttled += 1
+                if retry_after is not None:
+                    self.paused_until = max(
+                        self.paused_until, now + min(retry_after, self.max_pause)
+                    )
+                self._decrease(now, self.backoff)
+            elif latency is not None:
+                self._add_latency(latency)
+                if (
+                    self.latency_tolerance is not None
+                    and self.latency_samples >= 10
+                    and self.latency > self.min_latency * self.latency_tolerance
+                ):
+                    self._decrease(now, self.latency_backoff)
+                else:
+                    self._increase(at_limit)
+            self.lock.notify_all()
+
+    def get_state(self):
+        """Returns the current limits as dict"""
+        with self.lock:
+            return {
+                "rate": self.bucket.rate,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+                "latency": self.latency,
+                "pause": self.get_pause(),
+            }
+
+    def _add_latency(self, latency):
+        self.latency_samples += 1
+        if self.latency is None:
+            self.latency = latency
+            self.min_latency = latency
+            return
+        self.latency += 0.2 * (latency - self.latency)
+        if latency < self.min_latency:
+            self.min_latency = latency
+        else:
+            # The baseline follows a node which became slower for good
+            self.min_latency += 0.01 * (latency - self.min_latency)
+
+    def _increase(self, at_limit):
+        if at_limit and self.limit < self.max_concurrency:
+            self.limit = min(self.limit + 1.0 / self.limit, self.max_concurrency)
+        if self._rate_limited and self.bucket.rate < self.max_rate:
+            rate = self.bucket.rate + self.rate_step / self.bucket.rate
+            self.bucket.set_rate(min(rate, self.max_rate))
+
+    def _decrease(self, now, factor):
+        if now - self._decrease_time < (self.latency or 0.1):
+            return
+        self._decrease_time = now
+        self.limit = max(self.limit * factor, 1.0)
+        self.bucket.set_rate(max(self.bucket.rate * factor, self.min_rate))
+
+
+class NodeLimiters(object):
+    """Holds one :class:`AdaptiveLimiter` per node url
+
+    All rpc instances of a process share :func:`get_node_limiters`, so that
+    the threads of a threaded block stream, which use their own instances,
+    are limited together.
+
+    :param settings: parameters of :class:`AdaptiveLimiter`
+    """
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self.lock = threading.Lock()
+        self._limiters = {}
+
+    def get(self, url):
+        """Returns the limiter of a node url"""
+        with self.lock:
+            limiter = self._limiters.get(url)
+            if limiter is None:
+                limiter = AdaptiveLimiter(**self.settings)
+                self._limiters[url] = limiter
+            return limiter
+
+    def get_state(self):
+        """Returns the limits of all nodes as dict with the node url as key"""
+        with self.lock:
+            limiters = list(self._limiters.items())
+        return {url: limiter.get_state() for url, limiter in limiters}
+
+
+_node_limiters = NodeLimiters()
+
+
+def get_node_limiters():
+    """Returns the node limiters, which are shared by all rpc instances"""
+    return _node_limiters
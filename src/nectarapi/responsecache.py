@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+from collections import OrderedDict
+
+from .jsoncodec import dumps, loads
+
+#: The result never changes once its block is irreversible
+IMMUTABLE = "immutable"
+#: The result is never cached
+NEVER = "never"
+
+#: Cache policy per method name, numbers are time to live in seconds
+DEFAULT_CACHE_POLICIES = {
+    "get_block": IMMUTABLE,
+    "get_block_header": IMMUTABLE,
+    "get_block_range": IMMUTABLE,
+    "get_ops_in_block": IMMUTABLE,
+    "get_transaction": IMMUTABLE,
+    "enum_virtual_ops": IMMUTABLE,
+    "get_version": 60,
+    "get_hardfork_properties": 60,
+    "get_chain_properties": 60,
+    "get_feed_history": 10,
+    "get_current_median_history_price": 10,
+    "get_reward_fund": 10,
+    "get_reward_funds": 10,
+}
+
+
+def get_block_num(args, result=None):
+    """Returns the highest block number a call refers to, or None
+
+    :param args: parameters of the call
+    :param result: result of the call, e.g. a transaction with ``block_num``
+    """
+    params = args[0] if isinstance(args, (list, tuple)) and len(args) > 0 else args
+    if isinstance(params, dict):
+        if "block_range_end" in params:
+            return int(params["block_range_end"]) - 1
+        if "starting_block_num" in params:
+            return int(params["starting_block_num"]) + int(params.get("count", 1)) - 1
+        if "block_num" in params:
+            return int(params["block_num"])
+    elif isinstance(params, int) and not isinstance(params, bool):
+        return params
+    if isinstance(result, dict) and "block_num" in result:
+        return int(result["block_num"])
+    return None
+
+
+class ResponseCache(object):
+    """Caches rpc results by method aware policies
+
+    Each method has one of three policies:
+
+    * :data:`IMMUTABLE`: results of irreversible blocks, which never change.
+      They are only stored, when the block is not newer than the last
+      irreversible block seen in a ``get_dynamic_global_properties`` result.
+    * a number: the result is reused for that many seconds
+    * :data:`NEVER`: the result is never cached (default for all other methods)
+
+    Results are stored json encoded, so that each hit returns a fresh copy.
+    The least recently used entries are removed when the stored results are
+    larger than ``max_bytes``. The caller includes the chain id in the key, so
+    that results of different chains never mix.
+
+    :param int max_bytes: maximum size of all stored results (default is 32 MB)
+    :param dict policies: policies which are added to or replace
+        :data:`DEFAULT_CACHE_POLICIES`
+
+    .. code-block:: python
+
+        from nectarapi.noderpc import NodeRPC
+        rpc = NodeRPC("https://api.hive.blog", cache_policies={"get_dynamic_global_properties": 1})
+
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, policies=None):
+        self.max_bytes = max_bytes
+        self.policies = dict(DEFAULT_CACHE_POLICIES)
+        if policies:
+            self.policies.update(policies)
+        self.last_irreversible_block_num = None
+        self.lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_policy(self, method):
+        """Returns the policy of a method"""
+        return self.policies.get(method, NEVER)
+
+    def get(self, key):
+        """Returns a copy of the cached result, or raises KeyError"""
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                raise KeyError(key)
+            self._entries.move_to_end(key)
+            self.hits += 1
+            data = entry[0]
+        return loads(data)
+
+    def set(self, key, method, args, result):
+        """Stores the result, when the policy of the method allows it"""
+        self.observe(method, result)
+        policy = self.get_policy(method)
+        if policy == NEVER or not result:
+            return
+        if policy == IMMUTABLE:
+            block_num = get_block_num(args, result)
+            if (
+                block_num is None
+                or self.last_irreversible_block_num is None
+                or block_num > self.last_irreversible_block_num
+            ):
+                return
+            expires = None
+        else:
+            expires = time.monotonic() + policy
+        data = dumps(result)
+        if len(data) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (data, expires)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def observe(self, method, result):
+        """Learns the last irreversible block from the result of a call"""
+        if (
+            method == "get_dynamic_global_properties"
+            and isinstance(result, dict)
+            and "last_irreversible_block_num" in result
+        ):
+            block_num = int(result["last_irreversible_block_num"])
+            if self.last_irreversible_block_num is None or block_num > (
+                self.last_irreversible_block_num
+            ):
+                self.last_irreversible_block_num = block_num
+
+    def clear(self):
+        """Removes all cached results"""
+        with self.lock:
+            self._entries.clear()
+            self.size = 0
+
+    def get_stats(self):
+        """Returns hits, misses, number of entries and size in bytes as dict"""
+        with self.lock:
+            return {
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_entries": len(self._entries),
+                "cache_bytes": self.size,
+            }
+
+    def _remove(self, key):
+        data, expires = self._entries.pop(key)
+        self.size -= len(data)
@@ -1,5 +1,4 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
 
 log = logging.getLogger(__name__)
@@ -17,6 +16,14 @@ def is_network_appbase_ready(props):
         return False
 
 
+def get_chain_id(props):
+    """Returns the chain id of a get_config result, or None"""
+    for key in props:
+        if key[-8:] == "CHAIN_ID":
+            return props[key]
+    return None
+
+
 def get_query(appbase, request_id, api_name, name, args):
     query = []
     if not appbase or api_name == "condenser_api":
@@ -27,9 +34,8 @@ def get_query(appbase, request_id, api_name, name, args):
             "id": request_id,
         }
     else:
-        args = json.loads(json.dumps(args))
-        # print(args)
-        if len(args) > 0 and isinstance(args, list) and isinstance(args[0], dict):
+        args = list(args)
+        if len(args) > 0 and isinstance(args[0], dict):
             query = {
                 "method": api_name + "." + name,
                 "params": args[0],
@@ -38,8 +44,7 @@ def get_query(appbase, request_id, api_name, name, args):
             }
         elif (
             len(args) > 0
-            and isinstance(args, list)
-            and isinstance(args[0], list)
+            and isinstance(args[0], (list, tuple))
             and len(args[0]) > 0
             and isinstance(args[0][0], dict)
         ):
@@ -78,6 +83,22 @@ def get_query(appbase, request_id, api_name, name, args):
     return query
 
 
+def is_broadcast_query(query):
+    """Returns True when the query (or one query of a batch) broadcasts to the
+    network. Such queries are not idempotent and must be sent only once.
+    """
+    queries = query if isinstance(query, list) else [query]
+    for q in queries:
+        if not isinstance(q, dict):
+            continue
+        method = q.get("method", "")
+        if method == "call" and isinstance(q.get("params"), list) and len(q["params"]) > 1:
+            method = "%s.%s" % (q["params"][0], q["params"][1])
+        if "broadcast" in str(method):
+            return True
+    return False
+
+
 def get_api_name(appbase, *args, **kwargs):
     if not appbase:
         # Sepcify the api to talk to
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+import copy
+import json
+import threading
+from concurrent.futures import Future
+
+
+def get_call_key(api_name, method, args):
+    """Returns a key, which is equal for calls with the same api, method and
+    parameters, independent of the order of dict keys"""
+    return (api_name, method, json.dumps(args, sort_keys=True, default=str))
+
+
+class SingleFlight(object):
+    """Runs only one of many identical calls at the same time
+
+    Threads, which make a call while an identical call is in flight, wait for
+    it and receive a copy of its result (or its exception) instead of asking
+    the node again. A thread, which makes the same call again while its own
+    call is in flight (e.g. ``get_config`` while reconnecting), runs it
+    directly instead of waiting for itself.
+
+    .. code-block:: python
+
+        from nectarapi.singleflight import SingleFlight, get_call_key
+        singleflight = SingleFlight()
+        key = get_call_key("database_api", "get_dynamic_global_properties", ())
+        props = singleflight.do(key, lambda: rpc.get_dynamic_global_properties(api="database"))
+
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.hits = 0
+        self._calls = {}
+
+    @property
+    def in_flight(self):
+        """Number of calls which are in flight"""
+        with self.lock:
+            return len(self._calls)
+
+    def do(self, key, fn):
+        """Returns the result of ``fn()``, or of the identical call in flight
+
+        :param key: key of the call, see :func:`get_call_key`
+        :param fn: function which makes the call
+        """
+        owner = threading.get_ident()
+        with self.lock:
+            call = self._calls.get(key)
+            if call is not None and call[2] == owner:
+                # The thread, which makes the call in flight, would wait for itself
+                reentrant = True
+            elif call is not None:
+                reentrant = False
+                self.hits += 1
+                call[1] += 1
+                future = call[0]
+            else:
+                reentrant = False
+                future = Future()
+                self._calls[key] = [future, 0, owner]
+        if reentrant:
+            return fn()
+        if call is not None:
+            # The result is shared, every follower gets its own copy
+            return copy.deepcopy(future.result())
+        try:
+            result = fn()
+        except BaseException as e:
+            with self.lock:
+                del self._calls[key]
+            future.set_exception(e)
+            raise
+        with self.lock:
+            followers = self._calls.pop(key)[1]
+        future.set_result(copy.deepcopy(result) if followers > 0 else None)
+        return result
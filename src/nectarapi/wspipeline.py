@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import logging
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from .exceptions import RPCConnection
+from .jsoncodec import dumps, loads
+
+WEBSOCKET_MODULE = None
+if not WEBSOCKET_MODULE:
+    try:
+        from websocket._exceptions import (
+            WebSocketConnectionClosedException,
+            WebSocketTimeoutException,
+        )
+
+        WEBSOCKET_MODULE = "websocket"
+    except ImportError:
+        WEBSOCKET_MODULE = None
+
+log = logging.getLogger(__name__)
+
+
+class _PendingRequest(object):
+    __slots__ = ["future", "request_ids", "is_batch"]
+
+    def __init__(self, future, request_ids, is_batch):
+        self.future = future
+        # Maps the id used on the socket to the id of the original query
+        self.request_ids = request_ids
+        self.is_batch = is_batch
+
+
+class WebsocketPipeline(object):
+    """Sends many JSON-RPC requests over one websocket without waiting for
+    the previous reply
+
+    Each query gets a request id which is unique on the socket. A reader
+    thread receives all replies and resolves the future of the matching
+    request, so that any number of threads can have requests in flight on
+    the same connection. The ids of the original queries are restored in
+    the replies, and batch replies are returned in the order of the batch.
+
+    :param websocket.WebSocket ws: connected websocket
+
+    .. code-block:: python
+
+        from nectarapi.graphenerpc import create_ws_instance
+        from nectarapi.wspipeline import WebsocketPipeline
+        ws = create_ws_instance()
+        ws.connect("wss://api.hive.blog")
+        pipeline = WebsocketPipeline(ws)
+        futures = [
+            pipeline.send({"jsonrpc": "2.0", "id": 1, "method": "block_api.get_block",
+                           "params": {"block_num": n}})
+            for n in range(1, 11)
+        ]
+        blocks = [f.result()["result"]["block"] for f in futures]
+
+    """
+
+    def __init__(self, ws):
+        if WEBSOCKET_MODULE is None:
+            raise Exception("WebSocket module is not available.")
+        self.ws = ws
+        self.lock = threading.Lock()
+        self._pending = {}
+        self._request_id = 0
+        self._closed = None
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    @property
+    def in_flight(self):
+        """Number of requests which are waiting for a reply"""
+        with self.lock:
+            return len(set(id(p) for p in self._pending.values()))
+
+    @property
+    def closed(self):
+        return self._closed is not None
+
+    def send(self, payload):
+        """Sends a query or a list of queries and returns a
+        :class:`concurrent.futures.Future`, which resolves to the decoded reply
+
+        :param payload: JSON-RPC query (dict) or batch of queries (list)
+        """
+        future = Future()
+        is_batch = isinstance(payload, list)
+        queries = payload if is_batch else [payload]
+        with self.lock:
+            if self._closed is not None:
+                raise WebSocketConnectionClosedException(str(self._closed))
+            sent_queries = []
+            request_ids = {}
+            for query in queries:
+                self._request_id += 1
+                query = dict(query)
+                request_ids[self._request_id] = query.get("id")
+                query["id"] = self._request_id
+                sent_queries.append(query)
+            pending = _PendingRequest(future, request_ids, is_batch)
+            for request_id in request_ids:
+                self._pending[request_id] = pending
+        data = dumps(sent_queries if is_batch else sent_queries[0])
+        try:
+            self.ws.send(data)
+        except Exception:
+            self._remove(pending)
+            raise
+        return future
+
+    def call(self, payload, timeout=None):
+        """Sends a query and waits for its decoded reply
+
+        :param payload: JSON-RPC query (dict) or batch of queries (list)
+        :param float timeout: seconds to wait for the reply
+        :raises WebSocketTimeoutException: when no reply was received in time
+        """
+        future = self.send(payload)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            self._remove(future)
+            raise WebSocketTimeoutException("No reply received after %s s" % timeout)
+
+    def close(self):
+        """Closes the websocket, all requests in flight fail"""
+        self._fail_all(RPCConnection("Websocket pipeline closed"))
+        self.ws.close()
+
+    def _remove(self, pending_or_future):
+        with self.lock:
+            for request_id, pending in list(self._pending.items()):
+                if pending is pending_or_future or pending.future is pending_or_future:
+                    del self._pending[request_id]
+
+    def _fail_all(self, error):
+        with self.lock:
+            if self._closed is None:
+                self._closed = error
+            pending = set(self._pending.values())
+            self._pending = {}
+        for p in pending:
+            if not p.future.done():
+                p.future.set_exception(WebSocketConnectionClosedException(str(error)))
+
+    def _read_loop(self):
+        while self._closed is None:
+            try:
+                data = self.ws.recv()
+            except WebSocketTimeoutException:
+                continue
+            except Exception as e:
+                self._fail_all(e)
+                return
+            if not data:
+                continue
+            try:
+                reply = loads(data)
+            except ValueError:
+                log.error(f"Non-JSON response on pipelined websocket: {data}")
+                continue
+            self._resolve(reply)
+
+    def _resolve(self, reply):
+        replies = reply if isinstance(reply, list) else [reply]
+        pending = None
+        with self.lock:
+            for r in replies:
+                if isinstance(r, dict) and r.get("id") in self._pending:
+                    pending = self._pending[r["id"]]
+                    break
+            if pending is None:
+                log.warning(f"Received reply for unknown request: {reply}")
+                return
+            for request_id in pending.request_ids:
+                self._pending.pop(request_id, None)
+        if pending.is_batch and isinstance(reply, list):
+            position = {request_id: i for i, request_id in enumerate(pending.request_ids)}
+            replies = sorted(
+                replies,
+                key=lambda r: position.get(
+                    r.get("id") if isinstance(r, dict) else None, len(position)
+                ),
+            )
+            reply = replies
+        for r in replies:
+            if isinstance(r, dict) and r.get("id") in pending.request_ids:
+                r["id"] = pending.request_ids[r["id"]]
+        if not pending.future.done():
+            pending.future.set_result(reply)
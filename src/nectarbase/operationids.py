@@ -100,3 +100,20 @@ def getOperationNameForId(i):
         if int(operations[key]) is int(i):
             return key
     return "Unknown Operation ID %d" % i
+
+
+def getVirtualOperationFilter(op_names):
+    """Returns the bit mask for the ``filter`` parameter of
+    ``account_history_api.enum_virtual_ops`` which selects the given virtual
+    operations. Names of non-virtual or unknown operations are ignored.
+
+    :param list op_names: operation names, e.g. ``["producer_reward", "author_reward"]``
+    """
+    first_virtual_op = operations["fill_convert_request"]
+    op_filter = 0
+    for op_name in op_names:
+        if len(op_name) > 10 and op_name[len(op_name) - 10 :] == "_operation":
+            op_name = op_name[:-10]
+        if op_name in operations and operations[op_name] >= first_virtual_op:
+            op_filter |= 1 << (operations[op_name] - first_virtual_op)
+    return op_filter
@@ -2,20 +2,41 @@
 # Load modules from other classes
 # # Inspired by https://raw.githubusercontent.com/xeroc/python-graphenelib/master/graphenestorage/__init__.py
 from .base import (
+    FileCheckpointStore,
+    InRamCheckpointStore,
     InRamConfigurationStore,
     InRamEncryptedKeyStore,
     InRamEncryptedTokenStore,
     InRamPlainKeyStore,
     InRamPlainTokenStore,
+    SqliteCheckpointStore,
     SqliteConfigurationStore,
     SqliteEncryptedKeyStore,
     SqliteEncryptedTokenStore,
     SqlitePlainKeyStore,
     SqlitePlainTokenStore,
 )
+from .file import JSONFileStore
 from .sqlite import SQLiteCommon, SQLiteFile
 
-__all__ = ["interfaces", "masterpassword", "base", "sqlite", "ram"]
+__all__ = [
+    "FileCheckpointStore",
+    "InRamCheckpointStore",
+    "InRamConfigurationStore",
+    "InRamEncryptedKeyStore",
+    "InRamEncryptedTokenStore",
+    "InRamPlainKeyStore",
+    "InRamPlainTokenStore",
+    "JSONFileStore",
+    "SQLiteCommon",
+    "SQLiteFile",
+    "SqliteCheckpointStore",
+    "SqliteConfigurationStore",
+    "SqliteEncryptedKeyStore",
+    "SqliteEncryptedTokenStore",
+    "SqlitePlainKeyStore",
+    "SqlitePlainTokenStore",
+]
 
 
 def get_default_config_store(*args, **kwargs):
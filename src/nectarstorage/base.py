@@ -3,7 +3,9 @@
 import logging
 
 from .exceptions import KeyAlreadyInStoreException
+from .file import JSONFileStore
 from .interfaces import (
+    CheckpointInterface,
     ConfigInterface,
     EncryptedKeyInterface,
     EncryptedTokenInterface,
@@ -304,3 +306,43 @@ class SqliteEncryptedTokenStore(SQLiteStore, TokenEncryption):
     def __init__(self, *args, **kwargs):
         SQLiteStore.__init__(self, *args, **kwargs)
         TokenEncryption.__init__(self, *args, **kwargs)
+
+
+# Stream checkpoints
+class InRamCheckpointStore(InRamStore, CheckpointInterface):
+    """Stores stream checkpoints in RAM.
+
+    Internally, this works by simply inheriting
+    :class:`nectarstorage.ram.InRamStore`. The interface is defined in
+    :class:`nectarstorage.interfaces.CheckpointInterface`.
+    """
+
+    pass
+
+
+class FileCheckpointStore(JSONFileStore, CheckpointInterface):
+    """Stores stream checkpoints in a json file.
+
+    Internally, this works by simply inheriting
+    :class:`nectarstorage.file.JSONFileStore`. The interface is defined in
+    :class:`nectarstorage.interfaces.CheckpointInterface`.
+    """
+
+    pass
+
+
+class SqliteCheckpointStore(SQLiteStore, CheckpointInterface):
+    """Stores stream checkpoints in the `checkpoints` table of the
+    SQLite3 database.
+
+    Internally, this works by simply inheriting
+    :class:`nectarstorage.sqlite.SQLiteStore`. The interface is defined
+    in :class:`nectarstorage.interfaces.CheckpointInterface`.
+    """
+
+    #: The table name for the checkpoints
+    __tablename__ = "checkpoints"
+    #: The name of the 'key' column
+    __key__ = "name"
+    #: The name of the 'value' column
+    __value__ = "position"
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import json
+import logging
+import os
+
+from appdirs import user_data_dir
+
+from .interfaces import StoreInterface
+
+log = logging.getLogger(__name__)
+
+
+class JSONFileStore(StoreInterface):
+    """The JSONFileStore keeps all key/value pairs in RAM and writes them
+    into a json file on every change. The file is replaced atomically, so
+    that it is never left in a half written state.
+
+    The file is stored in the same OS protected user directory as the
+    :class:`nectarstorage.sqlite.SQLiteFile`.
+
+    .. note:: The file name can be overwritten when providing a keyword
+        argument ``profile``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        appauthor = "nectar"
+        appname = kwargs.get("appname", "nectar")
+        self.data_dir = kwargs.get("data_dir", user_data_dir(appname, appauthor))
+
+        if "profile" in kwargs:
+            self.storageFile = "{}.json".format(kwargs["profile"])
+        else:
+            self.storageFile = "{}.json".format(appname)
+
+        self.json_file = os.path.join(self.data_dir, self.storageFile)
+        if not os.path.isdir(self.data_dir):  # pragma: no cover
+            os.makedirs(self.data_dir)
+        StoreInterface.__init__(self, *args, **kwargs)
+        if os.path.isfile(self.json_file):
+            with open(self.json_file, "r") as f:
+                dict.update(self, json.load(f))
+
+    def _save(self):
+        tmp_file = self.json_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(dict(self), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.json_file)
+
+    def __setitem__(self, key, value):
+        """Sets an item in the store and writes the file"""
+        dict.__setitem__(self, key, value)
+        self._save()
+
+    # Specific for this library
+    def delete(self, key):
+        """Delete a key from the store"""
+        if dict.__contains__(self, key):
+            dict.__delitem__(self, key)
+            self._save()
+
+    def wipe(self):
+        """Wipe the store"""
+        dict.clear(self)
+        self._save()
@@ -235,3 +235,35 @@ class EncryptedTokenInterface(TokenInterface):
     def lock(self):
         """Lock the wallet again"""
         raise NotImplementedError
+
+
+class CheckpointInterface(StoreInterface):
+    """The CheckpointInterface defines the interface for stream checkpoints.
+
+    A checkpoint stores the position ``(block_num, trx_num, op_in_trx)``
+    of the last acknowledged item of a named stream, so that a stream can
+    be resumed after a restart.
+
+    .. note:: This class inherits
+        :class:`nectarstorage.interfaces.StoreInterface` and defines
+        additional checkpoint-specific methods.
+    """
+
+    def get_checkpoint(self, name):
+        """Returns the stored position of the stream ``name`` as tuple
+        or None, when no checkpoint was stored
+
+        :param str name: Name of the stream
+        """
+        value = self[name]
+        if not value:
+            return None
+        return tuple(int(x) for x in str(value).split(","))
+
+    def set_checkpoint(self, name, position):
+        """Stores the position of the stream ``name``
+
+        :param str name: Name of the stream
+        :param tuple position: ``(block_num, trx_num, op_in_trx)``
+        """
+        self[name] = ",".join(str(int(x)) for x in position)
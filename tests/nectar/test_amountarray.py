@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectar import Hive
+from nectar.amount import Amount
+from nectar.amountarray import AmountArray, numpy
+from nectar.amountvalue import AmountValue, PriceValue
+from nectar.asset import get_asset
+from nectar.comment import Comment
+from nectar.price import Price
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hive = Hive(offline=True)
+
+    def array(self, amounts, **kwargs):
+        return AmountArray(amounts, blockchain_instance=self.hive, **kwargs)
+
+    def test_init(self):
+        array = self.array(
+            [
+                "1.000 HBD",
+                "2.5 HBD",
+                {"amount": "250", "precision": 3, "nai": "@@000000013"},
+                ["1", 3, "@@000000013"],
+                Amount("0.010 HBD", blockchain_instance=self.hive),
+                AmountValue("0.100 HBD", blockchain_instance=self.hive),
+            ]
+        )
+        self.assertIs(array.asset, get_asset("HBD", self.hive))
+        self.assertEqual(array.satoshis.dtype, numpy.int64)
+        self.assertEqual(array.satoshis.tolist(), [1000, 2500, 250, 1, 10, 100])
+        self.assertEqual(len(array), 6)
+        self.assertEqual(array.symbol, "HBD")
+        self.assertEqual(array.amounts.tolist()[1], 2.5)
+        self.assertEqual(self.array([1, 0.5], asset="HIVE").satoshis.tolist(), [1000, 500])
+        self.assertEqual(len(self.array([], asset="HIVE")), 0)
+        with self.assertRaises(ValueError):
+            self.array(["1.000 HBD", "1.000 HIVE"])
+        with self.assertRaises(ValueError):
+            self.array([])
+        with self.assertRaises(ValueError):
+            self.array(["1.000 HBD"], accounts=["alice", "bob"])
+
+    def test_convert(self):
+        array = self.array(["1.000 HIVE", "-0.001 HIVE"])
+        self.assertEqual(str(array[0]), "1.000 HIVE")
+        self.assertEqual([str(value) for value in array], ["1.000 HIVE", "-0.001 HIVE"])
+        amounts = array.to_amounts()
+        self.assertIsInstance(amounts[0], Amount)
+        self.assertEqual(amounts[0], Amount("1.000 HIVE", blockchain_instance=self.hive))
+        self.assertEqual(array.to_amount_values()[1].satoshis, -1)
+        array = AmountArray.from_satoshis([1, 2], "VESTS", blockchain_instance=self.hive)
+        self.assertEqual(str(array.sum()), "0.000003 VESTS")
+
+    def test_arithmetic(self):
+        array = self.array(["1.000 HIVE", "2.000 HIVE", "-1.000 HIVE"])
+        self.assertEqual(str(array.sum()), "2.000 HIVE")
+        self.assertEqual((array + array).satoshis.tolist(), [2000, 4000, -2000])
+        self.assertEqual((array + "1.000 HIVE").satoshis.tolist(), [2000, 3000, 0])
+        self.assertEqual((array - 0.5).satoshis.tolist(), [500, 1500, -1500])
+        self.assertEqual((-array).satoshis.tolist(), [-1000, -2000, 1000])
+        self.assertEqual(sum([array, array]).satoshis.tolist(), [2000, 4000, -2000])
+        # Rounded towards zero as fixed point amounts
+        self.assertEqual((array / 3).satoshis.tolist(), [333, 666, -333])
+        self.assertEqual((array * 0.3333).satoshis.tolist(), [333, 666, -333])
+        self.assertEqual((2 * array).satoshis.tolist(), [2000, 4000, -2000])
+        with self.assertRaises(AssertionError):
+            array + self.array(["1.000 HBD"])
+
+    def test_price(self):
+        array = self.array(["10.000 HIVE", "0.003 HIVE"])
+        price = PriceValue("0.250 HBD", "1.000 HIVE", blockchain_instance=self.hive)
+        result = array * price
+        self.assertIs(result.asset, get_asset("HBD", self.hive))
+        self.assertEqual(result.satoshis.tolist(), [2500, 0])
+        price = Price("0.25 HBD/HIVE", blockchain_instance=self.hive)
+        self.assertEqual((array * price).satoshis.tolist(), [2500, 0])
+        for value, amount in zip(array * price, array.to_amounts()):
+            self.assertEqual(str(value), str(amount * price))
+        vests = self.array(["1000000.000000 VESTS"]) * PriceValue(
+            "0.500 HIVE", "1.000000 VESTS", blockchain_instance=self.hive
+        )
+        self.assertEqual(str(vests[0]), "500000.000 HIVE")
+        with self.assertRaises(AssertionError):
+            self.array(["1.000 HBD"]) * price
+
+    def test_overflow(self):
+        array = AmountArray.from_satoshis([2**62, -(2**62)], "HIVE", blockchain_instance=self.hive)
+        self.assertEqual((array * 1.5).satoshis.tolist(), [2**62 * 3 // 2, -(2**62) * 3 // 2])
+
+    def test_group_by_account(self):
+        array = self.array(
+            ["1.000 HBD", "2.500 HBD", "0.250 HBD", "0.001 HBD"],
+            accounts=["bob", "alice", "bob", "carol"],
+        )
+        grouped = array.group_by_account()
+        self.assertEqual(grouped.accounts.tolist(), ["alice", "bob", "carol"])
+        self.assertEqual(grouped.satoshis.tolist(), [2500, 1250, 1])
+        self.assertEqual(str(grouped.to_dict()["bob"]), "1.250 HBD")
+        self.assertEqual(array[1:3].accounts.tolist(), ["alice", "bob"])
+        self.assertEqual(array[array.satoshis > 500].accounts.tolist(), ["bob", "alice"])
+        with self.assertRaises(ValueError):
+            self.array(["1.000 HBD"]).group_by_account()
+
+    def test_comment_rewards(self):
+        comments = [
+            Comment(
+                {
+                    "author": author,
+                    "permlink": "post",
+                    "total_payout_value": total,
+                    "curator_payout_value": curator,
+                    "pending_payout_value": pending,
+                    "json_metadata": "{}",
+                    "community": "",
+                },
+                blockchain_instance=self.hive,
+            )
+            for author, total, curator, pending in [
+                ("alice", "1.000 HBD", "0.500 HBD", "0.000 HBD"),
+                ("bob", "0.000 HBD", "0.000 HBD", "2.000 HBD"),
+                ("alice", "0.000 HBD", "0.000 HBD", "0.250 HBD"),
+            ]
+        ]
+        rewards = Comment.get_reward_array(comments)
+        self.assertEqual(rewards.satoshis.tolist(), [int(c.reward) for c in comments])
+        self.assertEqual(str(rewards.group_by_account().to_dict()["alice"]), "1.750 HBD")
+        self.assertEqual(len(Comment.get_reward_array([], blockchain_instance=self.hive)), 0)
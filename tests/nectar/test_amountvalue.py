@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+import unittest
+from decimal import Decimal
+
+from nectar import Hive
+from nectar.amount import Amount
+from nectar.amountvalue import AmountValue, PriceValue
+from nectar.asset import get_asset
+from nectar.exceptions import InvalidAssetException
+from nectar.price import Price
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hive = Hive(offline=True)
+
+    def value(self, amount):
+        return AmountValue(amount, blockchain_instance=self.hive)
+
+    def test_init(self):
+        hive = get_asset("HIVE", self.hive)
+        for amount in [
+            "1.000 HIVE",
+            {"amount": "1000", "precision": 3, "nai": "@@000000021"},
+            ["1000", 3, "@@000000021"],
+            {"amount": 1000, "asset_id": "HIVE"},
+            Amount("1.000 HIVE", blockchain_instance=self.hive),
+        ]:
+            value = self.value(amount)
+            self.assertEqual(value.satoshis, 1000)
+            self.assertIs(value.asset, hive)
+        value = AmountValue(1.0009, "HIVE", blockchain_instance=self.hive)
+        self.assertEqual(str(value), "1.000 HIVE")
+        self.assertIs(self.value(value).asset, hive)
+        vests = self.value(["1000", 3, "@@000000037"])
+        self.assertEqual(str(vests), "1.000000 VESTS")
+        with self.assertRaises(ValueError):
+            self.value(1)
+
+    def test_properties(self):
+        value = self.value("1.234 HBD")
+        self.assertEqual(value.symbol, "HBD")
+        self.assertEqual(value.precision, 3)
+        self.assertEqual(value.amount, 1.234)
+        self.assertEqual(value.amount_decimal, Decimal("1.234"))
+        self.assertEqual(value["amount"], Decimal("1.234"))
+        self.assertEqual(value["symbol"], "HBD")
+        self.assertEqual(int(value), 1234)
+        self.assertEqual(float(value), 1.234)
+        self.assertEqual(repr(value), "1.234 HBD")
+        self.assertEqual(value.tuple(), (1.234, "HBD"))
+        self.assertEqual(value.json(), {"amount": "1234", "nai": "@@000000013", "precision": 3})
+        self.assertEqual(value.json(False), ["1234", 3, "@@000000013"])
+        self.assertFalse(hasattr(value, "__dict__"))
+
+    def test_immutable(self):
+        value = self.value("1.000 HIVE")
+        with self.assertRaises(AttributeError):
+            value.satoshis = 2
+        self.assertIs(copy.copy(value), value)
+        self.assertIs(copy.deepcopy(value), value)
+        copied = pickle.loads(pickle.dumps(value))
+        self.assertEqual(copied, value)
+        self.assertIs(copied.asset, value.asset)
+        price = PriceValue("0.250 HBD", "1.000 HIVE", blockchain_instance=self.hive)
+        self.assertEqual(repr(pickle.loads(pickle.dumps(price))), "0.250000 HBD/HIVE")
+
+    def test_convert(self):
+        amount = Amount("12.345 HBD", blockchain_instance=self.hive)
+        value = AmountValue.from_amount(amount)
+        converted = value.to_amount()
+        self.assertIsInstance(converted, Amount)
+        self.assertEqual(converted, amount)
+        self.assertEqual(converted["symbol"], "HBD")
+        self.assertEqual(converted.json(), amount.json())
+
+    def test_arithmetic(self):
+        a = self.value("1.000 HIVE")
+        b = self.value("0.500 HIVE")
+        self.assertEqual(str(a + b), "1.500 HIVE")
+        self.assertEqual(str(a - b), "0.500 HIVE")
+        self.assertEqual(str(a + 1.5), "2.500 HIVE")
+        self.assertEqual(str(a * 3), "3.000 HIVE")
+        self.assertEqual(str(a * 0.3333), "0.333 HIVE")
+        self.assertEqual(str(a / 3), "0.333 HIVE")
+        self.assertEqual(str(a // 3), "0.000 HIVE")
+        self.assertEqual(str(a % 0.3), "0.100 HIVE")
+        self.assertEqual(str(a**2), "1.000 HIVE")
+        self.assertEqual(str(sum([a, b, b])), "2.000 HIVE")
+        self.assertIsInstance(a / b, PriceValue)
+        self.assertEqual(float(a / b), 2.0)
+        with self.assertRaises(AssertionError):
+            a + self.value("1.000 HBD")
+        # Same results as Amount with fixed point arithmetic
+        amount = Amount("1.000 HIVE", fixed_point_arithmetic=True, blockchain_instance=self.hive)
+        self.assertEqual(str(a / 3), str(amount / 3))
+        self.assertEqual(str(a * 0.3333), str(amount * 0.3333))
+
+    def test_compare(self):
+        a = self.value("1.000 HIVE")
+        self.assertEqual(a, 1)
+        self.assertEqual(a, self.value("1.000 HIVE"))
+        self.assertNotEqual(a, 0)
+        self.assertTrue(a > 0.999)
+        self.assertTrue(a >= 1)
+        self.assertTrue(a < self.value("1.001 HIVE"))
+        self.assertTrue(a <= 1.0001)
+        self.assertFalse(a < None)
+        self.assertEqual(hash(a), hash(self.value("1.000 HIVE")))
+        self.assertEqual(len({a, self.value("1.000 HIVE")}), 1)
+        with self.assertRaises(AssertionError):
+            a < self.value("1.000 HBD")
+
+    def test_price(self):
+        price = PriceValue("0.250 HBD", "1.000 HIVE", blockchain_instance=self.hive)
+        self.assertEqual(price.symbols(), ("HBD", "HIVE"))
+        self.assertEqual(price.price, Decimal("0.25"))
+        self.assertEqual(repr(price), "0.250000 HBD/HIVE")
+        self.assertEqual(str(self.value("10.000 HIVE") * price), "2.500 HBD")
+        self.assertEqual(str(self.value("2.500 HBD") / price), "10.000 HIVE")
+        self.assertEqual(str(price * 2), "0.500000 HBD/HIVE")
+        self.assertEqual(repr(price.invert()), "4.000000 HIVE/HBD")
+        self.assertIs(price.as_base("HBD"), price)
+        self.assertEqual(price.as_quote("HBD").symbols(), ("HIVE", "HBD"))
+        self.assertEqual(price / price.invert(), 1.0)
+        self.assertTrue(price < 0.3)
+        self.assertEqual(price, PriceValue(price.json(), blockchain_instance=self.hive))
+        with self.assertRaises(InvalidAssetException):
+            price.as_base("VESTS")
+        with self.assertRaises(AssertionError):
+            self.value("1.000 HBD") * price
+        with self.assertRaises(NotImplementedError):
+            price // 2
+        with self.assertRaises(AttributeError):
+            price.base = self.value("1.000 HBD")
+
+    def test_price_convert(self):
+        price = Price("0.25 HBD/HIVE", blockchain_instance=self.hive)
+        value = PriceValue.from_price(price)
+        self.assertEqual(value.symbols(), ("HBD", "HIVE"))
+        self.assertEqual(float(value), float(price))
+        converted = value.to_price()
+        self.assertIsInstance(converted, Price)
+        self.assertEqual(converted, price)
+        self.assertEqual(str(value * self.value("4.000 HIVE")), "1.000 HBD")
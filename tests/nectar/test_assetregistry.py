@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import copy
+import pickle
+import unittest
+
+from nectar import Hive, Steem
+from nectar.amount import Amount
+from nectar.asset import Asset, AssetRegistry, InternedAsset, get_asset
+from nectar.exceptions import AssetDoesNotExistsException
+from nectar.price import Price
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hive = Hive(offline=True)
+        cls.steem = Steem(offline=True)
+
+    def test_registry(self):
+        registry = AssetRegistry.for_chain(self.hive)
+        self.assertIs(AssetRegistry.for_chain(self.hive), registry)
+        self.assertEqual(len(registry), 3)
+        hbd = registry["HBD"]
+        self.assertIsInstance(hbd, InternedAsset)
+        self.assertIs(registry["@@000000013"], hbd)
+        self.assertIs(registry[0], hbd)
+        self.assertEqual(hbd.precision, 3)
+        self.assertEqual(hbd, Asset("HBD", blockchain_instance=self.hive))
+        self.assertNotIn("SBD", registry)
+        self.assertIsNone(registry.get({"symbol": "HBD"}))
+        with self.assertRaises(AssetDoesNotExistsException):
+            registry["SBD"]
+        # Chains with the same chain id but other assets have their own registry
+        self.assertEqual(AssetRegistry.for_chain(self.steem)["@@000000013"].symbol, "SBD")
+        self.assertIs(get_asset("HIVE", self.hive), registry["HIVE"])
+
+    def test_interned_asset(self):
+        asset = get_asset("HIVE", self.hive)
+        with self.assertRaises(TypeError):
+            asset["precision"] = 6
+        with self.assertRaises(TypeError):
+            asset.update({"precision": 6})
+        self.assertIs(copy.deepcopy(asset), asset)
+        changeable = asset.copy()
+        changeable["precision"] = 6
+        self.assertEqual(asset["precision"], 3)
+        self.assertEqual(repr(asset), "<InternedAsset HIVE>")
+
+    def test_amount(self):
+        a = Amount("1.000 HIVE", blockchain_instance=self.hive)
+        b = Amount(
+            {"amount": "2000", "precision": 3, "nai": "@@000000021"}, blockchain_instance=self.hive
+        )
+        c = Amount(["3000", 3, "@@000000021"], blockchain_instance=self.hive)
+        self.assertIs(a["asset"], b["asset"])
+        self.assertIs(a["asset"], c["asset"])
+        self.assertEqual(list(a.keys()), ["asset", "amount", "symbol"])
+        self.assertEqual(str(a + b), "3.000 HIVE")
+        self.assertIs((a + b)["asset"], a["asset"])
+        self.assertEqual(a + b, c)
+        self.assertEqual(
+            str(Amount("1.0009 HIVE", fixed_point_arithmetic=True, blockchain_instance=self.hive)),
+            "1.000 HIVE",
+        )
+        with self.assertRaises(AssertionError):
+            a + Amount("1.000 HBD", blockchain_instance=self.hive)
+        price = Price(2.0, "HBD/HIVE", blockchain_instance=self.hive)
+        self.assertEqual(str(a * price), "2.000 HBD")
+
+    def test_pickle(self):
+        a = Amount("1.000 HIVE", blockchain_instance=self.hive)
+        b = pickle.loads(pickle.dumps(a))
+        self.assertEqual(b, a)
+        self.assertIsInstance(b["asset"], InternedAsset)
+        self.assertIs(b["asset"], get_asset("HIVE", b.blockchain))
+        self.assertEqual(str(b + a), "2.000 HIVE")
+        price = pickle.loads(pickle.dumps(Price(2.0, "HBD/HIVE", blockchain_instance=self.hive)))
+        self.assertEqual(str(b * price), "2.000 HBD")
+        # Assets without registry are unpickled as plain assets
+        asset = InternedAsset(dict(a["asset"]), blockchain_instance=self.hive)
+        copied = pickle.loads(pickle.dumps(asset))
+        self.assertEqual(type(copied), Asset)
+        self.assertEqual(copied, asset)
@@ -184,6 +184,58 @@ class Testcases(unittest.TestCase):
             break
         self.assertTrue(len(ops_blocks) == 1)
 
+    def test_blocks_block_range(self):
+        b = Blockchain(blockchain_instance=self.bts)
+        stop_block = b.get_current_block_num()
+        start_block = stop_block - 24
+        blocks = list(b.blocks(start=start_block, stop=stop_block))
+        range_blocks = list(b.blocks(start=start_block, stop=stop_block, block_range_size=10))
+        self.assertEqual(len(blocks), len(range_blocks))
+        for block, range_block in zip(blocks, range_blocks):
+            self.assertEqual(block["block_id"], range_block["block_id"])
+            self.assertEqual(block.identifier, range_block.identifier)
+
+    def test_blocks_parallel(self):
+        b = Blockchain(blockchain_instance=self.bts)
+        stop_block = b.get_current_block_num()
+        start_block = stop_block - 24
+        blocks = list(b.blocks(start=start_block, stop=stop_block))
+        parallel_blocks = list(
+            b.blocks_parallel(start_block, stop_block, processes=2, shard_size=10)
+        )
+        self.assertEqual(len(blocks), len(parallel_blocks))
+        for block, parallel_block in zip(blocks, parallel_blocks):
+            self.assertEqual(block["block_id"], parallel_block["block_id"])
+        ops = list(b.stream(start=start_block, stop=stop_block))
+        parallel_ops = list(
+            b.stream_parallel(start=start_block, stop=stop_block, processes=2, shard_size=10)
+        )
+        self.assertEqual(len(ops), len(parallel_ops))
+        self.assertEqual([op["_id"] for op in ops], [op["_id"] for op in parallel_ops])
+        unordered_blocks = list(
+            b.blocks_parallel(start_block, stop_block, processes=2, shard_size=10, ordered=False)
+        )
+        self.assertEqual(
+            sorted([block.identifier for block in unordered_blocks]),
+            [block.identifier for block in blocks],
+        )
+
+    def test_stream_enum_virtual_ops(self):
+        b = Blockchain(blockchain_instance=self.bts)
+        stop_block = b.get_current_block_num()
+        start_block = stop_block - 20
+        vops = list(b.stream(start=start_block, stop=stop_block, only_virtual_ops=True))
+        enum_vops = list(b.stream(start=start_block, stop=stop_block, use_enum_virtual_ops=True))
+        self.assertEqual(len(vops), len(enum_vops))
+        opNames = ["producer_reward"]
+        rewards = list(
+            b.stream(opNames=opNames, start=start_block, stop=stop_block, use_enum_virtual_ops=True)
+        )
+        self.assertTrue(len(rewards) > 0)
+        for op in rewards:
+            self.assertEqual(op["type"], "producer_reward")
+            self.assertTrue(start_block <= op["block_num"] <= stop_block)
+
     def test_stream2(self):
         bts = self.bts
         b = Blockchain(blockchain_instance=bts)
@@ -194,6 +246,18 @@ class Testcases(unittest.TestCase):
             ops_stream.append(op)
         self.assertTrue(len(ops_stream) > 0)
 
+    def test_head_block_events(self):
+        b = Blockchain(blockchain_instance=self.bts, mode="head")
+        stop_block = b.get_current_block_num()
+        start_block = stop_block - 5
+        block_nums = []
+        for event in b.head_block_events(start=start_block, stop=stop_block):
+            if event["type"] in ["block", "replace"]:
+                block_nums.append(event["block"].block_num)
+            elif event["type"] == "rollback":
+                block_nums = block_nums[: block_nums.index(event["block_num"])]
+        self.assertEqual(block_nums, list(range(start_block, stop_block + 1)))
+
     def test_wait_for_and_get_block(self):
         bts = self.bts
         b = Blockchain(blockchain_instance=bts, max_block_wait_repetition=18)
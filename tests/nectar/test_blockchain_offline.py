@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+from queue import Queue
+from unittest import mock
+
+from nectar import Hive
+from nectar.block import Block
+from nectar.blockchain import Blockchain
+from nectar.exceptions import (
+    BlockchainForkTooDeep,
+    BlockDoesNotExistsException,
+    BlockWaitTimeExceeded,
+)
+from nectar.utils import formatTimeString
+from nectarstorage import InRamCheckpointStore
+
+genesis = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def block_data(block_num, fork="0", previous_fork=None):
+    """Returns a synthetic block, the blocks of each ``fork`` have other ids"""
+    if previous_fork is None:
+        previous_fork = fork
+    return {
+        "block_id": "%08x" % block_num + fork * 32,
+        "previous": "%08x" % (block_num - 1) + previous_fork * 32,
+        "timestamp": formatTimeString(genesis + timedelta(seconds=3 * block_num)),
+        "transactions": [],
+        "transaction_ids": [],
+    }
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hive = Hive(offline=True)
+
+    def get_blockchain(self, **kwargs):
+        chain = Blockchain(blockchain_instance=self.hive, **kwargs)
+        chain.block_interval = 0.05
+        chain.get_current_block_num = lambda: 100
+        return chain
+
+    def patch_block(self, missing=None, blocks=None):
+        """Replaces Block, so that block numbers are built from synthetic blocks.
+        ``missing`` maps block numbers to the number of failing requests, -1 fails
+        every request. ``blocks`` maps block numbers to the data of the existing
+        blocks, all blocks exist when it is not set.
+        """
+        hive = self.hive
+        missing = missing or {}
+
+        class SyntheticBlock(Block):
+            def __init__(self, block, **kwargs):
+                if isinstance(block, int):
+                    if missing.get(block, 0) != 0:
+                        missing[block] -= 1
+                        raise BlockDoesNotExistsException(str(block))
+                    if blocks is None:
+                        block = block_data(block)
+                    elif block in blocks:
+                        block = blocks[block]
+                    else:
+                        raise BlockDoesNotExistsException(str(block))
+                super(SyntheticBlock, self).__init__(block, blockchain_instance=hive)
+
+        return mock.patch("nectar.blockchain.Block", SyntheticBlock)
+
+    def prefetch(self, chain, start, stop):
+        instances = Queue()
+        for i in range(2):
+            instances.put(self.hive)
+        return chain._prefetch_blocks((instances, 2), start, stop, 3)
+
+    def assertPrefetchStopped(self):
+        for thread in threading.enumerate():
+            if thread.name.startswith("nectar-prefetch"):
+                thread.join(5)
+                self.assertFalse(thread.is_alive())
+
+    def test_prefetch_blocks(self):
+        chain = self.get_blockchain()
+        with self.patch_block({3: 1}):
+            blocks = list(self.prefetch(chain, 1, 10))
+        self.assertEqual([block.identifier for block in blocks], list(range(1, 11)))
+        self.assertPrefetchStopped()
+        with self.patch_block({}):
+            blocks = self.prefetch(chain, 1, 10)
+            next(blocks)
+            blocks.close()
+        self.assertPrefetchStopped()
+
+    def test_prefetch_missing_block(self):
+        chain = self.get_blockchain()
+        blocks = []
+        with self.patch_block({3: -1}):
+            with self.assertRaises(BlockWaitTimeExceeded):
+                for block in self.prefetch(chain, 1, 10):
+                    blocks.append(block)
+        self.assertEqual([block.identifier for block in blocks], [1, 2])
+        self.assertPrefetchStopped()
+
+    def head_block_events(self, polls, events, **kwargs):
+        """Appends the events of head_block_events to ``events``. ``polls`` contains
+        a (head block, last irreversible block, new blocks) tuple for each poll of
+        the global properties. Events are summarized as (type, block number, fork).
+        """
+        chain = self.get_blockchain(mode="head", block_poll_backoff=0.001)
+        blocks = {}
+        polls = iter(polls)
+
+        def get_dynamic_global_properties(use_stored_data=True):
+            head_block, last_irreversible, new_blocks = next(polls)
+            blocks.update(new_blocks)
+            return {
+                "head_block_number": head_block,
+                "last_irreversible_block_num": last_irreversible,
+                "time": "2020-01-01T00:00:00",
+            }
+
+        with (
+            self.patch_block(blocks=blocks),
+            mock.patch.object(self.hive, "is_connected", return_value=True),
+            mock.patch.object(
+                self.hive, "get_dynamic_global_properties", get_dynamic_global_properties
+            ),
+        ):
+            for event in chain.head_block_events(**kwargs):
+                if "block" in event:
+                    block_id = event["block"]["block_id"]
+                    events.append((event["type"], event["block"].block_num, block_id[8]))
+                else:
+                    events.append((event["type"], event["block_num"], event["block_id"][8]))
+
+    def test_head_block_fork(self):
+        events = []
+        main = {n: block_data(n) for n in range(1, 6)}
+        # Blocks 4 and 5 are replaced by a fork, which starts after block 3
+        fork = {4: block_data(4, "b", "0"), 5: block_data(5, "b"), 6: block_data(6, "b")}
+        self.head_block_events([(5, 2, main), (6, 3, fork)], events, start=1, stop=6)
+        self.assertEqual(
+            events,
+            [("block", n, "0") for n in range(1, 6)]
+            + [("irreversible", 1, "0"), ("irreversible", 2, "0")]
+            + [("rollback", 5, "0"), ("rollback", 4, "0")]
+            + [("replace", 4, "b"), ("replace", 5, "b"), ("block", 6, "b")]
+            + [("irreversible", 3, "0")],
+        )
+
+    def test_head_block_fork_too_deep(self):
+        events = []
+        main = {n: block_data(n) for n in range(1, 6)}
+        # The fork starts after block 1, only the last 3 blocks are kept
+        fork = {n: block_data(n, "c", "0" if n == 2 else "c") for n in range(2, 7)}
+        with self.assertRaises(BlockchainForkTooDeep):
+            self.head_block_events(
+                [(5, 0, main), (6, 0, fork)], events, start=1, stop=6, buffer_size=3
+            )
+        self.assertEqual(
+            events,
+            [("block", n, "0") for n in range(1, 6)] + [("rollback", 5, "0"), ("rollback", 4, "0")],
+        )
+        # A fork below the last irreversible block can not be rolled back
+        events = []
+        fork = {n: block_data(n, "d", "0" if n == 4 else "d") for n in range(4, 7)}
+        with self.assertRaises(BlockchainForkTooDeep):
+            self.head_block_events([(5, 4, main), (6, 4, fork)], events, start=1, stop=6)
+        self.assertEqual(events[-1], ("rollback", 5, "0"))
+
+    def stream_ops(self, chain, store, count=None, **kwargs):
+        """Returns the (block, trx, op) numbers of the streamed transfers, the stream
+        is closed when the operation after ``count`` processed operations is received.
+        Each block n has n % 3 transactions with two operations each.
+        """
+
+        def blocks(start=None, stop=None, **kwargs):
+            for block_num in range(start, stop + 1):
+                data = block_data(block_num)
+                data["id"] = block_num
+                for trx_nr in range(block_num % 3):
+                    memo = "%d-%d" % (block_num, trx_nr)
+                    ops = [["transfer", {"memo": memo + "-%d" % op_nr}] for op_nr in range(2)]
+                    data["transactions"].append({"operations": ops})
+                    data["transaction_ids"].append(memo)
+                yield Block(data, blockchain_instance=self.hive)
+
+        chain.blocks = blocks
+        ops = []
+        stream = chain.stream(
+            opNames=["transfer"], start=1, stop=10, checkpoint_store=store, **kwargs
+        )
+        for op in stream:
+            if len(ops) == count:
+                stream.close()
+                break
+            ops.append(tuple(int(n) for n in op["memo"].split("-")))
+        return ops
+
+    def test_stream_checkpoint(self):
+        chain = self.get_blockchain()
+        expected = self.stream_ops(chain, None)
+        self.assertEqual(len(expected), 20)
+        store = InRamCheckpointStore()
+        with mock.patch.object(
+            store, "set_checkpoint", wraps=store.set_checkpoint
+        ) as set_checkpoint:
+            first = self.stream_ops(chain, store, count=6, checkpoint_interval=5)
+        # Five acknowledged positions are written at once, the rest when the stream closes
+        self.assertEqual(set_checkpoint.call_count, 2)
+        self.assertEqual(store.get_checkpoint("stream"), (4, -1, -1))
+        # The unprocessed operation in block 4 is streamed again, nothing else
+        second = self.stream_ops(chain, store, checkpoint_interval=5)
+        self.assertEqual(first + second, expected)
+        self.assertEqual(store.get_checkpoint("stream"), (11, -1, -1))
+        self.assertEqual(self.stream_ops(chain, store), [])
+        # A checkpoint inside a transaction resumes with its next operation
+        store.set_checkpoint("stream", (5, 1, 0))
+        self.assertEqual(self.stream_ops(chain, store), expected[expected.index((5, 1, 0)) + 1 :])
+
+    def test_next_block_delay(self):
+        chain = Blockchain(blockchain_instance=self.hive, block_poll_offset=0.3)
+        chain.block_interval = 3
+        # Without a known head block, one block interval is waited
+        self.assertEqual(chain.next_block_delay(), 3)
+        # The next block is due in 2 s, it is polled 0.3 s after that
+        chain.head_block_time = datetime.now(timezone.utc) - timedelta(seconds=1)
+        self.assertAlmostEqual(chain.next_block_delay(), 2.3, delta=0.1)
+        # Retries after the expected time back off exponentially
+        self.assertEqual(chain.next_block_delay(1), 0.5)
+        self.assertEqual(chain.next_block_delay(2), 1.0)
+        # A late block is polled again after the first backoff
+        chain.head_block_time = datetime.now(timezone.utc) - timedelta(seconds=10)
+        self.assertEqual(chain.next_block_delay(), 0.25)
+        self.assertEqual(chain.next_block_delay(3), 2.0)
+        # The delay never exceeds one block interval
+        self.assertEqual(chain.next_block_delay(10), 3)
+        chain.head_block_time = datetime.now(timezone.utc) + timedelta(seconds=10)
+        self.assertEqual(chain.next_block_delay(), 3)
+
+    def test_delivery_lag(self):
+        chain = Blockchain(blockchain_instance=self.hive)
+        block = Block(block_data(1), blockchain_instance=self.hive)
+        block["timestamp"] = datetime.now(timezone.utc) - timedelta(seconds=2)
+        chain._update_delivery_lag(block)
+        self.assertAlmostEqual(chain.delivery_lag, 2, delta=0.5)
+        # Blocks without a time do not change the lag
+        block["timestamp"] = datetime(1970, 1, 1, tzinfo=timezone.utc)
+        chain._update_delivery_lag(block)
+        chain._update_delivery_lag({"block_id": "0"})
+        self.assertAlmostEqual(chain.delivery_lag, 2, delta=0.5)
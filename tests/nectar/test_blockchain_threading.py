@@ -96,3 +96,20 @@ class Testcases(unittest.TestCase):
         self.assertTrue(ops_stream[-1]["block_num"] <= stop_block)
         op_stat = b.ops_statistics(start=start_block, stop=stop_block)
         self.assertEqual(op_stat["account_create"] + op_stat["custom_json"], len(ops_stream))
+
+    def test_block_threading_prefetch_window(self):
+        bts = self.bts
+        b = Blockchain(steem_instance=bts)
+        blocks = []
+        for block in b.blocks(
+            start=self.start, stop=self.stop, threading=True, thread_num=4, prefetch_window=3
+        ):
+            blocks.append(block)
+        self.assertEqual(len(blocks), self.stop - self.start + 1)
+        for i in range(len(blocks)):
+            self.assertEqual(blocks[i].identifier, self.start + i)
+        # the blockchain instances are reused by the next call
+        prefetch_instances = b._prefetch_instances
+        for block in b.blocks(start=self.start, stop=self.start + 4, threading=True, thread_num=4):
+            pass
+        self.assertIs(prefetch_instances, b._prefetch_instances)
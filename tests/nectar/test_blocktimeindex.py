@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from nectar import Hive
+from nectar.blockchain import Blockchain
+from nectar.blocktimeindex import BlockTimeIndex
+
+genesis = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+def block_time(block_num):
+    return genesis + timedelta(seconds=3 * block_num)
+
+
+class Testcases(unittest.TestCase):
+    def test_estimate(self):
+        index = BlockTimeIndex(sample_interval=100)
+        self.assertIsNone(index.estimate(block_time(50)))
+        for block_num in range(1, 1001):
+            index.add(block_num, block_time(block_num))
+        self.assertEqual(len(index), 10)
+        self.assertEqual(str(index), "BlockTimeIndex(n=10, sample_interval=100)")
+        self.assertEqual(index.first(), (1, block_time(1)))
+        self.assertEqual(index.last(), (901, block_time(901)))
+        self.assertEqual(index.estimate(block_time(450)), 450)
+        self.assertEqual(index.estimate(block_time(101)), 101)
+        self.assertEqual(index.bounds(block_time(450)), (401, 501))
+        self.assertIsNone(index.estimate(block_time(950)))
+        self.assertIsNone(index.bounds(block_time(950)))
+
+    def test_missed_blocks(self):
+        index = BlockTimeIndex(sample_interval=100)
+        index.add(100, block_time(100))
+        # 10 missed blocks between both samples
+        index.add(200, block_time(210))
+        self.assertEqual(index.estimate(block_time(155)), 150)
+
+    def test_out_of_order(self):
+        index = BlockTimeIndex(sample_interval=100)
+        index.add(100, block_time(100))
+        index.add(300, block_time(300))
+        index.add(200, block_time(400))
+        self.assertEqual(len(index), 2)
+
+    def test_persistence(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "blocktimes.bin")
+            index = BlockTimeIndex(path=path, sample_interval=100)
+            for block_num in range(1000, 2001, 50):
+                index.add(block_num, block_time(block_num))
+            self.assertEqual(len(index), 11)
+            index = BlockTimeIndex(path=path, sample_interval=100)
+            self.assertEqual(len(index), 11)
+            self.assertEqual(index.estimate(block_time(1234)), 1234)
+            index = BlockTimeIndex(path=path, sample_interval=200)
+            self.assertEqual(len(index), 6)
+
+    def test_for_chain(self):
+        with tempfile.TemporaryDirectory() as data_dir:
+            chain_id = "ab" * 32
+            index = BlockTimeIndex.for_chain(chain_id, data_dir=data_dir)
+            self.assertIs(BlockTimeIndex.for_chain(chain_id), index)
+            self.assertEqual(index.path, os.path.join(data_dir, "blocktimes-abababababababab.bin"))
+            BlockTimeIndex._chain_indexes.pop(chain_id)
+
+    def test_estimated_block_num(self):
+        hive = Hive(offline=True)
+        self.assertIsNone(Blockchain(blockchain_instance=hive).get_block_time_index())
+        index = BlockTimeIndex(sample_interval=1)
+        chain = Blockchain(blockchain_instance=hive, mode="head", block_time_index=index)
+        props_calls = []
+
+        def get_dynamic_global_properties():
+            props_calls.append(1)
+            return {"last_irreversible_block_num": 980}
+
+        def header(block_num, **kwargs):
+            # 20 blocks were missed after block 500
+            offset = timedelta(seconds=0 if block_num <= 500 else 60)
+            return mock.Mock(identifier=block_num, time=lambda: block_time(block_num) + offset)
+
+        hive.get_dynamic_global_properties = get_dynamic_global_properties
+        chain.get_current_block = lambda: header(1000)
+        with mock.patch("nectar.blockchain.BlockHeader", side_effect=header) as block_header:
+            self.assertEqual(chain.get_estimated_block_num(block_time(300)), 300)
+        self.assertGreater(block_header.call_count, 1)
+        # The last irreversible block is requested once, not for each block
+        self.assertEqual(len(props_calls), 1)
+        self.assertEqual(index.estimate(block_time(300)), 300)
+        # The head block is not irreversible and was not added
+        self.assertLessEqual(index.last()[0], 980)
@@ -2,7 +2,21 @@
 import time
 import unittest
 
-from nectar.blockchainobject import ObjectCache
+from nectar.blockchainobject import BlockchainObject, ObjectCache, ObjectCacheNamespaces
+
+
+class Rpc(object):
+    def __init__(self, chain_id):
+        self.chain_id = chain_id
+
+
+class Instance(object):
+    def __init__(self, chain_id):
+        self.rpc = Rpc(chain_id)
+
+
+class Asset(BlockchainObject):
+    pass
 
 
 class Testcases(unittest.TestCase):
@@ -66,3 +80,106 @@ class Testcases(unittest.TestCase):
         self.assertEqual(len(list(cache)), 1)
         # Get
         self.assertEqual(cache.get("foo", "New"), "New")
+
+    def test_cache_max_entries(self):
+        cache = ObjectCache(default_expiration=60, max_entries=4, stripes=1)
+        for i in range(4):
+            cache[i] = str(i)
+        # The least recently used entry is removed first
+        self.assertEqual(cache[0], "0")
+        cache[4] = "4"
+        self.assertEqual(len(cache), 4)
+        self.assertNotIn(1, cache)
+        self.assertIn(0, cache)
+        self.assertIsNone(cache[1])
+
+        cache = ObjectCache(default_expiration=60, max_entries=100)
+        for i in range(1000):
+            cache[i] = i
+        self.assertLessEqual(len(cache), 112)
+        self.assertIn(999, cache)
+
+    def test_cache_max_bytes(self):
+        cache = ObjectCache(default_expiration=60, max_entries=None, max_bytes=10000, stripes=1)
+        for i in range(100):
+            cache[i] = "x" * 1000
+        self.assertLessEqual(cache.get_size(), 10000)
+        self.assertLess(len(cache), 10)
+        self.assertIn(99, cache)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get_size(), 0)
+
+    def test_cache_replace(self):
+        cache = ObjectCache(default_expiration=0.5, auto_clean=True, stripes=1)
+        cache["foo"] = "bar"
+        time.sleep(0.3)
+        # Replacing an entry renews its expiration
+        cache["foo"] = "baz"
+        time.sleep(0.3)
+        cache["other"] = "value"
+        self.assertEqual(cache["foo"], "baz")
+        time.sleep(0.3)
+        cache.clear_expired_items()
+        self.assertEqual(list(cache), ["other"])
+        for i in range(1000):
+            cache["foo"] = i
+        self.assertLess(len(cache._stripes[0].heap), 200)
+        del cache["foo"]
+        self.assertNotIn("foo", cache)
+
+    def test_cache_stats(self):
+        cache = ObjectCache(default_expiration=60, max_entries=2, stripes=1, track_size=True)
+        cache["a"] = "x" * 100
+        cache["b"] = "y"
+        cache["c"] = "z"
+        cache.get("c", None)
+        cache.get("a", None)
+        stats = cache.get_stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["evictions"], 1)
+        self.assertGreater(stats["bytes"], 0)
+        self.assertLess(stats["bytes"], 200)
+
+    def test_cache_namespaces(self):
+        namespaces = ObjectCacheNamespaces(policies={"Vote": {"max_entries": 5}})
+        self.assertIsNone(namespaces.get_policy("Asset")["default_expiration"])
+        self.assertEqual(namespaces.get_policy("Vote")["default_expiration"], 10)
+        asset_cache = namespaces.get_cache("beeab0de", "Asset")
+        self.assertIs(namespaces.get_cache("beeab0de", "Asset"), asset_cache)
+        self.assertIsNot(namespaces.get_cache("0000", "Asset"), asset_cache)
+        asset_cache["HIVE"] = "asset"
+        self.assertEqual(namespaces.get_cache("beeab0de", "Vote").max_entries, 5)
+        namespaces.set_policy("Vote", default_expiration=3)
+        self.assertEqual(namespaces.get_cache("beeab0de", "Vote").default_expiration, 3)
+        namespaces.auto_clean = False
+        self.assertFalse(asset_cache.auto_clean)
+        self.assertEqual(len(namespaces), 1)
+        self.assertEqual(str(namespaces), "ObjectCacheNamespaces(n=1, namespaces=3)")
+        stats = {(s["chain_id"], s["type"]): s for s in namespaces.get_stats()}
+        self.assertEqual(stats[("beeab0de", "Asset")]["entries"], 1)
+        namespaces.clear()
+        self.assertEqual(namespaces.get_stats(), [])
+
+    def test_blockchainobject_cache(self):
+        cache = BlockchainObject._cache
+        BlockchainObject._cache = ObjectCacheNamespaces()
+        try:
+            hive = Instance("beeab0de")
+            steem = Instance("0000")
+            BlockchainObject({"id": 123, "a": 1}, blockchain_instance=hive)
+            Asset({"id": 123, "a": 2}, blockchain_instance=hive)
+            Asset({"id": 123, "a": 3}, blockchain_instance=steem)
+            self.assertEqual(BlockchainObject(123.0, blockchain_instance=hive)["a"], 1)
+            obj = BlockchainObject({}, blockchain_instance=hive, lazy=True)
+            self.assertEqual(obj.getcache(123)["a"], 1)
+            self.assertEqual(Asset({}, blockchain_instance=hive, lazy=True).getcache(123)["a"], 2)
+            self.assertEqual(Asset({}, blockchain_instance=steem, lazy=True).getcache(123)["a"], 3)
+            self.assertEqual(obj.get_cache_expiration(), 10)
+            stats = {(s["chain_id"], s["type"]): s for s in BlockchainObject.get_cache_stats()}
+            self.assertEqual(stats[("beeab0de", "BlockchainObject")]["hits"], 2)
+            self.assertEqual(stats[("beeab0de", "Asset")]["entries"], 1)
+        finally:
+            BlockchainObject._cache = cache
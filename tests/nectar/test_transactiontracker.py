@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import threading
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from nectar import Hive
+from nectar.block import Block
+from nectar.exceptions import BlockWaitTimeExceeded, TransactionExpired
+from nectar.transactiontracker import TransactionTracker
+from nectar.utils import formatTimeString
+
+genesis = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.hive = Hive(offline=True)
+
+    def block(self, block_num, transactions=()):
+        """Returns a synthetic block, transactions are (trx_id, signatures) tuples"""
+        return Block(
+            {
+                "block_id": "%08x" % block_num + "0" * 32,
+                "previous": "%08x" % (block_num - 1) + "0" * 32,
+                "timestamp": formatTimeString(genesis + timedelta(seconds=3 * block_num)),
+                "transactions": [{"signatures": list(sigs)} for trx_id, sigs in transactions],
+                "transaction_ids": [trx_id for trx_id, sigs in transactions],
+            },
+            blockchain_instance=self.hive,
+        )
+
+    def get_tracker(self, blocks):
+        """Returns a tracker, which streams the given blocks once ``start`` is set"""
+        tracker = TransactionTracker(blockchain_instance=self.hive)
+        tracker.start = threading.Event()
+
+        def stream():
+            tracker.start.wait(10)
+            for block in blocks:
+                yield block
+
+        tracker.blockchain.blocks = stream
+        return tracker
+
+    def test_track_by_id(self):
+        tracker = self.get_tracker([self.block(10), self.block(11, [("a1", ["s1"]), ("b2", [])])])
+        future = tracker.track("b2")
+        self.assertEqual(len(tracker), 1)
+        thread = tracker._thread
+        tracker.start.set()
+        trx = future.result(10)
+        self.assertEqual(trx["transaction_id"], "b2")
+        self.assertEqual(trx["block_num"], 11)
+        self.assertEqual(trx["transaction_num"], 1)
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(tracker), 0)
+        self.assertIsNone(tracker._thread)
+
+    def test_track_by_signatures(self):
+        tracker = self.get_tracker([self.block(10, [("c3", ["s2", "s1"])])])
+        future = tracker.track({"signatures": ["s1", "s2"], "operations": []})
+        tracker.start.set()
+        trx = future.result(10)
+        self.assertEqual(trx["transaction_id"], "c3")
+        self.assertEqual(trx["signatures"], ["s2", "s1"])
+        self.assertEqual(trx["block_num"], 10)
+
+    def test_expired(self):
+        tracker = self.get_tracker([self.block(10), self.block(11)])
+        expiration = formatTimeString(genesis + timedelta(seconds=31))
+        future = tracker.track({"trx_id": "d4", "expiration": expiration, "signatures": []})
+        tracker.start.set()
+        with self.assertRaises(TransactionExpired):
+            future.result(10)
+
+    def test_limit(self):
+        tracker = self.get_tracker([self.block(n) for n in range(10, 20)])
+        future = tracker.track("e5", limit=3)
+        thread = tracker._thread
+        tracker.start.set()
+        with self.assertRaises(BlockWaitTimeExceeded):
+            future.result(10)
+        # The stream stops after the fourth block
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(tracker), 0)
+
+    def test_deadline(self):
+        tracker = self.get_tracker([self.block(10), self.block(11)])
+        future = tracker.track("f6", timeout=0)
+        tracker.start.set()
+        with self.assertRaises(BlockWaitTimeExceeded):
+            future.result(10)
+
+    def test_callback(self):
+        tracker = self.get_tracker(
+            [self.block(10, [("g7", [])]), self.block(11, [("g7", [])]), self.block(12)]
+        )
+        calls = []
+        first = tracker.track("g7", callback=calls.append)
+        second = tracker.track("g7", callback=calls.append)
+        # A transaction which is tracked twice shares one future
+        self.assertIs(first, second)
+        self.assertEqual(len(tracker), 1)
+        thread = tracker._thread
+        tracker.start.set()
+        self.assertEqual(first.result(10)["block_num"], 10)
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(calls, [first, first])
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import json
+import socket
+import socketserver
+import struct
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nectarapi.asyncnoderpc import AsyncNodeRPC
+from nectarapi.exceptions import CallRetriesReached, UnhandledRPCError
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.methods.append(query["method"])
+        if query["method"] == "database_api.fail":
+            reply = {"jsonrpc": "2.0", "id": query["id"], "error": {"message": "Broken"}}
+        elif query["method"] == "database_api.busy":
+            error = {"message": "Unable to acquire database lock"}
+            reply = {"jsonrpc": "2.0", "id": query["id"], "error": error}
+        else:
+            reply = {"jsonrpc": "2.0", "id": query["id"], "result": query["params"]}
+        data = json.dumps(reply).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        if query["method"] == "database_api.chunked":
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for part in [data[:5], data[5:]]:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class ProxyHandler(socketserver.StreamRequestHandler):
+    """A SOCKS5 or HTTP CONNECT proxy, which only connects to the test server"""
+
+    def handle(self):
+        if self.rfile.read(1) == b"\x05":
+            methods = self.rfile.read(self.rfile.read(1)[0])
+            self.wfile.write(b"\x05\x00" if b"\x00" in methods else b"\x05\xff")
+            version, command, _, address_type = self.rfile.read(4)
+            if address_type == 0x03:
+                host = self.rfile.read(self.rfile.read(1)[0]).decode("idna")
+            else:
+                host = socket.inet_ntoa(self.rfile.read(4))
+            port = struct.unpack(">H", self.rfile.read(2))[0]
+            reply = b"\x05\x00\x00\x01" + socket.inet_aton("0.0.0.0") + b"\x00\x00"
+        else:
+            target = (b"C" + self.rfile.readline()).split()[1].decode("ascii")
+            while self.rfile.readline() not in (b"\r\n", b""):
+                pass
+            host, port = target.rsplit(":", 1)
+            reply = b"HTTP/1.1 200 Connection established\r\n\r\n"
+        self.server.targets.append((host, int(port)))
+        upstream = socket.create_connection((host, int(port)))
+        self.wfile.write(reply)
+        self.wfile.flush()
+
+        def forward(source, target):
+            while True:
+                data = source.recv(65536)
+                if not data:
+                    break
+                target.sendall(data)
+            target.shutdown(socket.SHUT_WR)
+
+        thread = threading.Thread(target=forward, args=(upstream, self.connection), daemon=True)
+        thread.start()
+        forward(self.connection, upstream)
+        thread.join()
+        upstream.close()
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.methods = []
+        cls.url = "http://127.0.0.1:%d" % cls.server.server_address[1]
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        cls.proxy = socketserver.ThreadingTCPServer(("127.0.0.1", 0), ProxyHandler)
+        cls.proxy.targets = []
+        threading.Thread(target=cls.proxy.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.proxy.shutdown()
+
+    def test_concurrent_calls(self):
+        async def run():
+            async with AsyncNodeRPC(self.url, max_connections=4) as rpc:
+                return await asyncio.gather(
+                    *[rpc.get_block({"block_num": n}, api="block") for n in range(20)]
+                )
+
+        results = asyncio.run(run())
+        self.assertEqual([r["block_num"] for r in results], list(range(20)))
+
+    def test_chunked(self):
+        async def run():
+            async with AsyncNodeRPC(self.url) as rpc:
+                return await rpc.chunked({"a": 1}, api="database")
+
+        self.assertEqual(asyncio.run(run()), {"a": 1})
+
+    def test_failover(self):
+        async def run():
+            rpc = AsyncNodeRPC(["http://127.0.0.1:1", self.url], num_retries=5)
+            result = await rpc.get_config({}, api="database")
+            return result, rpc.url
+
+        result, url = asyncio.run(run())
+        self.assertEqual(result, {})
+        self.assertEqual(url, self.url)
+
+    def test_rpc_error(self):
+        async def run():
+            async with AsyncNodeRPC(self.url) as rpc:
+                await rpc.fail({}, api="database")
+
+        with self.assertRaises(UnhandledRPCError):
+            asyncio.run(run())
+
+    def test_skips_websocket_nodes(self):
+        rpc = AsyncNodeRPC(["wss://localhost", self.url])
+        self.assertEqual(rpc.url, self.url)
+
+    def test_retries_reached(self):
+        async def run():
+            async with AsyncNodeRPC(self.url, num_retries_call=2) as rpc:
+                await rpc.busy({}, api="database")
+
+        with self.assertRaises(CallRetriesReached):
+            asyncio.run(run())
+
+    def test_event_loops(self):
+        rpc = AsyncNodeRPC(self.url)
+
+        async def run(n):
+            return await asyncio.gather(*[rpc.get_block({"block_num": n}, api="block")] * 2)
+
+        # The idle connections of the first loop are not used by the second one
+        self.assertEqual(asyncio.run(run(1))[0], {"block_num": 1})
+        self.assertEqual(asyncio.run(run(2))[0], {"block_num": 2})
+        self.assertEqual(len(rpc._pools), 1)
+        rpc.close()
+
+    def test_proxies(self):
+        port = self.proxy.server_address[1]
+        for proxy in ["socks5h", "socks5", "http"]:
+            self.proxy.targets = []
+
+            async def run():
+                proxies = {"http": "%s://127.0.0.1:%d" % (proxy, port)}
+                async with AsyncNodeRPC(self.url, proxies=proxies) as rpc:
+                    return await rpc.get_block({"block_num": 3}, api="block")
+
+            self.assertEqual(asyncio.run(run()), {"block_num": 3})
+            self.assertEqual(self.proxy.targets, [("127.0.0.1", self.server.server_address[1])])
+        with self.assertRaises(ValueError):
+            AsyncNodeRPC(self.url, proxies={"http": "ftp://localhost"})
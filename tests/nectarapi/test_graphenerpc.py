@@ -0,0 +1,333 @@
+# -*- coding: utf-8 -*-
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from nectarapi.exceptions import NumRetriesReached
+from nectarapi.graphenerpc import GrapheneRPC
+from nectarapi.noderpc import NodeRPC
+from nectarapi.ratelimit import NodeLimiters
+from nectarapi.singleflight import SingleFlight
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        query = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.methods.append(query["method"] if isinstance(query, dict) else "batch")
+        time.sleep(self.server.delay)
+        if self.server.throttle > 0:
+            self.server.throttle -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if isinstance(query, list) and self.server.drop_batches:
+            # Closes the connection without a reply
+            self.close_connection = True
+            return
+        if isinstance(query, dict) and self.server.config is not None:
+            if query["method"].endswith("get_config"):
+                query = dict(query, params=self.server.config)
+        if isinstance(query, list) and self.server.reject_batches:
+            reply = {"jsonrpc": "2.0", "id": None, "error": {"message": "Batch not supported"}}
+        elif isinstance(query, list):
+            reply = [{"jsonrpc": "2.0", "id": q["id"], "result": q["params"]} for q in query]
+        else:
+            reply = {"jsonrpc": "2.0", "id": query["id"], "result": query["params"]}
+        data = json.dumps(reply).encode("utf8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.server.truncate > 0:
+            # The connection breaks in the middle of the reply
+            self.server.truncate -= 1
+            self.wfile.write(data[: len(data) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(delay=0):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.methods = []
+    server.delay = delay
+    server.reject_batches = False
+    server.drop_batches = False
+    server.truncate = 0
+    server.throttle = 0
+    server.config = None
+    server.url = "http://127.0.0.1:%d" % server.server_address[1]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class Testcases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.slow = start_server(delay=1.0)
+        cls.fast = start_server()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.slow.shutdown()
+        cls.fast.shutdown()
+
+    def setUp(self):
+        self.slow.methods.clear()
+        self.fast.methods.clear()
+
+    def get_rpc(self, **kwargs):
+        rpc = GrapheneRPC(
+            [self.slow.url, self.fast.url],
+            disable_chain_detection=True,
+            adaptive_node_selection=False,
+            **kwargs,
+        )
+        self.assertEqual(rpc.url, self.slow.url)
+        for i in range(10):
+            rpc.nodes.record_latency(0.05)
+        return rpc
+
+    def test_hedged_request(self):
+        rpc = self.get_rpc(hedge_requests=True)
+        start = time.monotonic()
+        self.assertEqual(rpc.get_config({"a": 1}, api="database"), {"a": 1})
+        self.assertLess(time.monotonic() - start, 0.9)
+        self.assertEqual(self.slow.methods, ["database_api.get_config"])
+        self.assertEqual(self.fast.methods, ["database_api.get_config"])
+        self.assertEqual(len(rpc.nodes.get_node(self.fast.url).latencies), 1)
+
+    def test_broadcast_is_not_hedged(self):
+        rpc = self.get_rpc(hedge_requests=True)
+        rpc.broadcast_transaction({"trx": {}}, api="network_broadcast")
+        self.assertEqual(self.slow.methods, ["network_broadcast_api.broadcast_transaction"])
+        self.assertEqual(self.fast.methods, [])
+
+    def test_no_hedging_by_default(self):
+        rpc = self.get_rpc()
+        rpc.get_config({}, api="database")
+        self.assertEqual(self.fast.methods, [])
+
+    def test_breaker_probe(self):
+        rpc = GrapheneRPC(
+            [self.fast.url, self.slow.url],
+            disable_chain_detection=True,
+            num_retries_call=0,
+        )
+        rpc.nodes.get_node(self.fast.url).breaker.reset_timeout = 0.1
+        for i in range(3):
+            rpc.nodes.record_error(url=self.fast.url)
+        self.assertEqual(rpc.nodes.get_breaker_state()[self.fast.url], "open")
+        rpc._probe_thread.join(5)
+        self.assertEqual(rpc.nodes.get_breaker_state()[self.fast.url], "closed")
+        self.assertIn("database_api.get_dynamic_global_properties", self.fast.methods)
+
+    def test_select_node(self):
+        hive = {"HIVE_CHAIN_ID": "beeab0de", "HIVE_BLOCKCHAIN_VERSION": "1.27.0"}
+        servers = [start_server() for i in range(3)]
+        for server in servers:
+            server.config = hive
+        servers[2].config = dict(hive, HIVE_CHAIN_ID="18dcf0a2")
+        try:
+            rpc = NodeRPC([servers[0].url, servers[1].url], num_retries=1)
+            self.assertFalse(rpc.adaptive_node_selection)
+            rpc = NodeRPC(
+                [servers[0].url, servers[1].url], num_retries=1, adaptive_node_selection=True
+            )
+            self.assertEqual(rpc.chain_id, "beeab0de")
+            rpc.find_accounts({}, api="database")
+            # A node without latency samples does not replace the current one
+            self.assertEqual(servers[1].methods, [])
+            rpc.nodes.record_latency(2.0)
+            rpc.nodes.record_latency(0.1, url=servers[1].url)
+            rpc.find_accounts({}, api="database")
+            # The new node is verified before it is used
+            self.assertEqual(
+                servers[1].methods, ["database_api.get_config", "database_api.find_accounts"]
+            )
+            rpc = NodeRPC(
+                [servers[0].url, servers[2].url], num_retries=1, adaptive_node_selection=True
+            )
+            rpc.nodes.record_latency(2.0)
+            rpc.nodes.record_latency(0.1, url=servers[2].url)
+            servers[0].methods.clear()
+            rpc.find_accounts({}, api="database")
+            # The node of another chain is not used
+            self.assertEqual(servers[2].methods, ["database_api.get_config"])
+            self.assertEqual(servers[0].methods, ["database_api.find_accounts"])
+            self.assertEqual(rpc.url, servers[0].url)
+            self.assertEqual(rpc.chain_id, "beeab0de")
+        finally:
+            for server in servers:
+                server.shutdown()
+
+    def test_coalesce_calls(self):
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True, coalesce_calls=True)
+        self.fast.delay = 0.05
+        try:
+            with ThreadPoolExecutor(50) as pool:
+                results = list(
+                    pool.map(lambda n: rpc.find_accounts({"n": n}, api="database"), range(200))
+                )
+        finally:
+            self.fast.delay = 0
+        self.assertEqual([r["n"] for r in results], list(range(200)))
+        self.assertLess(len(self.fast.methods), 50)
+        stats = rpc.get_rpc_stats()
+        self.assertEqual(stats["calls"], 200)
+        self.assertGreater(stats["coalesced_calls"], 150)
+
+    def test_coalesce_fallback(self):
+        rpc = GrapheneRPC(
+            self.fast.url, disable_chain_detection=True, coalesce_calls=True, coalesce_window=0.1
+        )
+        self.fast.reject_batches = True
+        try:
+            with ThreadPoolExecutor(10) as pool:
+                results = list(
+                    pool.map(lambda n: rpc.find_accounts({"n": n}, api="database"), range(10))
+                )
+        finally:
+            self.fast.reject_batches = False
+        self.assertEqual([r["n"] for r in results], list(range(10)))
+        self.assertEqual(rpc.get_rpc_stats()["batch_fallbacks"], 1)
+        self.assertFalse(rpc.coalescer.accepts({"method": "database_api.find_accounts"}))
+
+    def test_coalesce_dropped_batch(self):
+        rpc = GrapheneRPC(self.fast.url, coalesce_calls=True, coalesce_window=0.1, num_retries=2)
+        self.fast.drop_batches = True
+        results = []
+
+        def call(n):
+            try:
+                results.append(rpc.find_accounts({"n": n}, api="database"))
+            except Exception as e:
+                results.append(e)
+
+        threads = [threading.Thread(target=call, args=(n,), daemon=True) for n in range(10)]
+        try:
+            # The dispatcher reconnects, which calls get_config on its own thread
+            for thread in threads:
+                thread.start()
+            deadline = time.monotonic() + 10
+            for thread in threads:
+                thread.join(max(deadline - time.monotonic(), 0))
+        finally:
+            self.fast.drop_batches = False
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(len(results), 10)
+        self.assertEqual(rpc.get_rpc_stats()["batch_fallbacks"], 1)
+
+    def test_deduplicate_calls(self):
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True)
+        self.assertIsNone(rpc.singleflight)
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True, deduplicate_calls=True)
+        self.fast.delay = 0.3
+        try:
+            with ThreadPoolExecutor(10) as pool:
+                futures = [
+                    pool.submit(rpc.get_feed_history, {"a": [1], "b": 2}, api="database")
+                    for i in range(10)
+                ]
+                time.sleep(0.1)
+                other = rpc.get_feed_history({"b": 2, "a": [1], "c": 3}, api="database")
+                results = [f.result() for f in futures]
+        finally:
+            self.fast.delay = 0
+        self.assertEqual(other, {"a": [1], "b": 2, "c": 3})
+        self.assertEqual(results, [{"a": [1], "b": 2}] * 10)
+        self.assertEqual(len(set(id(r) for r in results)), 10)
+        self.assertEqual(len(self.fast.methods), 2)
+        self.assertEqual(rpc.get_rpc_stats()["deduplicated_calls"], 9)
+        self.assertEqual(rpc.singleflight.in_flight, 0)
+
+    def test_deduplicate_reentrant_call(self):
+        singleflight = SingleFlight()
+        results = []
+
+        def connect():
+            results.append(singleflight.do("key", lambda: singleflight.do("key", lambda: 1)))
+            # Reconnecting calls get_config again, while get_config is in flight
+            try:
+                GrapheneRPC(["http://127.0.0.1:1", "http://127.0.0.1:2"], num_retries=2)
+            except Exception as e:
+                results.append(e)
+
+        thread = threading.Thread(target=connect, daemon=True)
+        thread.start()
+        thread.join(10)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(results[0], 1)
+        self.assertEqual(singleflight.in_flight, 0)
+        self.assertIsInstance(results[1], NumRetriesReached)
+
+    def test_response_cache(self):
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True)
+        self.assertIsNone(rpc.response_cache)
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True, response_cache=True)
+        rpc.get_block({"block_num": 5}, api="block")
+        rpc.chain_id = "beeab0de"
+        rpc.get_dynamic_global_properties({"last_irreversible_block_num": 10}, api="database")
+        for i in range(3):
+            self.assertEqual(rpc.get_block({"block_num": 5}, api="block"), {"block_num": 5})
+            rpc.get_block({"block_num": 11}, api="block")
+        rpc.chain_id = "0000000000"
+        rpc.get_block({"block_num": 5}, api="block")
+        self.assertEqual(self.fast.methods.count("block_api.get_block"), 6)
+        self.assertEqual(rpc.get_rpc_stats()["cache_hits"], 2)
+
+    def test_stream_reply(self):
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True)
+        blocks = [
+            {"block_id": "%08x" % i, "transactions": [{"memo": '[{,}]"' * i}]} for i in range(50)
+        ]
+        items = rpc.get_block_range(
+            {"blocks": blocks}, api="block", stream_path=("result", "blocks")
+        )
+        self.assertNotIsInstance(items, list)
+        self.assertEqual(next(items), blocks[0])
+        self.assertEqual(list(items), blocks[1:])
+        items = rpc.get_block_range({"blocks": []}, api="block", stream_path=("result", "blocks"))
+        self.assertEqual(list(items), [])
+        # A broken stream is sent again and continues after the returned items
+        self.fast.methods.clear()
+        self.fast.truncate = 1
+        blocks = [{"block_id": "%08x" % i, "witness": "x" * 10000} for i in range(50)]
+        items = rpc.get_block_range(
+            {"blocks": blocks}, api="block", stream_path=("result", "blocks")
+        )
+        self.assertEqual(list(items), blocks)
+        self.assertEqual(self.fast.methods, ["block_api.get_block_range"] * 2)
+        # Websocket and unsupported replies fall back to the complete reply
+        self.assertEqual(list(rpc._iter_result_items({"a": [1, 2]}, ("result", "a"))), [1, 2])
+        self.assertEqual(list(rpc._iter_result_items(None, ("result", "a"))), [])
+
+    def test_throttled_calls(self):
+        rpc = GrapheneRPC(self.fast.url, disable_chain_detection=True)
+        self.assertIsNone(rpc.node_limiters)
+        node_limiters = NodeLimiters()
+        rpc = GrapheneRPC(
+            self.fast.url,
+            disable_chain_detection=True,
+            rate_limit=True,
+            node_limiters=node_limiters,
+        )
+        self.fast.throttle = 2
+        self.assertEqual(rpc.get_config({"a": 1}, api="database"), {"a": 1})
+        self.assertEqual(self.fast.methods.count("database_api.get_config"), 3)
+        self.assertEqual(rpc.get_rpc_stats()["throttled_calls"], 2)
+        self.assertEqual(rpc.nodes[0].breaker.failures, 0)
+        state = node_limiters.get_state()[self.fast.url]
+        self.assertEqual(state["throttled"], 2)
+        self.assertEqual(state["in_flight"], 0)
+        self.assertLess(state["concurrency"], 64)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import logging
+import unittest
+
+from nectarapi.jsoncodec import JsonCodec, LazyJson, get_json_codec
+
+
+class Unserializable(object):
+    def __str__(self):
+        raise AssertionError("serialized")
+
+
+class Testcases(unittest.TestCase):
+    def test_codecs(self):
+        modules = ["json"]
+        try:
+            modules.append(JsonCodec("orjson").module)
+        except ImportError:
+            pass
+        try:
+            modules.append(JsonCodec("ujson").module)
+        except ImportError:
+            pass
+        data = {"a": [1, 2.5, None, True], "b": "äöü/€", "c": {"d": "e"}}
+        for module in modules:
+            codec = JsonCodec(module)
+            self.assertEqual(codec.loads(codec.dumps(data)), data)
+            self.assertEqual(codec.loads(codec.dumps(data).decode("utf8")), data)
+            # Control characters are accepted, as with json.loads(strict=False)
+            self.assertEqual(codec.loads(b'{"a": "b\nc"}'), {"a": "b\nc"})
+            self.assertEqual(codec.loads(codec.dumps({1: "a"})), {"1": "a"})
+            with self.assertRaises(ValueError):
+                codec.loads(b"<html>502 Bad Gateway</html>")
+        with self.assertRaises(ValueError):
+            JsonCodec("pickle")
+        self.assertIn(get_json_codec().module, modules)
+
+    def test_lazy_json(self):
+        log = logging.getLogger("nectarapi.test_jsoncodec")
+        log.setLevel(logging.INFO)
+        log.debug("Payload: %s", LazyJson(Unserializable()))
+        self.assertEqual(str(LazyJson({"a": 1})).replace(" ", ""), '{"a":1}')
+        self.assertEqual(str(LazyJson(b'{"a":1}')), '{"a":1}')
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import json
+import unittest
+
+from nectarapi.exceptions import RPCError
+from nectarapi.jsonstream import iter_json_items
+
+
+def split(data, size):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class Testcases(unittest.TestCase):
+    def test_iter_json_items(self):
+        blocks = [
+            {"block_id": "%08x" % i, "ops": [1, 2.5, None, True, False], "memo": 'ä\\"[{,:}]'}
+            for i in range(20)
+        ]
+        reply = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "result": {"other": {"blocks": [1]}, "blocks": blocks, "x": [0]},
+        }
+        data = json.dumps(reply, ensure_ascii=False).encode("utf8")
+        for size in [1, 2, 3, 7, 1000, len(data)]:
+            items = iter_json_items(split(data, size), ("result", "blocks"))
+            self.assertEqual(list(items), blocks)
+        data = json.dumps({"id": 1, "result": [[1, {"op": "a"}], [2, {"op": "b"}]]}).encode()
+        self.assertEqual(list(iter_json_items(split(data, 5))), json.loads(data)["result"])
+        data = json.dumps({"id": 1, "result": {"a": 1, "b": [2]}}).encode()
+        self.assertEqual(list(iter_json_items(split(data, 3))), [("a", 1), ("b", [2])])
+        # Missing keys yield nothing
+        data = json.dumps({"id": 1, "result": {"history": []}}).encode()
+        self.assertEqual(list(iter_json_items([data], ("result", "blocks"))), [])
+        self.assertEqual(list(iter_json_items([b'{"id": 1, "result": null}'])), [])
+
+    def test_errors(self):
+        data = json.dumps({"id": 1, "error": {"message": "Assert Exception"}}).encode()
+        with self.assertRaisesRegex(RPCError, "Assert Exception"):
+            list(iter_json_items(split(data, 4), ("result", "blocks")))
+        for data in [b"<html>502 Bad Gateway</html>", b"", b'{"result": [1, 2']:
+            with self.assertRaises(ValueError):
+                list(iter_json_items(split(data, 4)))
@@ -1,12 +1,15 @@
 # This Python file uses the following encoding: utf-8
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import json
+import time
 import unittest
 
 from nectarapi.exceptions import (
+    CallRetriesReached,
     NumRetriesReached,
 )
-from nectarapi.node import Nodes
+from nectarapi.node import CircuitBreaker, Nodes
 
 
 class Testcases(unittest.TestCase):
@@ -57,3 +60,99 @@ class Testcases(unittest.TestCase):
         next(nodes2)
         next(nodes2)
         self.assertEqual(nodes.url, nodes2.url)
+
+    def test_record_latency(self):
+        nodes = Nodes(["a", "b"], -1, -1, ewma_alpha=0.5)
+        next(nodes)
+        nodes.record_latency(1.0)
+        nodes.record_latency(0.5)
+        self.assertAlmostEqual(nodes[0].latency, 0.75)
+        nodes.record_error()
+        stats = nodes.get_node_stats()
+        self.assertEqual([s["url"] for s in stats], ["a", "b"])
+        self.assertAlmostEqual(stats[0]["error_rate"], 0.5, places=3)
+        self.assertIsNone(stats[1]["latency"])
+        nodes.record_latency(0.75)
+        self.assertAlmostEqual(nodes.get_node_stats()[0]["error_rate"], 0.25, places=3)
+
+    def test_select_node(self):
+        nodes = Nodes(["a", "b", "c"], -1, -1)
+        next(nodes)
+        nodes.record_latency(2.0)
+        # Nodes without latency samples do not replace a working node
+        self.assertEqual(nodes.select_node(), "a")
+        nodes.record_latency(1.5, url="b")
+        self.assertEqual(nodes.select_node(), "a")
+        nodes.record_latency(0.5, url="b")
+        nodes.record_latency(0.5, url="b")
+        self.assertEqual(nodes.select_node(), "b")
+        nodes.record_latency(0.3)
+        self.assertEqual(nodes.select_node(), "b")
+        nodes.record_error()
+        nodes.record_error()
+        self.assertEqual(nodes.select_node(), "b")
+        # The open breaker of the current node switches to another one
+        nodes.record_error()
+        self.assertIn(nodes.select_node(), ["a", "c"])
+        nodes.freeze_current_node = True
+        nodes.record_latency(10.0)
+        self.assertIn(nodes.select_node(), ["a", "c"])
+
+    def test_hedge_url(self):
+        nodes = Nodes(["a", "b", "c"], -1, -1)
+        next(nodes)
+        self.assertIsNone(nodes.get_latency_percentile(95))
+        for i in range(1, 11):
+            nodes.record_latency(i / 10.0)
+        self.assertAlmostEqual(nodes.get_latency_percentile(50), 0.5)
+        self.assertAlmostEqual(nodes.get_latency_percentile(100), 1.0)
+        nodes.record_latency(0.5, url="b")
+        nodes.record_latency(0.2, url="c")
+        self.assertEqual(nodes.get_hedge_url(), "c")
+        nodes.freeze_current_node = True
+        self.assertIsNone(nodes.get_hedge_url())
+
+    def test_circuit_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        now = time.time()
+        self.assertFalse(breaker.record_failure(now))
+        self.assertEqual(breaker.get_state(now), "closed")
+        self.assertTrue(breaker.record_failure(now))
+        self.assertEqual(breaker.get_state(now), "open")
+        self.assertFalse(breaker.is_available(now))
+        self.assertGreaterEqual(breaker.open_until, now + 5)
+        now = breaker.open_until
+        self.assertEqual(breaker.get_state(now), "half_open")
+        self.assertTrue(breaker.record_failure(now))
+        self.assertGreaterEqual(breaker.open_until, now + 10)
+        breaker.record_success()
+        self.assertEqual(breaker.get_state(now), "closed")
+
+    def test_fail_over(self):
+        nodes = Nodes(["a", "b", "c"], -1, 5, failure_threshold=1, reset_timeout=60)
+        next(nodes)
+        with self.assertRaises(CallRetriesReached):
+            nodes.sleep_and_check_retries("error", call_retry=True)
+        nodes.record_error()
+        self.assertEqual(nodes.get_breaker_state(), {"a": "open", "b": "closed", "c": "closed"})
+        next(nodes)
+        self.assertEqual(nodes.url, "b")
+        nodes.record_error()
+        next(nodes)
+        self.assertEqual(nodes.url, "c")
+        nodes.record_error()
+        self.assertGreater(nodes.get_retry_delay(), 0)
+        self.assertLessEqual(nodes.get_retry_delay(), 60)
+
+    def test_export_breaker_state(self):
+        nodes = Nodes(["a", "b"], -1, 5, failure_threshold=1, reset_timeout=60)
+        next(nodes)
+        nodes.record_error()
+        state = json.loads(json.dumps(nodes.export_breaker_state()))
+        nodes2 = Nodes(["b", "a"], -1, 5)
+        nodes2.import_breaker_state(state)
+        self.assertEqual(nodes2.get_breaker_state(), {"a": "open", "b": "closed"})
+        next(nodes2)
+        self.assertEqual(nodes2.url, "b")
+        self.assertEqual(nodes2.get_probe_urls(), [])
+        self.assertAlmostEqual(nodes2.get_next_probe_time(), state["a"]["open_until"])
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import threading
+import time
+import unittest
+from email.utils import formatdate
+
+from nectarapi.ratelimit import AdaptiveLimiter, NodeLimiters, TokenBucket, parse_retry_after
+
+
+class Testcases(unittest.TestCase):
+    def test_parse_retry_after(self):
+        self.assertEqual(parse_retry_after("3"), 3)
+        self.assertEqual(parse_retry_after("-1"), 0)
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after("soon"))
+        now = time.time()
+        self.assertAlmostEqual(parse_retry_after(formatdate(now + 30), now=now), 30, delta=1)
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(10, capacity=2)
+        now = bucket.timestamp
+        self.assertEqual(bucket.get_wait(now), 0)
+        bucket.take()
+        bucket.take()
+        self.assertAlmostEqual(bucket.get_wait(now), 0.1)
+        self.assertEqual(bucket.get_wait(now + 0.11), 0)
+        bucket.set_rate(5)
+        self.assertEqual(bucket.capacity, 1)
+
+    def test_throttled(self):
+        limiter = AdaptiveLimiter(rate=100, concurrency=8)
+        limiter.acquire()
+        limiter.release(throttled=True, retry_after=0.2)
+        self.assertEqual(limiter.concurrency, 4)
+        self.assertEqual(limiter.rate, 50)
+        self.assertGreater(limiter.get_pause(), 0.1)
+        # Replies of the same round trip count once
+        limiter.acquire(timeout=0)
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.concurrency, 4)
+        start = time.monotonic()
+        self.assertTrue(limiter.acquire())
+        self.assertGreater(time.monotonic() - start, 0.1)
+        limiter.release()
+        self.assertEqual(limiter.get_state()["throttled"], 2)
+
+    def test_latency_growth(self):
+        limiter = AdaptiveLimiter(rate=100, concurrency=8, latency_tolerance=2.5)
+        for i in range(10):
+            limiter.acquire()
+            limiter.release(latency=0.01)
+        self.assertEqual(limiter.concurrency, 8)
+        limiter.acquire()
+        limiter.release(latency=0.5)
+        self.assertEqual(limiter.concurrency, 7)
+        self.assertAlmostEqual(limiter.rate, 90)
+
+    def test_mixed_latencies(self):
+        # Slow catch-up calls alternating with fast polls are no congestion
+        limiter = AdaptiveLimiter()
+        self.assertEqual(limiter.rate, 500)
+        self.assertEqual(limiter.concurrency, 64)
+        for i in range(200):
+            limiter.acquire()
+            limiter.release(latency=1.5 if i % 2 else 0.05)
+        self.assertEqual(limiter.rate, 500)
+        self.assertEqual(limiter.concurrency, 64)
+        # Only the replies of the node slow the requests down
+        limiter.acquire()
+        limiter.release(throttled=True)
+        self.assertEqual(limiter.rate, 250)
+        self.assertEqual(limiter.concurrency, 32)
+
+    def test_concurrency(self):
+        limiter = AdaptiveLimiter(rate=1000, concurrency=2)
+        for i in range(2):
+            self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire(timeout=0.05))
+        self.assertEqual(limiter.in_flight, 3)
+        limiter.release()
+        limiter.release()
+        running = []
+        max_running = []
+
+        def request():
+            limiter.acquire()
+            running.append(1)
+            max_running.append(len(running))
+            time.sleep(0.02)
+            running.pop()
+            limiter.release(latency=0.02)
+
+        limiter.release()
+        threads = [threading.Thread(target=request) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(max(max_running), 3)
+        # The limit was reached, so it grows
+        self.assertGreater(limiter.limit, 2)
+
+    def test_node_limiters(self):
+        node_limiters = NodeLimiters(concurrency=3)
+        limiter = node_limiters.get("https://a")
+        self.assertIs(node_limiters.get("https://a"), limiter)
+        self.assertIsNot(node_limiters.get("https://b"), limiter)
+        self.assertEqual(node_limiters.get_state()["https://a"]["concurrency"], 3)
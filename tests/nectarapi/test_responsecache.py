@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+import time
+import unittest
+
+from nectarapi.responsecache import IMMUTABLE, ResponseCache, get_block_num
+
+
+class Testcases(unittest.TestCase):
+    def test_get_block_num(self):
+        self.assertEqual(get_block_num(({"block_num": 5},)), 5)
+        self.assertEqual(get_block_num((5, False)), 5)
+        self.assertEqual(get_block_num(({"starting_block_num": 5, "count": 10},)), 14)
+        self.assertEqual(get_block_num(({"block_range_begin": 5, "block_range_end": 10},)), 9)
+        self.assertEqual(get_block_num(({"id": "abc"},), {"block_num": 7}), 7)
+        self.assertIsNone(get_block_num(({"id": "abc"},), {}))
+
+    def test_immutable(self):
+        cache = ResponseCache()
+        cache.set("a", "get_block", ({"block_num": 5},), {"block": {}})
+        with self.assertRaises(KeyError):
+            cache.get("a")
+        cache.observe("get_dynamic_global_properties", {"last_irreversible_block_num": 10})
+        cache.set("a", "get_block", ({"block_num": 5},), {"block": {}})
+        cache.set("b", "get_block", ({"block_num": 11},), {"block": {}})
+        result = cache.get("a")
+        self.assertEqual(result, {"block": {}})
+        result["block"]["changed"] = True
+        self.assertEqual(cache.get("a"), {"block": {}})
+        with self.assertRaises(KeyError):
+            cache.get("b")
+        self.assertEqual(cache.get_stats()["cache_hits"], 2)
+
+    def test_ttl_and_never(self):
+        cache = ResponseCache(policies={"get_feed_history": 0.05})
+        cache.set("a", "get_feed_history", (), {"price": 1})
+        cache.set("b", "broadcast_transaction", (), {"id": 1})
+        self.assertEqual(cache.get("a"), {"price": 1})
+        with self.assertRaises(KeyError):
+            cache.get("b")
+        time.sleep(0.1)
+        with self.assertRaises(KeyError):
+            cache.get("a")
+        self.assertEqual(len(cache), 0)
+
+    def test_max_bytes(self):
+        cache = ResponseCache(max_bytes=100, policies={"get_block": IMMUTABLE})
+        cache.observe("get_dynamic_global_properties", {"last_irreversible_block_num": 10})
+        for i in range(10):
+            cache.set(i, "get_block", (i,), {"data": "x" * 20})
+        self.assertLessEqual(cache.size, 100)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.get(9), {"data": "x" * 20})
+        with self.assertRaises(KeyError):
+            cache.get(0)
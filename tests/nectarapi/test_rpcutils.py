@@ -6,6 +6,7 @@ import unittest
 from nectarapi.rpcutils import (
     get_api_name,
     get_query,
+    is_broadcast_query,
     is_network_appbase_ready,
 )
 
@@ -81,3 +82,23 @@ class Testcases(unittest.TestCase):
         self.assertEqual(query["id"], 1)
         self.assertTrue(isinstance(query["params"], list))
         self.assertEqual(query["params"], ["test_api", "test", ["b"]])
+
+    def test_is_broadcast_query(self):
+        self.assertTrue(
+            is_broadcast_query(
+                get_query(True, 1, "network_broadcast_api", "broadcast_transaction", [{}])
+            )
+        )
+        self.assertTrue(
+            is_broadcast_query(
+                get_query(True, 1, "condenser_api", "broadcast_transaction_synchronous", [{}])
+            )
+        )
+        self.assertFalse(
+            is_broadcast_query(get_query(True, 1, "database_api", "find_accounts", [{}]))
+        )
+        batch = get_query(True, 1, "block_api", "get_block", [[{"block_num": 1}]])
+        self.assertFalse(is_broadcast_query(batch))
+        self.assertTrue(
+            is_broadcast_query(batch + [{"method": "network_broadcast_api.broadcast_transaction"}])
+        )
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+import json
+import queue
+import unittest
+
+from websocket._exceptions import WebSocketConnectionClosedException, WebSocketTimeoutException
+
+from nectarapi.wspipeline import WebsocketPipeline
+
+
+class FakeWebsocket(object):
+    """Answers each request, in reverse order once two requests are pending"""
+
+    def __init__(self):
+        self.sent = []
+        self.replies = queue.Queue()
+
+    def send(self, data):
+        self.sent.append(json.loads(data))
+
+    def reply(self, query, result):
+        if isinstance(query, list):
+            reply = [{"jsonrpc": "2.0", "id": q["id"], "result": result} for q in query]
+            reply.reverse()
+        else:
+            reply = {"jsonrpc": "2.0", "id": query["id"], "result": result}
+        self.replies.put(json.dumps(reply))
+
+    def recv(self):
+        data = self.replies.get(timeout=5)
+        if data is None:
+            raise WebSocketConnectionClosedException("closed")
+        return data
+
+    def close(self):
+        self.replies.put(None)
+
+
+class Testcases(unittest.TestCase):
+    def test_out_of_order_replies(self):
+        ws = FakeWebsocket()
+        pipeline = WebsocketPipeline(ws)
+        first = pipeline.send({"jsonrpc": "2.0", "id": 7, "method": "a", "params": {}})
+        second = pipeline.send({"jsonrpc": "2.0", "id": 7, "method": "b", "params": {}})
+        self.assertEqual(pipeline.in_flight, 2)
+        self.assertNotEqual(ws.sent[0]["id"], ws.sent[1]["id"])
+        ws.reply(ws.sent[1], "b")
+        ws.reply(ws.sent[0], "a")
+        self.assertEqual(first.result(5), {"jsonrpc": "2.0", "id": 7, "result": "a"})
+        self.assertEqual(second.result(5), {"jsonrpc": "2.0", "id": 7, "result": "b"})
+        self.assertEqual(pipeline.in_flight, 0)
+        pipeline.close()
+
+    def test_batch(self):
+        ws = FakeWebsocket()
+        pipeline = WebsocketPipeline(ws)
+        batch = [{"jsonrpc": "2.0", "id": i, "method": "a", "params": {}} for i in range(3)]
+        future = pipeline.send(batch)
+        ws.reply(ws.sent[0], "a")
+        self.assertEqual([r["id"] for r in future.result(5)], [0, 1, 2])
+        pipeline.close()
+
+    def test_timeout_and_close(self):
+        ws = FakeWebsocket()
+        pipeline = WebsocketPipeline(ws)
+        with self.assertRaises(WebSocketTimeoutException):
+            pipeline.call({"jsonrpc": "2.0", "id": 1, "method": "a", "params": {}}, timeout=0.1)
+        self.assertEqual(pipeline.in_flight, 0)
+        future = pipeline.send({"jsonrpc": "2.0", "id": 1, "method": "a", "params": {}})
+        pipeline.close()
+        with self.assertRaises(WebSocketConnectionClosedException):
+            future.result(5)
+        self.assertTrue(pipeline.closed)
+        with self.assertRaises(WebSocketConnectionClosedException):
+            pipeline.send({"jsonrpc": "2.0", "id": 1, "method": "a", "params": {}})
@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from nectarbase.operationids import getVirtualOperationFilter
+
+
+class Testcases(unittest.TestCase):
+    def test_virtual_operation_filter(self):
+        self.assertEqual(getVirtualOperationFilter(["fill_convert_request"]), 0x000001)
+        self.assertEqual(getVirtualOperationFilter(["author_reward"]), 0x000002)
+        self.assertEqual(getVirtualOperationFilter(["producer_reward_operation"]), 0x004000)
+        self.assertEqual(getVirtualOperationFilter(["author_reward", "curation_reward"]), 0x000006)
+        self.assertEqual(getVirtualOperationFilter(["fill_recurrent_transfer"]), 0x200000000)
+        self.assertEqual(getVirtualOperationFilter(["vote", "transfer", "unknown"]), 0)
@@ -0,0 +1,47 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from nectarstorage import (
+    FileCheckpointStore,
+    InRamCheckpointStore,
+    SqliteCheckpointStore,
+)
+
+
+class Testcases(unittest.TestCase):
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.data_dir)
+
+    def _test_store(self, store):
+        self.assertIsNone(store.get_checkpoint("stream"))
+        store.set_checkpoint("stream", (25097000, 3, 1))
+        self.assertEqual(store.get_checkpoint("stream"), (25097000, 3, 1))
+        store.set_checkpoint("stream", (25097001, -1, -1))
+        self.assertEqual(store.get_checkpoint("stream"), (25097001, -1, -1))
+        self.assertTrue(store.get_checkpoint("stream") > (25097000, 3, 1))
+        store.set_checkpoint("blocks", (10, -1, -1))
+        self.assertEqual(store.get_checkpoint("blocks"), (10, -1, -1))
+        store.delete("blocks")
+        self.assertIsNone(store.get_checkpoint("blocks"))
+
+    def test_ram(self):
+        self._test_store(InRamCheckpointStore())
+
+    def test_sqlite(self):
+        self._test_store(SqliteCheckpointStore(profile="checkpoints", data_dir=self.data_dir))
+        store = SqliteCheckpointStore(profile="checkpoints", data_dir=self.data_dir)
+        self.assertEqual(store.get_checkpoint("stream"), (25097001, -1, -1))
+
+    def test_file(self):
+        self._test_store(FileCheckpointStore(profile="checkpoints", data_dir=self.data_dir))
+        self.assertTrue(os.path.isfile(os.path.join(self.data_dir, "checkpoints.json")))
+        store = FileCheckpointStore(profile="checkpoints", data_dir=self.data_dir)
+        self.assertEqual(store.get_checkpoint("stream"), (25097001, -1, -1))
+        store.wipe()
+        store = FileCheckpointStore(profile="checkpoints", data_dir=self.data_dir)
+        self.assertIsNone(store.get_checkpoint("stream"))